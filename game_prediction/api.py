@@ -1,15 +1,57 @@
+import asyncio
+import logging
 import os
-from contextlib import asynccontextmanager
+import time
+from collections.abc import Callable
+from contextlib import asynccontextmanager, suppress
 from typing import Any
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 
-from game_prediction.pipelines.inference import inference
-from game_prediction.tasks.scoring import load_run_mlflow
+import game_prediction.constants as cst
+from game_prediction.utils.model_cache import ModelCache
+from game_prediction.utils.single_flight import SingleFlight
+from game_prediction.utils.team_catalog import TeamCatalog
+from game_prediction.utils.timing import PhaseTimer
+
+# Heavy dependencies (pandas, xgboost, mlflow, asyncpg) are imported during the lifespan
+# so that importing this module stays cheap and the startup report can account for them.
+
+logger = logging.getLogger(__name__)
 
 ml_models = {}
 
+game_data_sources = {}
+
+startup_timer = PhaseTimer()
+
+team_catalog = TeamCatalog()
+
+
+def load_predictor(model_name: str) -> tuple[Any, str]:
+    """Load a per league model from MLFlow.
+
+    Args:
+        model_name (str): Model name.
+
+    Returns:
+        tuple[Any, str]: Model as a FastPredictor, and its run ID.
+    """
+    from game_prediction.tasks.scoring import load_run_mlflow
+    from game_prediction.utils.fast_predict import FastPredictor
+
+    model, run_id = load_run_mlflow(return_run_id=True, model_name=model_name)
+
+    return FastPredictor(model), run_id
+
+
+# Per league models, loaded on first request; the global model stays in ml_models
+league_models = ModelCache(load_predictor, cst.MAX_LOADED_MODELS)
+
+# Concurrent identical predictions (same games, same model version) share one live inference
+live_inferences = SingleFlight()
+
 
 class ModelConfig(BaseModel):  # type: ignore
     """Inputs to run model."""
@@ -18,14 +60,376 @@ class ModelConfig(BaseModel):  # type: ignore
     away_team: str = "NANTES"
 
 
+class MatchdayConfig(BaseModel):  # type: ignore
+    """Inputs to run model on several games at once."""
+
+    games: list[ModelConfig]
+
+
+def warm_up(predictor: Any) -> None:
+    """Run a first prediction on a dummy row so lazy allocations are not paid by the first request.
+
+    Args:
+        predictor (Any): Loaded model, as a FastPredictor.
+    """
+    import numpy as np
+
+    predictor.predict_proba(np.zeros((1, predictor.n_features), dtype=np.float32))
+
+
+def resolve_team(name: str) -> str:
+    """Validate a requested team against the team catalog before any expensive work.
+
+    Args:
+        name (str): Team name sent by the client.
+
+    Raises:
+        HTTPException: 422 when the team is unknown, with the closest team names as suggestions.
+
+    Returns:
+        str: Team name as stored in game_data.
+    """
+    team = team_catalog.lookup(name)
+    if team is None:
+        raise HTTPException(
+            status_code=422,
+            detail={"message": f"Unknown team: {name}", "suggestions": team_catalog.suggest(name, limit=5)},
+        )
+
+    return team
+
+
+def load_matchup_table() -> None:
+    """Load the precomputed matchup table, when it exists and changed since the last load."""
+    from game_prediction.tasks.matchups import MatchupTable
+
+    if not os.path.exists(cst.MATCHUP_TABLE_PATH):
+        return
+
+    modified_at = os.path.getmtime(cst.MATCHUP_TABLE_PATH)
+    if modified_at != ml_models.get("matchup_table_mtime"):
+        ml_models["matchup_table"] = MatchupTable.load(cst.MATCHUP_TABLE_PATH)
+        ml_models["matchup_table_mtime"] = modified_at
+
+
+async def refresh_serving_data() -> None:
+    """Periodically reload the team catalog and the matchup table so newly ingested teams are accepted
+    and nightly precomputed predictions are picked up."""
+    while True:
+        await asyncio.sleep(cst.TEAM_CATALOG_REFRESH_SECONDS)
+        try:
+            team_catalog.refresh(await game_data_sources["game_data"].teams())
+            ml_models["team_leagues"] = await game_data_sources["game_data"].leagues()
+            await asyncio.to_thread(load_matchup_table)
+            # Explanations computed live before new games were ingested would be stale
+            ml_models["explanation_cache"].clear()
+        except Exception:  # Keep serving with the previous catalog and table
+            logger.exception("Serving data refresh failed")
+
+
+def route_game(home_team: str, away_team: str) -> str:
+    """Pick the model of a game: the model of the teams' league when one was trained, the global one
+    otherwise (no league model, or teams of different leagues).
+
+    Args:
+        home_team (str): Home team.
+        away_team (str): Away team.
+
+    Returns:
+        str: Model name.
+    """
+    team_leagues = ml_models.get("team_leagues", {})
+    league = team_leagues.get(home_team)
+
+    if league is not None and league == team_leagues.get(away_team):
+        model_name = cst.SEGMENT_MODEL_NAME.format(segment=league)
+        if model_name in ml_models.get("model_names", ()):
+            return model_name
+
+    return cst.MODEL_NAME
+
+
+async def get_predictor(model_name: str) -> tuple[Any, str]:
+    """Served model of a name: the global model, or a per league model loaded on first use.
+
+    Args:
+        model_name (str): Model name.
+
+    Returns:
+        tuple[Any, str]: Model as a FastPredictor, and its run ID.
+    """
+    if model_name == cst.MODEL_NAME:
+        return ml_models["predictor"], ml_models["run_id"]
+
+    return await league_models.get(model_name)  # type: ignore
+
+
+async def predict_with_model(model_name: str, games: list[tuple[str, str]]) -> tuple[Any, Any, str]:
+    """Run live inference on games routed to the same model, or wait for the identical inference
+    already running for another request.
+
+    Args:
+        model_name (str): Model name.
+        games (list[tuple[str, str]]): (home team, away team) of each game.
+
+    Returns:
+        tuple[Any, Any, str]: Model inputs and class probabilities (NumPy arrays), in the same order as `games`,
+            and the run ID of the model.
+    """
+    from game_prediction.pipelines.inference import inference_batch_proba_async
+
+    predictor, run_id = await get_predictor(model_name)
+
+    inputs, probabilities = await live_inferences.run(
+        (tuple(games), run_id),
+        lambda: inference_batch_proba_async(games, game_data_sources["game_data"], predictor),
+    )
+
+    return inputs, probabilities, run_id
+
+
+def split_games(
+    games: list[tuple[str, str]], model_names: list[str], lookup: Callable[[Any, str, str], Any]
+) -> tuple[dict[int, Any], dict[str, list[int]]]:
+    """Split games between the matchup table, when it is fresh, and live inference grouped by model.
+
+    Args:
+        games (list[tuple[str, str]]): (home team, away team) of each game.
+        model_names (list[str]): Model of each game (see route_game).
+        lookup (Callable[[Any, str, str], Any]): Reads a game from the matchup table, home team and away team,
+            None when the table does not hold it.
+
+    Returns:
+        tuple[dict[int, Any], dict[str, list[int]]]: Lookup result of the games found in the matchup table, by
+            position in `games`, and positions of the other games by model name.
+    """
+    table_hits = {}
+
+    # The matchup table is computed with the global model
+    matchup_table = ml_models.get("matchup_table")
+    if matchup_table is not None and matchup_table.is_fresh(ml_models["run_id"]):
+        for position, (home_team, away_team) in enumerate(games):
+            if model_names[position] != cst.MODEL_NAME:
+                continue
+            hit = lookup(matchup_table, home_team, away_team)
+            if hit is not None:
+                table_hits[position] = hit
+
+    live_positions: dict[str, list[int]] = {}
+    for position, model_name in enumerate(model_names):
+        if position not in table_hits:
+            live_positions.setdefault(model_name, []).append(position)
+
+    return table_hits, live_positions
+
+
+async def predict_games(games: list[tuple[str, str]]) -> list[str]:
+    """Predict games from the matchup table when it is fresh, running live inference for the others.
+    Each game is predicted by the model of its league (see route_game). Predictions are appended
+    to the prediction log.
+
+    Args:
+        games (list[tuple[str, str]]): (home team, away team) of each game, as stored in game_data.
+
+    Raises:
+        HTTPException: 422 when a team has not played enough games to compute its features.
+
+    Returns:
+        list[str]: Model predictions, in the same order as `games`.
+    """
+    import numpy as np
+
+    from game_prediction.utils.fast_predict import to_labels
+
+    started_at = time.perf_counter()
+    model_names = [route_game(home_team, away_team) for home_team, away_team in games]
+    run_ids = [""] * len(games)  # Filled once a game is predicted
+    probabilities = np.zeros((len(games), len(cst.LABEL_CONVERTED)), dtype=np.float32)
+    prediction_log = ml_models.get("prediction_log")
+    # Features of the games served from the matchup table are not computed, they stay missing
+    n_logged_features = len(prediction_log.feature_names) if prediction_log is not None else 0
+    inputs = np.full((len(games), n_logged_features), np.nan, dtype=np.float32)
+
+    table_hits, live_positions = split_games(
+        games, model_names, lambda matchup_table, home_team, away_team: matchup_table.lookup(home_team, away_team)
+    )
+    for position, game_probabilities in table_hits.items():
+        probabilities[position] = game_probabilities
+        run_ids[position] = ml_models["run_id"]
+
+    try:
+        live_results = await asyncio.gather(
+            *(
+                predict_with_model(model_name, [games[position] for position in positions])
+                for model_name, positions in live_positions.items()
+            )
+        )
+    except ValueError as error:  # Not enough games played to compute the features
+        raise HTTPException(status_code=422, detail=str(error)) from error
+
+    for positions, (model_inputs, model_probabilities, run_id) in zip(live_positions.values(), live_results):
+        probabilities[positions] = model_probabilities
+        if model_inputs.shape[1] == inputs.shape[1]:
+            inputs[positions] = model_inputs
+        for position in positions:
+            run_ids[position] = run_id
+
+    if prediction_log is not None:
+        prediction_log.record(games, inputs, probabilities, model_names, run_ids, time.perf_counter() - started_at)
+
+    return to_labels(probabilities)
+
+
+async def explain_games(games: list[tuple[str, str]], top: int = cst.EXPLAIN_TOP_FEATURES) -> list[dict[str, Any]]:
+    """Explain the predictions of games with the contributions of the model inputs to the predicted class:
+    precomputed in the matchup table when it is fresh, cached by a previous request for the same game and
+    model version, computed live on the same inputs as predict_games otherwise.
+
+    Args:
+        games (list[tuple[str, str]]): (home team, away team) of each game, as stored in game_data.
+        top (int, optional): Model columns listed per game. Defaults to cst.EXPLAIN_TOP_FEATURES.
+
+    Raises:
+        HTTPException: 422 when a team has not played enough games to compute its features.
+
+    Returns:
+        list[dict[str, Any]]: Explanation of each game (see Explainer.summarize), in the same order as `games`.
+    """
+    from game_prediction.utils.explanations import Explainer, predicted_class_contributions
+
+    model_names = [route_game(home_team, away_team) for home_team, away_team in games]
+    explanation_cache = ml_models["explanation_cache"]
+    # (predictor, probabilities, contributions to the predicted class) of each game
+    explained: list[Any] = [None] * len(games)
+
+    def lookup_explanation(matchup_table: Any, home_team: str, away_team: str) -> Any:
+        probabilities = matchup_table.lookup(home_team, away_team)
+        contributions = matchup_table.lookup_contributions(home_team, away_team)
+        if probabilities is None or contributions is None:
+            return None
+        return ml_models["predictor"], probabilities, contributions
+
+    table_hits, live_positions = split_games(games, model_names, lookup_explanation)
+    for position, explanation in table_hits.items():
+        explained[position] = explanation
+
+    async def explain_with_model(model_name: str, positions: list[int]) -> None:
+        predictor, run_id = await get_predictor(model_name)
+
+        missing = []
+        for position in positions:
+            cached = explanation_cache.get((*games[position], run_id))
+            if cached is None:
+                missing.append(position)
+            else:
+                explained[position] = (predictor, *cached)
+        if not missing:
+            return
+
+        inputs, probabilities, run_id = await predict_with_model(model_name, [games[position] for position in missing])
+        contributions = predicted_class_contributions(
+            probabilities, await asyncio.to_thread(predictor.predict_contributions, inputs)
+        )
+        for position, game_probabilities, game_contributions in zip(missing, probabilities, contributions):
+            explanation_cache.put((*games[position], run_id), game_probabilities, game_contributions)
+            explained[position] = (predictor, game_probabilities, game_contributions)
+
+    try:
+        await asyncio.gather(
+            *(explain_with_model(model_name, positions) for model_name, positions in live_positions.items())
+        )
+    except ValueError as error:  # Not enough games played to compute the features
+        raise HTTPException(status_code=422, detail=str(error)) from error
+
+    explainers: dict[Any, Explainer] = {}
+    for predictor, _, _ in explained:
+        if predictor not in explainers:
+            explainers[predictor] = Explainer(predictor.layout.feature_names)
+
+    return [
+        explainers[predictor].summarize(probabilities, contributions, top=top)
+        for predictor, probabilities, contributions in explained
+    ]
+
+
+def load_model() -> None:
+    """Load the global model and list the available per league models."""
+    from game_prediction.tasks.scoring import list_model_names, load_run_mlflow
+    from game_prediction.utils.fast_predict import FastPredictor
+
+    with startup_timer.phase("model_load"):
+        ml_models["xgb_model"], ml_models["run_id"] = load_run_mlflow(return_run_id=True)
+        ml_models["predictor"] = FastPredictor(ml_models["xgb_model"])
+        ml_models["model_names"] = set(list_model_names())
+
+
+def preload_serving_state() -> None:
+    """Pre-fork mode (see gunicorn_conf.py): load the model, the game_data snapshot and the matchup table
+    in the gunicorn master process, before the workers are forked. Workers share these read-only memory
+    pages instead of each loading its own copy, their lifespan only loads what is left.
+    """
+    with startup_timer.phase("import"):
+        import game_prediction.pipelines.inference  # noqa: F401
+        from game_prediction.async_data_utils import SnapshotGameData
+
+    load_model()
+
+    # A database pool can not be shared across processes, each worker opens its own
+    if cst.GAME_DATA_SNAPSHOT:
+        with startup_timer.phase("data_source"):
+            game_data_sources["game_data"] = SnapshotGameData.from_file(cst.GAME_DATA_SNAPSHOT)
+
+    with startup_timer.phase("matchup_table"):
+        load_matchup_table()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> Any:
     """Loading the model once so it's available for all API request."""
-    # Load the ML model
-    ml_models["xgb_model"] = load_run_mlflow()
+    with startup_timer.phase("import"):
+        import game_prediction.pipelines.inference  # noqa: F401
+        from game_prediction.async_data_utils import connect_game_data
+        from game_prediction.utils.explanations import ExplanationCache
+        from game_prediction.utils.prediction_log import PredictionLog
+
+    # Already loaded when the gunicorn master preloaded the serving state
+    if "predictor" not in ml_models:
+        load_model()
+
+    # Run in each worker: OpenMP threads started in the master would not survive the fork
+    with startup_timer.phase("warm_up"):
+        warm_up(ml_models["predictor"])
+
+    with startup_timer.phase("data_source"):
+        if "game_data" not in game_data_sources:
+            game_data_sources["game_data"] = await connect_game_data()
+
+    with startup_timer.phase("team_catalog"):
+        team_catalog.refresh(await game_data_sources["game_data"].teams())
+        ml_models["team_leagues"] = await game_data_sources["game_data"].leagues()
+
+    with startup_timer.phase("matchup_table"):
+        load_matchup_table()
+    ml_models["explanation_cache"] = ExplanationCache()
+    refresh_task = asyncio.create_task(refresh_serving_data())
+
+    # One log per worker: its records are flushed to files named after the process
+    prediction_log = ml_models["prediction_log"] = PredictionLog(
+        cst.PREDICTION_LOG_DIR, ml_models["predictor"].layout.feature_names
+    )
+    flush_task = asyncio.create_task(prediction_log.run())
+
+    print(f"Startup report (seconds): {startup_timer.report()}")
     yield
+    for task in (refresh_task, flush_task):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await prediction_log.flush()
+    await game_data_sources.pop("game_data").close()
     # Clean up the ML models and release the resources
     ml_models.clear()
+    league_models.clear()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -38,6 +442,57 @@ async def root() -> str:
     return os.getcwd()
 
 
+@app.get("/startup")  # type: ignore
+async def get_startup_report() -> dict[str, float]:
+    """Time spent in each startup phase (import, model_load, warm_up, data_source, team_catalog, matchup_table)."""
+    return startup_timer.report()
+
+
+@app.get("/models")  # type: ignore
+async def get_models() -> dict[str, Any]:
+    """Available models and the per league models currently in memory."""
+    return {"available": sorted(ml_models.get("model_names", ())), "league_models": league_models.stats()}
+
+
+@app.get("/prediction-log")  # type: ignore
+async def get_prediction_log() -> dict[str, Any]:
+    """Counters of the prediction log of the worker: records pending, recorded, dropped and flushed."""
+    prediction_log = ml_models.get("prediction_log")
+
+    return prediction_log.stats() if prediction_log is not None else {}
+
+
+@app.get("/coalescing")  # type: ignore
+async def get_coalescing() -> dict[str, Any]:
+    """Live inferences in flight, run, and shared by concurrent identical requests (coalesced)."""
+    return live_inferences.stats()
+
+
+@app.get("/explanation-cache")  # type: ignore
+async def get_explanation_cache() -> dict[str, int]:
+    """Games explained live and kept in memory by the worker, and cache counters."""
+    explanation_cache = ml_models.get("explanation_cache")
+
+    return explanation_cache.stats() if explanation_cache is not None else {}
+
+
+@app.get("/teams")  # type: ignore
+async def get_teams(q: str = "", limit: int = 10) -> list[str]:
+    """List known teams, or autocomplete a partial team name.
+
+    Args:
+        q (str, optional): Partial team name. Defaults to "" (all teams).
+        limit (int, optional): Maximum number of suggestions when `q` is given. Defaults to 10.
+
+    Returns:
+        list[str]: Team names.
+    """
+    if not q:
+        return team_catalog.teams
+
+    return team_catalog.suggest(q, limit=limit)
+
+
 @app.post("/predict")  # type: ignore
 async def get_prediction(game: ModelConfig) -> dict[str, str]:
     """Get the model prediction for the requested game.
@@ -48,5 +503,73 @@ async def get_prediction(game: ModelConfig) -> dict[str, str]:
     Returns:
         dict[str, str]: Model result (prediction of game's result).
     """
-    result = inference(game.home_team, game.away_team, loaded_model=ml_models["xgb_model"])
+    home_team, away_team = resolve_team(game.home_team), resolve_team(game.away_team)
+
+    result = (await predict_games([(home_team, away_team)]))[0]
+
     return {"PREDICTION": result}
+
+
+@app.post("/predict/batch")  # type: ignore
+async def get_batch_prediction(matchday: MatchdayConfig) -> dict[str, list[dict[str, str]]]:
+    """Get the model predictions for all the games of a matchday in one call.
+
+    Args:
+        matchday (MatchdayConfig): Games to predict.
+
+    Returns:
+        dict[str, list[dict[str, str]]]: Teams and model prediction of each game, in the request order.
+    """
+    games = [(resolve_team(game.home_team), resolve_team(game.away_team)) for game in matchday.games]
+    results = await predict_games(games)
+
+    return {
+        "PREDICTIONS": [
+            {"home_team": home_team, "away_team": away_team, "PREDICTION": result}
+            for (home_team, away_team), result in zip(games, results)
+        ]
+    }
+
+
+@app.post("/explain")  # type: ignore
+async def get_explanation(game: ModelConfig, top: int = cst.EXPLAIN_TOP_FEATURES) -> dict[str, Any]:
+    """Explain the model prediction for the requested game: contributions of the model inputs to the predicted
+    class (log-odds), summed per game_data variable and per transform (AVG, LAST, CUMU).
+
+    Args:
+        game (ModelConfig): Model inputs.
+        top (int, optional): Model columns listed, largest absolute contributions first.
+            Defaults to cst.EXPLAIN_TOP_FEATURES.
+
+    Returns:
+        dict[str, Any]: Model prediction and its explanation.
+    """
+    home_team, away_team = resolve_team(game.home_team), resolve_team(game.away_team)
+
+    explanation = (await explain_games([(home_team, away_team)], top=top))[0]
+
+    return {"home_team": home_team, "away_team": away_team, **explanation}
+
+
+@app.post("/explain/batch")  # type: ignore
+async def get_batch_explanation(
+    matchday: MatchdayConfig, top: int = cst.EXPLAIN_TOP_FEATURES
+) -> dict[str, list[dict[str, Any]]]:
+    """Explain the model predictions for all the games of a matchday in one call.
+
+    Args:
+        matchday (MatchdayConfig): Games to explain.
+        top (int, optional): Model columns listed per game. Defaults to cst.EXPLAIN_TOP_FEATURES.
+
+    Returns:
+        dict[str, list[dict[str, Any]]]: Teams, model prediction and explanation of each game, in the request order.
+    """
+    games = [(resolve_team(game.home_team), resolve_team(game.away_team)) for game in matchday.games]
+    explanations = await explain_games(games, top=top)
+
+    return {
+        "EXPLANATIONS": [
+            {"home_team": home_team, "away_team": away_team, **explanation}
+            for (home_team, away_team), explanation in zip(games, explanations)
+        ]
+    }
@@ -0,0 +1,152 @@
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+import game_prediction.constants as cst
+from game_prediction.config import load_postgres_config
+from game_prediction.data_utils import read_data_from_file
+from game_prediction.utils.feature_sql import team_state_from_rows, team_state_query
+from game_prediction.utils.team_catalog import find_leagues
+from game_prediction.utils.team_features import TeamState, team_states_from_frame
+
+if TYPE_CHECKING:
+    import asyncpg
+
+
+async def create_async_pool() -> "asyncpg.Pool":
+    """Open an asyncpg connection pool on the PostGreSQL database.
+
+    Returns:
+        asyncpg.Pool: Connection pool.
+    """
+    import asyncpg
+
+    return await asyncpg.create_pool(
+        **load_postgres_config(), min_size=cst.DB_POOL_MIN_SIZE, max_size=cst.DB_POOL_MAX_SIZE
+    )
+
+
+async def fetch_team_state(pool: "asyncpg.Pool", team: str, status: str) -> TeamState:
+    """Read the few rows needed to compute a team's features, decoded straight into NumPy arrays.
+
+    Args:
+        pool (asyncpg.Pool): Connection pool.
+        team (str): Team name.
+        status (str): "HOME" or "AWAY", features are computed before the team's last game with this status.
+
+    Returns:
+        TeamState: State of the team.
+    """
+    rows = await pool.fetch(team_state_query(cst.GAME_DATA_TABLE), team, status)
+
+    return team_state_from_rows([tuple(row) for row in rows])
+
+
+async def fetch_teams(pool: "asyncpg.Pool") -> list[str]:
+    """Read the distinct teams from game_data.
+
+    Args:
+        pool (asyncpg.Pool): Connection pool.
+
+    Returns:
+        list[str]: Team names.
+    """
+    return [row["TEAM"] for row in await pool.fetch(f'SELECT DISTINCT "TEAM" FROM {cst.GAME_DATA_TABLE};')]
+
+
+async def fetch_leagues(pool: "asyncpg.Pool") -> dict[str, str]:
+    """Group the teams of game_data by league.
+
+    Args:
+        pool (asyncpg.Pool): Connection pool.
+
+    Returns:
+        dict[str, str]: League of each team.
+    """
+    rows = await pool.fetch(f'SELECT DISTINCT "ID_GAME", "TEAM", "SEASON" FROM {cst.GAME_DATA_TABLE};')
+
+    return find_leagues(pd.DataFrame([tuple(row) for row in rows], columns=["ID_GAME", "TEAM", "SEASON"]))
+
+
+class PostgresGameData:
+    """Async access to game_data in PostGreSQL, through a connection pool."""
+
+    def __init__(self, pool: "asyncpg.Pool") -> None:
+        self.pool = pool
+
+    @classmethod
+    async def connect(cls) -> "PostgresGameData":
+        """Open the connection pool.
+
+        Returns:
+            PostgresGameData: Data source.
+        """
+        return cls(await create_async_pool())
+
+    async def team_state(self, team: str, status: str) -> TeamState:
+        """State of a team before its last game with the given STATUS."""
+        return await fetch_team_state(self.pool, team, status)
+
+    async def teams(self) -> list[str]:
+        """Distinct teams of game_data."""
+        return await fetch_teams(self.pool)
+
+    async def leagues(self) -> dict[str, str]:
+        """League of each team."""
+        return await fetch_leagues(self.pool)
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        await self.pool.close()
+
+
+class SnapshotGameData:
+    """Local stand-in for the database, serving team states computed from a game_data snapshot
+    (CSV or parquet export of the table). Used to run the API and load tests offline.
+    """
+
+    def __init__(self, game_data: pd.DataFrame) -> None:
+        self.states = team_states_from_frame(game_data)
+        self.team_leagues = find_leagues(game_data)
+
+    @classmethod
+    def from_file(cls, path: str) -> "SnapshotGameData":
+        """Read a game_data snapshot.
+
+        Args:
+            path (str): CSV or parquet file.
+
+        Returns:
+            SnapshotGameData: Data source.
+        """
+        return cls(read_data_from_file(path))
+
+    async def team_state(self, team: str, status: str) -> TeamState:
+        """State of a team before its last game with the given STATUS."""
+        if (team, status) not in self.states:
+            raise ValueError(f"No {status} game found for {team}.")
+
+        return self.states[(team, status)]
+
+    async def teams(self) -> list[str]:
+        """Distinct teams of the snapshot."""
+        return sorted({team for team, _ in self.states})
+
+    async def leagues(self) -> dict[str, str]:
+        """League of each team."""
+        return self.team_leagues
+
+    async def close(self) -> None:
+        """Nothing to release."""
+
+
+async def connect_game_data() -> "PostgresGameData | SnapshotGameData":
+    """Open the game_data source used by the API: the GAME_DATA_SNAPSHOT file when set, PostGreSQL otherwise.
+
+    Returns:
+        PostgresGameData | SnapshotGameData: Data source.
+    """
+    if cst.GAME_DATA_SNAPSHOT:
+        return SnapshotGameData.from_file(cst.GAME_DATA_SNAPSHOT)
+
+    return await PostgresGameData.connect()
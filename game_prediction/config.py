@@ -81,6 +81,7 @@ class Tables(Enum):
     """SQL tables."""
 
     GAME_DATA = "game_data"
+    GAME_DATA_NORMALIZED = "game_data_normalized"
     PLAYER_GENERAL_INFO = "player_general_info"
     PLAYER_GAME_INFO_EXTEND = "player_game_info_extend"
     PLAYER_GAME_SUMMARY = "player_game_summary"
@@ -365,8 +366,6 @@ class TableMapping:
     be used anywhere on the script.
     """
 
-    config = load_postgres_config()
-
     def __init__(self) -> None:
         """Class Instantiation."""
         self.TableConfig = {}
@@ -1,3 +1,4 @@
+import os
 import pathlib
 
 # MLFLOW CONFIG
@@ -8,7 +9,110 @@ EXPERIMENT_NAME = "game-prediction"
 
 MODEL_NAME = "game-prediction-classifier"
 
+# Per league / per season models, logged next to MODEL_NAME (e.g. "game-prediction-classifier-LEAGUE_ANGERS")
+SEGMENT_MODEL_NAME = MODEL_NAME + "-{segment}"
+SEGMENT_SPLITS = ("league", "season")
+# Segments with fewer games are left to the global model
+MIN_SEGMENT_GAMES = 100
+
+# Runs are logged from a background thread, at most TRACKING_QUEUE_SIZE of them waiting
+TRACKING_QUEUE_SIZE = 8
+# Seconds save_to_mlflow waits for a queue slot before buffering the run locally instead
+TRACKING_ENQUEUE_TIMEOUT = 5
+# Requests to a remote tracking server (seconds, retries), runs are buffered locally past them
+TRACKING_HTTP_TIMEOUT = 10
+TRACKING_HTTP_MAX_RETRIES = 2
+# Runs that could not be logged, replayed by `python -m game_prediction.tasks.tracking`
+TRACKING_BUFFER_DIR = os.getenv(
+    "TRACKING_BUFFER_DIR", str(pathlib.Path(__file__).parent.parent.resolve() / "artifacts" / "mlflow_buffer")
+)
+
 
 # MODEL CONFIG
 LABEL_CONVERTED = {"DRAW": 1, "HOME_WIN": 0, "AWAY_WIN": 2}
 LABEL_CONVERTED_INV = {1: "DRAW", 0: "HOME_WIN", 2: "AWAY_WIN"}
+
+# Number of past games averaged by the AVG_ features
+N_GAMES_AVG = 3
+
+# Categories of the result columns one-hot encoded in pre_processing_game_data
+RESULT_CATEGORIES = {
+    "FINAL_RESULT": ["DRAW", "LOSS", "WIN"],
+    "FINAL_RESULT_STATUS": ["AWAY_WIN", "DRAW", "HOME_WIN"],
+}
+
+# Incremental training (pipelines/train_incremental.py): the previous model is updated on the games played
+# since its training, either with new boosting rounds ("boost") or by refreshing its leaf values ("refresh")
+INCREMENTAL_MODES = ("boost", "refresh")
+INCREMENTAL_ROUNDS = 10
+# Share of the new games held out to compare the updated model with the previous one
+INCREMENTAL_HOLDOUT_SIZE = 0.3
+MIN_INCREMENTAL_GAMES = 20
+
+# External memory training (pipelines/train_external_memory.py): feature rows read from the database per chunk
+FEATURE_CHUNK_ROWS = int(os.getenv("FEATURE_CHUNK_ROWS", 50000))
+# Boosting rounds, the XGBClassifier default
+EXTERNAL_MEMORY_ROUNDS = 100
+
+
+# SEASON SIMULATION CONFIG (pipelines/simulate_season.py)
+SEASON_SIMULATIONS = 100_000
+# Seasons drawn at once: memory grows with SIMULATION_BATCH_SIZE * remaining fixtures
+SIMULATION_BATCH_SIZE = 10_000
+EUROPEAN_SPOTS = 6
+RELEGATION_SPOTS = 3
+
+
+# EVALUATION CONFIG
+EVAL_N_BOOTSTRAP = 2000
+EVAL_N_RANDOM_DRAWS = 2000
+EVAL_CONFIDENCE = 0.95
+EVAL_CALIBRATION_BINS = 10
+# Quantile bins of the per game bootstrap (log-loss, Brier score), exact up to this many games
+EVAL_BOOTSTRAP_BINS = 1024
+
+
+# DATA CONFIG
+# Table read by training and serving: the raw scraped strings, parsed on every read. Set to
+# game_data_normalized (typed statistics) once pipelines/normalize_game_data.py has created it.
+GAME_DATA_TABLE = os.getenv("GAME_DATA_TABLE", "game_data")
+# Attempted counts of the "made of attempted" columns, e.g. pass_acc_attempted
+ATTEMPTED_SUFFIX = "_attempted"
+# Compute the AVG_, LAST_ and CUMU_ features in the database (utils/feature_sql.py) rather than in pandas
+SQL_FEATURES = os.getenv("SQL_FEATURES", "false").lower() == "true"
+
+
+# API CONFIG
+TEAM_CATALOG_REFRESH_SECONDS = int(os.getenv("TEAM_CATALOG_REFRESH_SECONDS", 3600))
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 2))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 20))
+# Serve from a local game_data export (CSV or parquet) instead of PostGreSQL
+GAME_DATA_SNAPSHOT = os.getenv("GAME_DATA_SNAPSHOT")
+# Predictions of every pair of teams, precomputed nightly by pipelines/precompute_matchups.py
+MATCHUP_TABLE_PATH = os.getenv(
+    "MATCHUP_TABLE_PATH", str(pathlib.Path(__file__).parent.parent.resolve() / "artifacts" / "matchups.npz")
+)
+MATCHUP_TABLE_MAX_AGE = int(os.getenv("MATCHUP_TABLE_MAX_AGE", 36 * 3600))  # seconds
+# Per league models kept in memory at once (the global model is always loaded)
+MAX_LOADED_MODELS = int(os.getenv("MAX_LOADED_MODELS", 3))
+# Worker processes of the pre-fork server (gunicorn_conf.py)
+API_WORKERS = int(os.getenv("API_WORKERS", 4))
+# Served predictions, buffered in memory then flushed to rotating files (utils/prediction_log.py)
+PREDICTION_LOG_DIR = os.getenv(
+    "PREDICTION_LOG_DIR", str(pathlib.Path(__file__).parent.parent.resolve() / "artifacts" / "prediction_log")
+)
+PREDICTION_LOG_CAPACITY = int(os.getenv("PREDICTION_LOG_CAPACITY", 10000))  # records, per worker
+PREDICTION_LOG_FLUSH_SECONDS = float(os.getenv("PREDICTION_LOG_FLUSH_SECONDS", 30))
+PREDICTION_LOG_MAX_FILES = int(os.getenv("PREDICTION_LOG_MAX_FILES", 500))
+# Explanations (/explain): per feature contributions computed by batches, precomputed with the matchup table,
+# the live ones kept in memory per model version up to EXPLANATION_CACHE_SIZE games
+EXPLAIN_BATCH_SIZE = int(os.getenv("EXPLAIN_BATCH_SIZE", 1024))
+EXPLANATION_CACHE_SIZE = int(os.getenv("EXPLANATION_CACHE_SIZE", 10000))
+EXPLAIN_TOP_FEATURES = 10
+
+
+# FRONTEND CONFIG
+API_URL = os.getenv("API_URL", "http://game_prediction_api:8080")
+API_TIMEOUT = (3.05, 30)  # (connect, read) in seconds
+API_POOL_SIZE = 10
+METRICS_CACHE_TTL = 3600  # seconds
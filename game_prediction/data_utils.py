@@ -1,7 +1,19 @@
+from collections.abc import Iterator
+from typing import Any, Union
+
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Engine
+
+from game_prediction.config import load_postgres_config
 
-from game_prediction.config import TableMapping
+
+def postgres_engine() -> Engine:
+    """SQLAlchemy engine on the PostGreSQL database."""
+    config = load_postgres_config()
+    conn_string = f'postgresql://{config["user"]}:{config["password"]}@{config["host"]}/{config["database"]}'
+
+    return create_engine(conn_string)
 
 
 def read_data_from_postgres(table_query: str, **kwargs) -> pd.DataFrame:  # type: ignore
@@ -14,10 +26,7 @@ def read_data_from_postgres(table_query: str, **kwargs) -> pd.DataFrame:  # type
         pd.DataFrame: Dataset read from PostGreSQL.
     """
 
-    config = TableMapping.config
-    conn_string = f'postgresql://{config["user"]}:{config["password"]}@{config["host"]}/{config["database"]}'
-
-    db = create_engine(conn_string)
+    db = postgres_engine()
     conn = db.connect()
 
     data = pd.read_sql(table_query, con=conn, **kwargs)
@@ -25,3 +34,101 @@ def read_data_from_postgres(table_query: str, **kwargs) -> pd.DataFrame:  # type
     conn.close()
 
     return data
+
+
+def read_chunks_from_postgres(query: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Read a query result from PostGreSQL by chunks, with a server-side cursor so that only one chunk
+    is held in memory at a time.
+
+    Args:
+        query (str): SQL query.
+        chunksize (int): Rows per chunk.
+
+    Yields:
+        Iterator[pd.DataFrame]: Chunks, in the query order.
+    """
+    with postgres_engine().connect() as conn:
+        yield from pd.read_sql(query, con=conn.execution_options(stream_results=True), chunksize=chunksize)
+
+
+def fetch_rows_from_postgres(query: str, parameters: list[dict[str, Any]]) -> list[list[tuple]]:
+    """Run a parameterized query once per set of values, on a single connection.
+
+    Args:
+        query (str): Query with :name placeholders.
+        parameters (list[dict[str, Any]]): Values bound to the placeholders, one dictionary per run.
+
+    Returns:
+        list[list[tuple]]: Rows of each run.
+    """
+    with postgres_engine().connect() as conn:
+        statement = text(query)
+        return [[tuple(row) for row in conn.execute(statement, values)] for values in parameters]
+
+
+def execute_postgres(statement: str) -> None:
+    """Run a statement returning no rows (e.g. an index creation) on PostGreSQL.
+
+    Args:
+        statement (str): SQL statement.
+    """
+    with postgres_engine().begin() as conn:
+        conn.execute(text(statement))
+
+
+def read_data_from_file(path: str) -> pd.DataFrame:
+    """Read a table export.
+
+    Args:
+        path (str): CSV or parquet file.
+
+    Returns:
+        pd.DataFrame: Dataset read from the file.
+    """
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+
+    # Round trip parsing so that a normalized export holds exactly the values of the raw one
+    return pd.read_csv(path, dtype={"SEASON": str}, float_precision="round_trip")
+
+
+def write_data_to_file(data: pd.DataFrame, path: str) -> None:
+    """Write a table export.
+
+    Args:
+        data (pd.DataFrame): Dataset to write.
+        path (str): CSV or parquet file.
+    """
+    if path.endswith(".parquet"):
+        data.to_parquet(path, index=False)
+    else:
+        data.to_csv(path, index=False)
+
+
+def postgres_table_exists(table: str) -> bool:
+    """Check whether a table exists in PostGreSQL.
+
+    Args:
+        table (str): Name of PostGreSQL table.
+
+    Returns:
+        bool: True when the table exists.
+    """
+    return inspect(postgres_engine()).has_table(table)
+
+
+def write_data_to_postgres(data: pd.DataFrame, table: str, unique_key: Union[list[str], None] = None) -> None:
+    """Append a dataframe to a PostGreSQL table, created on first write.
+
+    Args:
+        data (pd.DataFrame): Rows to write.
+        table (str): Name of PostGreSQL table.
+        unique_key (Union[list[str], None], optional): Columns of a unique index created with the table.
+            Defaults to None.
+    """
+    with postgres_engine().begin() as conn:
+        data.to_sql(table, con=conn, if_exists="append", index=False)
+
+        if unique_key:
+            columns = ", ".join(f'"{column}"' for column in unique_key)
+            conn.execute(text(f'CREATE UNIQUE INDEX IF NOT EXISTS "{table}_key" ON "{table}" ({columns});'))
@@ -1,14 +1,95 @@
-import json
+from typing import Any, Union
 
 import constants as cst
+import pandas as pd
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
 from streamlit_extras.colored_header import colored_header
 from streamlit_extras.metric_cards import style_metric_cards
+from urllib3.util.retry import Retry
 
 from game_prediction.tasks.scoring import load_run_mlflow
 
-metrics = load_run_mlflow(get_metric=True)
+
+@st.cache_data(ttl=cst.METRICS_CACHE_TTL)  # type: ignore
+def get_model_metrics() -> dict[str, float]:
+    """Model metrics from MLFlow, cached across reruns and sessions.
+
+    Returns:
+        dict[str, float]: Metrics of the latest run.
+    """
+    return load_run_mlflow(get_metric=True)  # type: ignore
+
+
+@st.cache_resource  # type: ignore
+def get_api_session() -> requests.Session:
+    """HTTP session shared by every rerun and session, keeping connections to the API alive.
+
+    Returns:
+        requests.Session: Pooled session.
+    """
+    session = requests.Session()
+    retries = Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504], allowed_methods=["GET", "POST"])
+    session.mount("http://", HTTPAdapter(pool_maxsize=cst.API_POOL_SIZE, max_retries=retries))
+
+    return session
+
+
+@st.cache_data(ttl=cst.METRICS_CACHE_TTL)  # type: ignore
+def get_teams() -> list[str]:
+    """Known teams from the API team catalog, cached across reruns and sessions.
+
+    Returns:
+        list[str]: Team names.
+    """
+    res = get_api_session().get(url=f"{cst.API_URL}/teams", timeout=cst.API_TIMEOUT)
+    res.raise_for_status()
+
+    return res.json()  # type: ignore
+
+
+def post_to_api(path: str, body: dict[str, Any]) -> Union[requests.Response, None]:
+    """Call an API endpoint, showing an error instead of failing when the API can not be reached.
+
+    Args:
+        path (str): Endpoint, e.g. "/predict".
+        body (dict[str, Any]): JSON body.
+
+    Returns:
+        Union[requests.Response, None]: API response, None when the request failed.
+    """
+    try:
+        return get_api_session().post(url=f"{cst.API_URL}{path}", json=body, timeout=cst.API_TIMEOUT)
+    except requests.RequestException as error:
+        st.error(f"The prediction API can not be reached: {error}")
+        return None
+
+
+def show_api_error(res: requests.Response) -> None:
+    """Display the error returned by the API, e.g. an unknown team with the closest team names.
+
+    Args:
+        res (requests.Response): Failed API response.
+    """
+    try:
+        detail = res.json().get("detail", res.text)
+    except ValueError:  # Not a JSON body, e.g. a proxy error page
+        detail = res.text
+
+    if isinstance(detail, dict):
+        suggestions = ", ".join(detail.get("suggestions", []))
+        st.error(f"{detail.get('message')}" + (f" Did you mean: {suggestions}?" if suggestions else ""))
+    else:
+        st.error(f"Prediction failed ({res.status_code}): {detail}")
+
+
+metrics = get_model_metrics()
+try:
+    teams = get_teams()
+except requests.RequestException as error:  # Nothing can be predicted without the team names
+    st.error(f"The prediction API can not be reached, please try again later: {error}")
+    st.stop()
 
 # Set the title of the web app page and center it
 st.markdown("<h1 style='text-align: center;'>⚽ GAME PREDICTION ⚽</h1>", unsafe_allow_html=True)
@@ -59,19 +140,50 @@ colored_header(
     description="""Each input are controled to avoid searching for an unexisting team name.""",
 )
 
-# Text input for choosing the home team
-home_team = st.text_input("🏠 Choose the home team you want:", key="home_team", placeholder="Enter Home Team")
+# Searchable select box for choosing the home team
+home_team = st.selectbox(
+    "🏠 Choose the home team you want:", teams, index=None, key="home_team", placeholder="Enter Home Team"
+)
 
-# Text input for choosing the away team
-away_team = st.text_input("🛫 Choose the away team you want:", key="away_team", placeholder="Enter Away Team")
+# Searchable select box for choosing the away team
+away_team = st.selectbox(
+    "🛫 Choose the away team you want:", teams, index=None, key="away_team", placeholder="Enter Away Team"
+)
 
-inputs = {"home_team": home_team.upper(), "away_team": away_team.upper()}
+inputs = {"home_team": home_team, "away_team": away_team}
 
 st.markdown("<br>", unsafe_allow_html=True)
 
-if st.button("PREDICT"):
+if st.button("PREDICT", disabled=not (home_team and away_team)):
     # st.write("Hello")
-    # res = requests.post(url="http://127.0.0.1:8000/predict", data=json.dumps(inputs))
-    res = requests.post(url="http://game_prediction_api:8080/predict", data=json.dumps(inputs))
-    res = json.loads(res.text)["PREDICTION"]
-    st.subheader(f"🎯 Model prediction is : {res}.")
+    # res = requests.post(url="http://127.0.0.1:8000/predict", json=inputs)
+    res = post_to_api("/predict", inputs)
+    if res is not None and res.ok:
+        st.subheader(f"🎯 Model prediction is : {res.json()['PREDICTION']}.")
+    elif res is not None:
+        show_api_error(res)
+
+st.markdown("<br>", unsafe_allow_html=True)
+
+colored_header(
+    label="Or predict a whole matchday : ",
+    description="""Add one row per game, all of them are predicted in a single call.""",
+)
+
+matchday = st.data_editor(
+    pd.DataFrame({"home_team": pd.Series(dtype="str"), "away_team": pd.Series(dtype="str")}),
+    num_rows="dynamic",
+    column_config={
+        "home_team": st.column_config.SelectboxColumn("🏠 Home team", options=teams, required=True),
+        "away_team": st.column_config.SelectboxColumn("🛫 Away team", options=teams, required=True),
+    },
+    key="matchday",
+)
+
+if st.button("PREDICT MATCHDAY"):
+    games = [{"home_team": game.home_team, "away_team": game.away_team} for game in matchday.dropna().itertuples()]
+    res = post_to_api("/predict/batch", {"games": games})
+    if res is not None and res.ok:
+        st.dataframe(pd.DataFrame(res.json()["PREDICTIONS"]), hide_index=True)
+    elif res is not None:
+        show_api_error(res)
@@ -0,0 +1,27 @@
+import gc
+
+import game_prediction.constants as cst
+
+# Pre-fork serving: the model, the game_data snapshot and the matchup table are loaded once in the
+# gunicorn master process, then the uvicorn workers are forked and share these memory pages
+# (copy-on-write) instead of each loading a copy, so memory per worker stays flat as workers are added.
+#
+#     poetry run gunicorn -c game_prediction/gunicorn_conf.py game_prediction.api:app
+
+bind = "0.0.0.0:8080"
+workers = cst.API_WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+# Import the app in the master, the lifespan (database pool, warm-up) still runs in each worker
+preload_app = True
+
+
+def when_ready(server: object) -> None:
+    """Master process hook, run before the workers are forked."""
+    from game_prediction.api import preload_serving_state, startup_timer
+
+    preload_serving_state()
+    print(f"Serving state preloaded (seconds): {startup_timer.report()}")
+
+    # Objects allocated so far are left out of garbage collection: collections in the workers would
+    # otherwise write to their headers and copy the shared pages
+    gc.freeze()
@@ -0,0 +1,185 @@
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter
+from typing import Any, Union
+
+import httpx
+import numpy as np
+
+# Replay `ModelConfig` shaped requests (one JSON object per line,
+# e.g. {"home_team": "MARSEILLE", "away_team": "NANTES"}) against the API, either in-process
+# through an ASGI transport or against a running URL.
+#
+# Examples :
+#     GAME_DATA_SNAPSHOT=game_data.csv python -m game_prediction.load_test requests.jsonl --in-process -c 32
+#     python -m game_prediction.load_test requests.jsonl --url http://localhost:8080 --rate 200 -n 5000
+
+
+def read_requests(path: str) -> list[dict[str, str]]:
+    """Read the requests to replay.
+
+    Args:
+        path (str): JSONL file, one request body per line.
+
+    Returns:
+        list[dict[str, str]]: Request bodies.
+    """
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def build_report(latencies: list[float], statuses: list[Union[int, str]], duration: float) -> dict[str, Any]:
+    """Aggregate the load test results.
+
+    Args:
+        latencies (list[float]): Latency of each request, in seconds.
+        statuses (list[Union[int, str]]): HTTP status code of each request, or the exception name when it failed.
+        duration (float): Wall-clock duration of the test, in seconds.
+
+    Returns:
+        dict[str, Any]: Throughput, latency percentiles (ms) and error counts.
+    """
+    latencies_ms = np.array(latencies) * 1000
+    status_counts = Counter(str(status) for status in statuses)
+    n_errors = sum(count for status, count in status_counts.items() if not status.startswith("2"))
+
+    return {
+        "requests": len(statuses),
+        "errors": n_errors,
+        "status_codes": dict(status_counts),
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(statuses) / duration, 2) if duration else 0.0,
+        "latency_ms": {
+            "mean": round(float(latencies_ms.mean()), 3),
+            "p50": round(float(np.percentile(latencies_ms, 50)), 3),
+            "p95": round(float(np.percentile(latencies_ms, 95)), 3),
+            "p99": round(float(np.percentile(latencies_ms, 99)), 3),
+            "max": round(float(latencies_ms.max()), 3),
+        }
+        if len(latencies)
+        else {},
+    }
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    bodies: list[dict[str, str]],
+    n_requests: int,
+    concurrency: int,
+    rate: float = 0,
+    poisson: bool = False,
+    endpoint: str = "/predict",
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Send `n_requests` requests, cycling through `bodies`.
+
+    With `rate` = 0 the test is closed-loop: `concurrency` clients send requests back to back.
+    Otherwise requests arrive at `rate` per second (evenly spaced, or Poisson arrivals) and at
+    most `concurrency` of them are in flight; latency is then measured from the scheduled
+    arrival so that queuing delay is not hidden.
+
+    Args:
+        client (httpx.AsyncClient): HTTP client on the API.
+        bodies (list[dict[str, str]]): Request bodies to replay.
+        n_requests (int): Number of requests to send.
+        concurrency (int): Maximum number of requests in flight.
+        rate (float, optional): Arrival rate in requests per second, 0 for closed-loop. Defaults to 0.
+        poisson (bool, optional): Exponential inter-arrival times instead of evenly spaced ones. Defaults to False.
+        endpoint (str, optional): Endpoint to call. Defaults to "/predict".
+        seed (int, optional): Seed of the Poisson arrivals. Defaults to 0.
+
+    Returns:
+        dict[str, Any]: Load test report.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    statuses: list[Union[int, str]] = []
+
+    async def send(body: dict[str, str], scheduled: float) -> None:
+        async with semaphore:
+            start = scheduled if rate else time.perf_counter()
+            try:
+                response = await client.post(endpoint, json=body)
+                statuses.append(response.status_code)
+            except httpx.HTTPError as error:
+                statuses.append(type(error).__name__)
+            latencies.append(time.perf_counter() - start)
+
+    request_bodies = list(itertools.islice(itertools.cycle(bodies), n_requests))
+
+    if rate:
+        gaps = (
+            np.random.default_rng(seed).exponential(1 / rate, n_requests) if poisson else np.full(n_requests, 1 / rate)
+        )
+        offsets = np.cumsum(gaps) - gaps[0]
+    else:
+        offsets = np.zeros(n_requests)
+
+    test_start = time.perf_counter()
+    tasks = []
+    for body, offset in zip(request_bodies, offsets):
+        delay = test_start + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(body, test_start + offset)))
+    await asyncio.gather(*tasks)
+
+    return build_report(latencies, statuses, time.perf_counter() - test_start)
+
+
+async def run_load_test(args: argparse.Namespace) -> dict[str, Any]:
+    """Run the load test described by the command line arguments.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+        dict[str, Any]: Load test report.
+    """
+    bodies = read_requests(args.requests)
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    replay_args = (bodies, args.n_requests or len(bodies), args.concurrency, args.rate, args.poisson, args.endpoint)
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=timeout, limits=limits) as client:
+            return await replay(client, *replay_args)
+
+    from game_prediction.api import app
+
+    # ASGITransport does not run the lifespan, so the model and the data source are loaded here
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=timeout) as client:
+            return await replay(client, *replay_args)
+
+
+def parse_args() -> argparse.Namespace:
+    """Command line arguments."""
+    parser = argparse.ArgumentParser(description="Replay prediction requests against the game prediction API.")
+    parser.add_argument("requests", help="JSONL file of ModelConfig shaped requests.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Base URL of a running API, e.g. http://localhost:8080.")
+    target.add_argument("--in-process", action="store_true", help="Run the API in-process through ASGI.")
+    parser.add_argument("-n", "--n-requests", type=int, default=0, help="Requests to send (default: file length).")
+    parser.add_argument("-c", "--concurrency", type=int, default=10, help="Maximum requests in flight.")
+    parser.add_argument("--rate", type=float, default=0, help="Arrival rate (requests/s), 0 for closed-loop.")
+    parser.add_argument("--poisson", action="store_true", help="Poisson arrivals instead of evenly spaced ones.")
+    parser.add_argument("--endpoint", default="/predict", help="Endpoint to call.")
+    parser.add_argument("--timeout", type=float, default=30, help="Request timeout in seconds.")
+    parser.add_argument("--output", help="Write the JSON report to this file as well.")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    report = asyncio.run(run_load_test(arguments))
+
+    print(json.dumps(report, indent=2))
+    if arguments.output:
+        with open(arguments.output, "w") as report_file:
+            json.dump(report, report_file, indent=2)
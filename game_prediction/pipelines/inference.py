@@ -1,14 +1,93 @@
-from typing import Union
+import asyncio
+from typing import TYPE_CHECKING, Union
 
-import xgboost as xgb
+import numpy as np
 
 import game_prediction.constants as cst
-from game_prediction.tasks.prepare_data import build_final_data, load_data
-from game_prediction.tasks.scoring import load_run_mlflow, prepare_data_inference
+from game_prediction.data_utils import fetch_rows_from_postgres
+from game_prediction.tasks.scoring import load_run_mlflow
+from game_prediction.utils.fast_predict import FastPredictor, to_labels
+from game_prediction.utils.feature_sql import team_state_from_rows, team_state_query
+from game_prediction.utils.team_features import TeamState, team_features
+
+if TYPE_CHECKING:
+    import xgboost as xgb
+
+    from game_prediction.async_data_utils import PostgresGameData, SnapshotGameData
+
+
+def game_team_statuses(games: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """(team, status) whose state is needed to predict games: home teams at home, away teams away.
+
+    Args:
+        games (list[tuple[str, str]]): (home team, away team) of each match to predict.
+
+    Returns:
+        list[tuple[str, str]]: Distinct (team, status), sorted.
+    """
+    return sorted({(home_team, "HOME") for home_team, _ in games} | {(away, "AWAY") for _, away in games})
+
+
+def load_team_states(team_statuses: list[tuple[str, str]]) -> dict[tuple[str, str], TeamState]:
+    """Read the state of teams with the parameterized team state query: only the columns the features need,
+    for the last N_GAMES_AVG games and a totals row per team.
+
+    Args:
+        team_statuses (list[tuple[str, str]]): (team, status) to read, see game_team_statuses.
+
+    Returns:
+        dict[tuple[str, str], TeamState]: States indexed by (team, status).
+    """
+    rows = fetch_rows_from_postgres(
+        team_state_query(cst.GAME_DATA_TABLE, ":team", ":status"),
+        [{"team": team, "status": status} for team, status in team_statuses],
+    )
+
+    return {team_status: team_state_from_rows(team_rows) for team_status, team_rows in zip(team_statuses, rows)}
+
+
+def predict_proba_from_states(
+    games: list[tuple[str, str]], states: dict[tuple[str, str], TeamState], predictor: FastPredictor
+) -> tuple[np.ndarray, np.ndarray]:
+    """Predict games from the states of their teams, features being computed with NumPy.
+
+    Args:
+        games (list[tuple[str, str]]): (home team, away team) of each match to predict.
+        states (dict[tuple[str, str], TeamState]): States indexed by (team, status).
+        predictor (FastPredictor): Loaded model.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Model inputs, shape (n_games, n_features), and class probabilities,
+            shape (n_games, n_classes), in the same order as `games`.
+    """
+    features = {team_status: team_features(state) for team_status, state in states.items()}
+
+    inputs = predictor.layout.match_features(
+        np.stack([features[(home_team, "HOME")] for home_team, _ in games]),
+        np.stack([features[(away_team, "AWAY")] for _, away_team in games]),
+    )
+
+    return inputs, predictor.predict_proba(inputs)
+
+
+def predict_from_states(
+    games: list[tuple[str, str]], states: dict[tuple[str, str], TeamState], predictor: FastPredictor
+) -> list[str]:
+    """Same as predict_proba_from_states, returning the predicted labels.
+
+    Args:
+        games (list[tuple[str, str]]): (home team, away team) of each match to predict.
+        states (dict[tuple[str, str], TeamState]): States indexed by (team, status).
+        predictor (FastPredictor): Loaded model.
+
+    Returns:
+        list[str]: Model predictions, in the same order as `games`.
+    """
+    return to_labels(predict_proba_from_states(games, states, predictor)[1])
 
 
 def inference(
-    home_team: str, away_team: str, load_model: bool = False, loaded_model: Union[None, xgb.XGBClassifier] = None
+    home_team: str, away_team: str, load_model: bool = False, loaded_model: Union[None, "xgb.XGBClassifier"] = None
 ) -> str:
     """Run model (interfaced through API)
 
@@ -21,27 +100,54 @@ def inference(
     Returns:
         str: Model prediction.
     """
+    return inference_batch([(home_team, away_team)], load_model=load_model, loaded_model=loaded_model)[0]
 
-    # mlflow.set_tracking_uri(uri="http://127.0.0.1:8080")
 
-    home_team, away_team = "MARSEILLE", "NANTES"
+def inference_batch(
+    games: list[tuple[str, str]], load_model: bool = False, loaded_model: Union[None, "xgb.XGBClassifier"] = None
+) -> list[str]:
+    """Run model on several games at once (e.g. a whole matchday) with a single prediction call, reading only
+    the few rows needed per team.
+
+    Args:
+        games (list[tuple[str, str]]): (home team, away team) of each match to predict.
+        load_model (bool, optional): load model from mlflow registry. Defaults to False.
+        loaded_model (Union[None, xgb.XGBClassifier], optional): use pre existing model. Defaults to None.
+
+    Returns:
+        list[str]: Model predictions, in the same order as `games`.
+    """
+
+    # mlflow.set_tracking_uri(uri="http://127.0.0.1:8080")
 
     if load_model:
         loaded_model = load_run_mlflow()
 
-    table_query = f"""SELECT *
-                FROM game_data
-                WHERE "TEAM" IN ('{home_team}', '{away_team}');
-                """
-    inference_data = load_data(table_query)
+    states = load_team_states(game_team_statuses(games))
+
+    return predict_from_states(games, states, FastPredictor(loaded_model))
+
 
-    inference_data = build_final_data(inference_data)
+async def inference_batch_proba_async(
+    games: list[tuple[str, str]],
+    source: "PostgresGameData | SnapshotGameData",
+    predictor: FastPredictor,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Run model on several games through the async data access path: only the few rows needed
+    per team are read, concurrently, and features are computed with NumPy.
 
-    inference_data = prepare_data_inference(inference_data, home_team, away_team)
+    Args:
+        games (list[tuple[str, str]]): (home team, away team) of each match to predict.
+        source (PostgresGameData | SnapshotGameData): game_data source.
+        predictor (FastPredictor): Loaded model.
 
-    prediction = loaded_model.predict(inference_data.drop(["ID_GAME", "TARGET"], axis=1))[0]  # type: ignore
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Model inputs and class probabilities, in the same order as `games`.
+    """
+    team_statuses = game_team_statuses(games)
+    states = await asyncio.gather(*(source.team_state(team, status) for team, status in team_statuses))
 
-    return cst.LABEL_CONVERTED_INV[prediction]
+    return predict_proba_from_states(games, dict(zip(team_statuses, states)), predictor)
 
 
 if __name__ == "__main__":
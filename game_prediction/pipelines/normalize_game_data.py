@@ -0,0 +1,90 @@
+import argparse
+
+from game_prediction.config import TableMapping, Tables
+from game_prediction.data_utils import (
+    execute_postgres,
+    postgres_table_exists,
+    read_data_from_file,
+    read_data_from_postgres,
+    write_data_to_file,
+    write_data_to_postgres,
+)
+from game_prediction.utils.feature_sql import TEAM_GAME_DATE_INDEX_SQL
+from game_prediction.utils.preprocessing import normalize_game_data
+
+# Ingestion stage: parse the string encoded statistics of game_data ("45%", "12 of 20") once, into the
+# typed columns of game_data_normalized read by training and serving (GAME_DATA_TABLE). Run it after
+# each scraping, only the rows not normalized yet are parsed, as one batch :
+#
+#     poetry run python -m game_prediction.pipelines.normalize_game_data
+#
+# A game_data snapshot (GAME_DATA_SNAPSHOT) is normalized the same way :
+#
+#     poetry run python -m game_prediction.pipelines.normalize_game_data --snapshot game_data.csv normalized.csv
+
+
+def new_games_query() -> str:
+    """Query reading the game_data rows missing from the normalized table.
+
+    Returns:
+        str: SQL query, or the raw table name when nothing was normalized yet.
+    """
+    raw_table, normalized_table = Tables.GAME_DATA.value, Tables.GAME_DATA_NORMALIZED.value
+    if not postgres_table_exists(normalized_table):
+        return raw_table
+
+    return f"""SELECT raw.*
+        FROM {raw_table} raw
+        WHERE NOT EXISTS (
+            SELECT 1 FROM {normalized_table} normalized
+            WHERE normalized."ID_GAME" = raw."ID_GAME" AND normalized."TEAM" = raw."TEAM"
+        );"""
+
+
+def normalize_new_games() -> int:
+    """Normalize the new game_data rows and append them to the normalized table.
+
+    Returns:
+        int: Number of rows normalized.
+    """
+    table_mapper = TableMapping().get_table_info(Tables.GAME_DATA)
+
+    new_games = read_data_from_postgres(new_games_query())
+    if new_games.empty:
+        return 0
+
+    write_data_to_postgres(
+        normalize_game_data(new_games, table_mapper), Tables.GAME_DATA_NORMALIZED.value, table_mapper.primary_key
+    )
+    # Inference reads the last games of a team
+    execute_postgres(TEAM_GAME_DATE_INDEX_SQL.format(table=Tables.GAME_DATA_NORMALIZED.value))
+
+    return len(new_games)
+
+
+def normalize_snapshot(path: str, output: str) -> int:
+    """Normalize a game_data snapshot.
+
+    Args:
+        path (str): Raw snapshot, CSV or parquet file.
+        output (str): Normalized snapshot, CSV or parquet file.
+
+    Returns:
+        int: Number of rows normalized.
+    """
+    game_data = read_data_from_file(path)
+    write_data_to_file(normalize_game_data(game_data, TableMapping().get_table_info(Tables.GAME_DATA)), output)
+
+    return len(game_data)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalize the string encoded statistics of game_data.")
+    parser.add_argument("--snapshot", nargs=2, metavar=("INPUT", "OUTPUT"), help="Normalize a snapshot file instead.")
+    arguments = parser.parse_args()
+
+    if arguments.snapshot:
+        n_rows = normalize_snapshot(*arguments.snapshot)
+    else:
+        n_rows = normalize_new_games()
+    print(f"{n_rows} game_data rows normalized.")
@@ -0,0 +1,40 @@
+from typing import TYPE_CHECKING, cast
+
+import numpy as np
+
+import game_prediction.constants as cst
+from game_prediction.data_utils import read_data_from_postgres
+from game_prediction.tasks.matchups import compute_matchup_table
+from game_prediction.tasks.scoring import load_run_mlflow
+from game_prediction.utils.team_catalog import find_leagues
+from game_prediction.utils.team_features import team_states_from_frame
+
+if TYPE_CHECKING:
+    import xgboost as xgb
+
+
+def precompute_matchups(path: str = cst.MATCHUP_TABLE_PATH) -> None:
+    """Predict every ordered pair of teams of each league with the current model and store the
+    probabilities and their explanations (see utils/explanations.py) in the matchup table read by the API.
+    Meant to run nightly, e.g. with cron :
+
+        0 4 * * * cd /code && poetry run python -m game_prediction.pipelines.precompute_matchups
+
+    Args:
+        path (str, optional): Matchup table file. Defaults to cst.MATCHUP_TABLE_PATH.
+    """
+    loaded_model, run_id = cast(tuple["xgb.XGBClassifier", str], load_run_mlflow(return_run_id=True))
+
+    game_data = read_data_from_postgres(cst.GAME_DATA_TABLE)
+
+    matchup_table = compute_matchup_table(
+        loaded_model, team_states_from_frame(game_data), find_leagues(game_data), run_id, explain=True
+    )
+    matchup_table.save(path)
+
+    n_pairs = int((~np.isnan(matchup_table.probabilities[..., 0])).sum())
+    print(f"{n_pairs} matchups of {len(set(matchup_table.leagues))} leagues saved to {path} (run {run_id}).")
+
+
+if __name__ == "__main__":
+    precompute_matchups()
@@ -0,0 +1,163 @@
+import argparse
+from typing import TYPE_CHECKING, Union, cast
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+import game_prediction.constants as cst
+from game_prediction.data_utils import read_data_from_file, read_data_from_postgres, write_data_to_file
+from game_prediction.tasks.matchups import compute_matchup_table
+from game_prediction.tasks.scoring import list_model_names, load_run_mlflow
+from game_prediction.tasks.season_simulation import (
+    remaining_fixtures,
+    season_points,
+    simulate_seasons_parallel,
+    summarize_seasons,
+)
+from game_prediction.utils.team_catalog import find_leagues
+from game_prediction.utils.team_features import team_states_from_frame
+from game_prediction.utils.timing import PhaseTimer
+
+if TYPE_CHECKING:
+    import xgboost as xgb
+
+# Final table probabilities of a league (title, European spots, relegation): the remaining fixtures are
+# predicted by the league model (the global one when the league has none) and the season is simulated
+# SEASON_SIMULATIONS times :
+#
+#     poetry run python -m game_prediction.pipelines.simulate_season --league LEAGUE_ANGERS --workers 4
+#
+# Without --fixtures (CSV of home_team, away_team), the remaining fixtures are the double round robin
+# games of the season not played yet.
+
+
+def fixture_probabilities(
+    game_data: pd.DataFrame, fixtures: list[tuple[str, str]], league: str, teams: list[str]
+) -> npt.NDArray[np.float64]:
+    """Class probabilities of each fixture, as served by the API.
+
+    Args:
+        game_data (pd.DataFrame): game_data table.
+        fixtures (list[tuple[str, str]]): (home team, away team) of each fixture.
+        league (str): League of the teams.
+        teams (list[str]): Teams of the league this season.
+
+    Returns:
+        npt.NDArray[np.float64]: Class probabilities, shape (n_fixtures, n_classes).
+    """
+    league_model = cst.SEGMENT_MODEL_NAME.format(segment=league)
+    model_name = league_model if league_model in list_model_names() else cst.MODEL_NAME
+    loaded_model, run_id = cast(
+        tuple["xgb.XGBClassifier", str], load_run_mlflow(return_run_id=True, model_name=model_name)
+    )
+
+    matchup_table = compute_matchup_table(
+        loaded_model, team_states_from_frame(game_data), {team: league for team in teams}, run_id
+    )
+
+    # Teams without enough games yet (e.g. promoted teams) get the observed results distribution
+    results = game_data.drop_duplicates("ID_GAME")["FINAL_RESULT_STATUS"].map(cst.LABEL_CONVERTED)
+    default = np.bincount(results, minlength=len(cst.LABEL_CONVERTED)) / len(results)
+
+    probabilities = [matchup_table.lookup(home_team, away_team) for home_team, away_team in fixtures]
+    n_missing = sum(fixture is None for fixture in probabilities)
+    if n_missing:
+        print(f"{n_missing} fixtures without prediction use the observed results distribution.")
+
+    print(f"{len(fixtures)} fixtures predicted with {model_name} (run {run_id}).")
+
+    return np.array([default if fixture is None else fixture for fixture in probabilities])
+
+
+def simulate_season(
+    league: str,
+    season: Union[str, None] = None,
+    fixtures_path: Union[str, None] = None,
+    n_simulations: int = cst.SEASON_SIMULATIONS,
+    n_workers: int = 1,
+    european_spots: int = cst.EUROPEAN_SPOTS,
+    relegation_spots: int = cst.RELEGATION_SPOTS,
+) -> pd.DataFrame:
+    """Simulate the end of a season from the games already played and the model predictions.
+
+    Args:
+        league (str): League, as named by find_leagues.
+        season (Union[str, None], optional): Season. Defaults to None (latest season of the league).
+        fixtures_path (Union[str, None], optional): CSV of the remaining fixtures. Defaults to None (double round
+            robin games not played yet).
+        n_simulations (int, optional): Simulated seasons. Defaults to cst.SEASON_SIMULATIONS.
+        n_workers (int, optional): Worker processes. Defaults to 1.
+        european_spots (int, optional): Positions qualifying for Europe. Defaults to cst.EUROPEAN_SPOTS.
+        relegation_spots (int, optional): Positions relegated. Defaults to cst.RELEGATION_SPOTS.
+
+    Raises:
+        ValueError: When the league is unknown.
+
+    Returns:
+        pd.DataFrame: Final table probabilities, see summarize_seasons.
+    """
+    timer = PhaseTimer()
+
+    with timer.phase("load"):
+        game_data = read_data_from_postgres(cst.GAME_DATA_TABLE)
+        leagues = find_leagues(game_data)
+        if league not in leagues.values():
+            raise ValueError(f"Unknown league {league}, known leagues: {sorted(set(leagues.values()))}.")
+
+        league_games = game_data[game_data["TEAM"].map(leagues) == league]
+        season = season or str(league_games["SEASON"].astype(str).max())
+        season_games = league_games[league_games["SEASON"].astype(str) == season]
+
+        if fixtures_path:
+            fixture_rows = read_data_from_file(fixtures_path)
+            fixtures = list(zip(fixture_rows["home_team"], fixture_rows["away_team"]))
+        else:
+            fixtures = remaining_fixtures(season_games, sorted(season_games["TEAM"].unique()))
+        teams = sorted(set(season_games["TEAM"]) | {team for fixture in fixtures for team in fixture})
+
+    with timer.phase("predict"):
+        probabilities = fixture_probabilities(game_data, fixtures, league, teams)
+
+    with timer.phase("simulate"):
+        team_index = {team: index for index, team in enumerate(teams)}
+        counts = simulate_seasons_parallel(
+            probabilities,
+            np.array([team_index[home_team] for home_team, _ in fixtures]),
+            np.array([team_index[away_team] for _, away_team in fixtures]),
+            season_points(season_games).reindex(teams, fill_value=0).to_numpy(dtype=np.float32),
+            n_simulations,
+            n_workers,
+        )
+        summary = summarize_seasons(teams, counts, european_spots, relegation_spots)
+
+    print(f"{league} {season}: {len(fixtures)} remaining fixtures, {n_simulations} simulations.")
+    print(summary.iloc[:, :9].round(3).to_string(index=False))
+    print(f"Time spent (seconds): {timer.report()}")
+
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate the end of a season of a league.")
+    parser.add_argument("--league", required=True, help="League, e.g. LEAGUE_ANGERS.")
+    parser.add_argument("--season", help="Season (default: latest season of the league).")
+    parser.add_argument("--fixtures", help="CSV of the remaining fixtures, with home_team and away_team columns.")
+    parser.add_argument("--simulations", type=int, default=cst.SEASON_SIMULATIONS, help="Simulated seasons.")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes.")
+    parser.add_argument("--european-spots", type=int, default=cst.EUROPEAN_SPOTS)
+    parser.add_argument("--relegation-spots", type=int, default=cst.RELEGATION_SPOTS)
+    parser.add_argument("--output", help="Write the final table probabilities to this CSV or parquet file.")
+    arguments = parser.parse_args()
+
+    final_table = simulate_season(
+        arguments.league,
+        season=arguments.season,
+        fixtures_path=arguments.fixtures,
+        n_simulations=arguments.simulations,
+        n_workers=arguments.workers,
+        european_spots=arguments.european_spots,
+        relegation_spots=arguments.relegation_spots,
+    )
+    if arguments.output:
+        write_data_to_file(final_table, arguments.output)
@@ -1,33 +1,92 @@
+import argparse
+from typing import Union
+
+import pandas as pd
+
+import game_prediction.constants as cst
 from game_prediction.tasks.model_performance import evaluate_model, evaluate_random_model
-from game_prediction.tasks.prepare_data import build_final_data, load_data, prepare_data_model, split_data
+from game_prediction.tasks.prepare_data import (
+    build_final_data,
+    game_dates,
+    game_segments,
+    load_data,
+    prepare_data_model,
+    split_data,
+)
 from game_prediction.tasks.saving import save_to_mlflow
+from game_prediction.tasks.tracking import flush_tracking, replay_buffered_runs
 from game_prediction.tasks.train_model import train_model
 
 
-def train() -> None:
+def fit_and_save(
+    df_model_final: pd.DataFrame, model_name: str = cst.MODEL_NAME, tags: Union[dict[str, str], None] = None
+) -> None:
+    """Split, train, evaluate a model and save it to MLFlow.
+
+    Args:
+        df_model_final (pd.DataFrame): Final dataset, one row per game.
+        model_name (str, optional): Name the model is logged under. Defaults to cst.MODEL_NAME.
+        tags (Union[dict[str, str], None], optional): Extra run tags. Defaults to None.
+    """
+    X_train, X_test, y_train, y_test = split_data(df_model_final)
+
+    model_fitted, signature = train_model(X_train, y_train)
+
+    model_report = evaluate_model(model_fitted, X_test, y_test)
+
+    model_report_random = evaluate_random_model(y_test)
+
+    # Incremental trainings (pipelines/train_incremental.py) start from the games played after this date
+    tags = {"trained_until": game_dates(df_model_final).max(), **(tags or {})}
+
+    save_to_mlflow(model_fitted, signature, model_report, model_report_random, model_name=model_name, tags=tags)
+
+
+def train(split_by: Union[str, None] = None) -> None:
     """Load data from PostGresSQL, run feature engineering
     and train a XGBoost model before saving to MLFlow.
+
+    Args:
+        split_by (Union[str, None], optional): Also train one model per "league" or per "season",
+            logged as cst.SEGMENT_MODEL_NAME. Defaults to None (global model only).
     """
 
+    n_replayed = replay_buffered_runs()
+    if n_replayed:
+        print(f"{n_replayed} runs buffered by previous trainings logged to MLFlow.")
+
     game_data = load_data()
 
+    segments = game_segments(game_data, split_by) if split_by else None
+
     game_data = build_final_data(game_data)
 
     df_model_final = prepare_data_model(game_data)
 
-    X_train, X_test, y_train, y_test = split_data(df_model_final)
-
-    model_fitted, signature = train_model(X_train, y_train)
+    # The global model is always trained, it serves the games no segment model covers
+    fit_and_save(df_model_final)
 
-    model_report = evaluate_model(model_fitted, X_test, y_test)
+    if segments is not None:
+        for segment, segment_data in df_model_final.groupby(df_model_final["ID_GAME"].map(segments)):
+            if len(segment_data) < cst.MIN_SEGMENT_GAMES:
+                print(f"Skipping {split_by} {segment}: {len(segment_data)} games (< {cst.MIN_SEGMENT_GAMES}).")
+                continue
 
-    model_report_random = evaluate_random_model(y_test)
+            fit_and_save(
+                segment_data,
+                model_name=cst.SEGMENT_MODEL_NAME.format(segment=segment),
+                tags={"split_by": split_by, "segment": str(segment)},
+            )
 
-    save_to_mlflow(model_fitted, signature, model_report, model_report_random)
+    # Runs are logged in the background while the next models train
+    flush_tracking()
 
 
 # mlflow server --host 127.0.0.1 --port 8080
 # Set our tracking server uri for logging
 
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser(description="Train the game prediction model.")
+    parser.add_argument("--split-by", choices=cst.SEGMENT_SPLITS, help="Also train one model per league or season.")
+
+    train(split_by=parser.parse_args().split_by)
@@ -0,0 +1,146 @@
+import argparse
+import os
+import resource
+import tempfile
+from typing import Any, Union
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from mlflow.models import infer_signature
+
+import game_prediction.constants as cst
+from game_prediction.tasks.feature_chunks import (
+    chunk_paths,
+    external_memory_matrix,
+    load_chunk,
+    stream_model_chunks,
+    write_feature_chunks,
+)
+from game_prediction.tasks.model_performance import Evaluation, evaluate_random_model, format_report
+from game_prediction.tasks.saving import save_to_mlflow
+from game_prediction.tasks.tracking import flush_tracking, replay_buffered_runs
+from game_prediction.tasks.train_model import classifier_from_booster
+from game_prediction.utils.timing import PhaseTimer
+
+# Train the global model without holding the training matrix in memory: features are computed by the
+# database (utils/feature_sql.py), read by chunks and saved to chunk files, that XGBoost quantizes into an
+# external memory matrix cached on disk. Peak memory depends on the chunk size, not on the dataset size.
+#
+#     poetry run python -m game_prediction.pipelines.train_external_memory --chunks-dir artifacts/features --compare
+#
+# --compare also fits the usual in-memory model on the same games and reports both, which defeats the purpose
+# on a dataset that does not fit in memory.
+
+
+def peak_memory_mb() -> float:
+    """Peak resident memory of the process so far, in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def predict_chunks(model: xgb.XGBClassifier, paths: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Predict chunk files one at a time.
+
+    Args:
+        model (xgb.XGBClassifier): Fitted model.
+        paths (list[str]): Chunk files.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: True classes and predicted class probabilities.
+    """
+    y_true, probabilities = [], []
+    for path in paths:
+        X, y, _, _ = load_chunk(path)
+        y_true.append(y)
+        probabilities.append(model.get_booster().inplace_predict(X))
+
+    return np.concatenate(y_true), np.concatenate(probabilities)
+
+
+def fit_in_memory(paths: list[str]) -> xgb.XGBClassifier:
+    """Reference fit on all the train chunks loaded at once, with the same parameters.
+
+    Args:
+        paths (list[str]): Train chunk files.
+
+    Returns:
+        xgb.XGBClassifier: Fitted model.
+    """
+    chunks = [load_chunk(path) for path in paths]
+    X = pd.DataFrame(np.concatenate([X for X, _, _, _ in chunks]), columns=chunks[0][2])
+    y = np.concatenate([y for _, y, _, _ in chunks])
+
+    return xgb.XGBClassifier(n_estimators=cst.EXTERNAL_MEMORY_ROUNDS, tree_method="hist").fit(X, y)
+
+
+def train_external_memory(
+    chunks_dir: Union[str, None] = None, chunksize: int = cst.FEATURE_CHUNK_ROWS, compare: bool = False
+) -> dict[str, Any]:
+    """Train the global model from feature chunk files and save it to MLFlow.
+
+    Args:
+        chunks_dir (Union[str, None], optional): Directory of the chunk files, read from the database when it
+            holds none. Defaults to None (temporary directory).
+        chunksize (int, optional): Feature rows read from the database at once. Defaults to cst.FEATURE_CHUNK_ROWS.
+        compare (bool, optional): Also fit the model in memory and report both. Defaults to False.
+
+    Returns:
+        dict[str, Any]: Test accuracy and log-loss of each fit, peak memory (MB) and time spent in each phase.
+    """
+    timer = PhaseTimer()
+
+    n_replayed = replay_buffered_runs()
+    if n_replayed:
+        print(f"{n_replayed} runs buffered by previous trainings logged to MLFlow.")
+
+    with tempfile.TemporaryDirectory() as temporary_dir:
+        chunks_dir = chunks_dir or temporary_dir
+
+        with timer.phase("features"):
+            if not chunk_paths(chunks_dir, "train"):
+                write_feature_chunks(stream_model_chunks(chunksize), chunks_dir)
+        train_paths, test_paths = chunk_paths(chunks_dir, "train"), chunk_paths(chunks_dir, "test")
+
+        with timer.phase("fit"):
+            matrix = external_memory_matrix(train_paths, cache_prefix=os.path.join(temporary_dir, "cache"))
+            params = {"objective": "multi:softprob", "num_class": len(cst.LABEL_CONVERTED), "tree_method": "hist"}
+            model = classifier_from_booster(xgb.train(params, matrix, num_boost_round=cst.EXTERNAL_MEMORY_ROUNDS))
+            del matrix
+
+        with timer.phase("evaluate"):
+            y_test, probabilities = predict_chunks(model, test_paths)
+            model_report = Evaluation(y_test, probabilities).report()
+            print(format_report(model_report))
+            model_report_random = evaluate_random_model(pd.Series(y_test))
+
+        results = {
+            "external_memory": {key: model_report["overall"][key] for key in ("accuracy", "log_loss")},
+            "peak_memory_mb": peak_memory_mb(),
+        }
+
+        with timer.phase("tracking"):
+            X_sample, _, columns, game_ids = load_chunk(train_paths[-1])
+            signature = infer_signature(pd.DataFrame(X_sample, columns=columns), model.predict(X_sample))
+            tags = {"trained_until": max(game_id[-8:] for game_id in game_ids), "training": "external_memory"}
+            save_to_mlflow(model, signature, model_report, model_report_random, tags=tags)
+            flush_tracking()
+
+        if compare:
+            with timer.phase("in_memory_fit"):
+                in_memory_report = Evaluation(*predict_chunks(fit_in_memory(train_paths), test_paths)).report()
+            results["in_memory"] = {key: in_memory_report["overall"][key] for key in ("accuracy", "log_loss")}
+
+    results.update(timer.report())
+    print(results)
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the game prediction model from feature chunks.")
+    parser.add_argument("--chunks-dir", help="Directory of the feature chunk files, written when empty.")
+    parser.add_argument("--chunksize", type=int, default=cst.FEATURE_CHUNK_ROWS, help="Feature rows per chunk.")
+    parser.add_argument("--compare", action="store_true", help="Also fit the model in memory and report both.")
+    arguments = parser.parse_args()
+
+    train_external_memory(chunks_dir=arguments.chunks_dir, chunksize=arguments.chunksize, compare=arguments.compare)
@@ -0,0 +1,119 @@
+import argparse
+from typing import Union
+
+import game_prediction.constants as cst
+from game_prediction.tasks.model_performance import Evaluation, evaluate_model, evaluate_random_model
+from game_prediction.tasks.prepare_data import (
+    build_final_data,
+    game_dates,
+    game_segments,
+    load_data,
+    prepare_data_model,
+    split_features,
+)
+from game_prediction.tasks.saving import save_to_mlflow
+from game_prediction.tasks.scoring import load_run_mlflow, load_run_tags
+from game_prediction.tasks.tracking import flush_tracking, replay_buffered_runs
+from game_prediction.tasks.train_model import continue_training
+
+# Update the latest model on the games played since it was trained (its trained_until tag) instead of
+# retraining from scratch, e.g. after each matchday. The updated model is compared with the previous one
+# on new games neither was trained on, and registered only when it is not worse, after updating it on all
+# the new games (holdout included, as trained_until moves past them):
+#
+#     poetry run python -m game_prediction.pipelines.train_incremental --mode boost
+#
+# Features still need the history of every team, only the fit and the evaluation scale with the new games.
+
+
+def train_incremental(
+    mode: str = "boost", model_name: str = cst.MODEL_NAME, since: Union[str, None] = None
+) -> Union[dict[str, float], None]:
+    """Update a model on the new games, and register it when its holdout log-loss is not worse. The registered
+    model is updated on all the new games, the holdout included, since later updates start after them.
+
+    Args:
+        mode (str, optional): "boost" or "refresh", see continue_training. Defaults to "boost".
+        model_name (str, optional): Model to update, the global one or a per segment one.
+            Defaults to cst.MODEL_NAME.
+        since (Union[str, None], optional): Games played after this date (YYYYMMDD) are new. Defaults to None
+            (trained_until tag of the model's run).
+
+    Raises:
+        ValueError: When the run has no trained_until tag and `since` is not given.
+
+    Returns:
+        Union[dict[str, float], None]: Holdout log-loss of the previous and the updated model, None when there
+            are not enough new games.
+    """
+    n_replayed = replay_buffered_runs()
+    if n_replayed:
+        print(f"{n_replayed} runs buffered by previous trainings logged to MLFlow.")
+
+    previous_model, run_id = load_run_mlflow(return_run_id=True, model_name=model_name)
+    run_tags = load_run_tags(model_name)
+
+    since = since or run_tags.get("trained_until")
+    if since is None:
+        raise ValueError(f"Run {run_id} has no trained_until tag, give the date of its last game with --since.")
+
+    game_data = load_data()
+    df_model_final = prepare_data_model(build_final_data(game_data))
+
+    # Per segment models are updated on the new games of their segment only
+    segment_tags = {key: run_tags[key] for key in ("split_by", "segment") if key in run_tags}
+    if segment_tags:
+        segments = game_segments(game_data, segment_tags["split_by"]).astype(str)
+        df_model_final = df_model_final[df_model_final["ID_GAME"].map(segments) == segment_tags["segment"]]
+
+    dates = game_dates(df_model_final)
+    new_games = df_model_final[dates > since]
+    if len(new_games) < cst.MIN_INCREMENTAL_GAMES:
+        print(f"{len(new_games)} new games since {since} (< {cst.MIN_INCREMENTAL_GAMES}), {model_name} kept.")
+        return None
+
+    X = new_games[previous_model.get_booster().feature_names]
+    y = new_games["TARGET"].replace(cst.LABEL_CONVERTED)
+    X_train, X_test, y_train, y_test = split_features(X, y, test_size=cst.INCREMENTAL_HOLDOUT_SIZE)
+
+    model_updated, signature = continue_training(previous_model, X_train, y_train, mode=mode)
+
+    log_losses = {
+        "previous_log_loss": float(Evaluation.from_model(previous_model, X_test, y_test).log_losses().mean()),
+        "updated_log_loss": float(Evaluation.from_model(model_updated, X_test, y_test).log_losses().mean()),
+    }
+    print(
+        f"{model_name} {mode} on {len(X_train)} new games, holdout of {len(X_test)} games: "
+        f"log-loss {log_losses['previous_log_loss']:.4f} -> {log_losses['updated_log_loss']:.4f}"
+    )
+
+    if log_losses["updated_log_loss"] > log_losses["previous_log_loss"]:
+        print(f"Updated model is worse on the holdout, {model_name} kept.")
+        return log_losses
+
+    model_report = evaluate_model(model_updated, X_test, y_test)
+    model_report_random = evaluate_random_model(y_test)
+
+    # The holdout only validated the update: the registered model is trained on every new game
+    model_updated, signature = continue_training(previous_model, X, y, mode=mode)
+
+    tags = {
+        **segment_tags,
+        "trained_until": dates.max(),
+        "incremental": mode,
+        "parent_run_id": run_id,
+    }
+    save_to_mlflow(model_updated, signature, model_report, model_report_random, model_name=model_name, tags=tags)
+    flush_tracking()
+
+    return log_losses
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update the latest model on the games played since its training.")
+    parser.add_argument("--mode", choices=cst.INCREMENTAL_MODES, default="boost", help="Add trees or refresh leaves.")
+    parser.add_argument("--model-name", default=cst.MODEL_NAME, help="Model to update (default: global model).")
+    parser.add_argument("--since", help="Date (YYYYMMDD) of the last game the model was trained on.")
+    arguments = parser.parse_args()
+
+    train_incremental(mode=arguments.mode, model_name=arguments.model_name, since=arguments.since)
@@ -0,0 +1,264 @@
+import argparse
+import multiprocessing
+import os
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, NamedTuple, Union
+
+import numpy as np
+import pandas as pd
+
+import game_prediction.constants as cst
+from game_prediction.tasks.model_performance import evaluate_model, evaluate_random_model
+from game_prediction.tasks.prepare_data import (
+    build_final_data,
+    game_dates,
+    game_segments,
+    load_data,
+    prepare_data_model,
+    split_features,
+)
+from game_prediction.tasks.saving import save_to_mlflow
+from game_prediction.tasks.tracking import flush_tracking, replay_buffered_runs
+from game_prediction.tasks.train_model import train_model
+from game_prediction.utils.timing import PhaseTimer
+
+# Train the global model and the per league / per season models in parallel. Data is loaded and
+# featurized once, the feature matrix is written to shared memory (/dev/shm) and memory-mapped by
+# every worker, which only copies the rows of the segment it trains on.
+#
+#     poetry run python -m game_prediction.pipelines.train_parallel --split-by league season --workers 4
+
+# Shared memory of the feature matrix, removed once every model is trained (a temporary directory otherwise)
+SHARED_MEMORY_DIR = "/dev/shm"
+
+
+class TrainingJob(NamedTuple):
+    """One model to train."""
+
+    model_name: str
+    tags: dict[str, str]
+    rows: np.ndarray  # Rows of the shared feature matrix
+
+
+# Feature matrix of a worker process, set by attach_shared_data
+shared_data: dict[str, Any] = {}
+
+
+def attach_shared_data(directory: str, columns: list[str], n_jobs: int) -> None:
+    """Process pool initializer: memory-map the feature matrix written by the parent process.
+
+    Args:
+        directory (str): Directory holding X.npy and y.npy.
+        columns (list[str]): Names of the explicative variables.
+        n_jobs (int): XGBoost threads of this worker.
+    """
+    shared_data["X"] = np.load(os.path.join(directory, "X.npy"), mmap_mode="r")
+    shared_data["y"] = np.load(os.path.join(directory, "y.npy"), mmap_mode="r")
+    shared_data["columns"] = columns
+    shared_data["n_jobs"] = n_jobs
+
+
+def job_data(job: TrainingJob) -> tuple[pd.DataFrame, pd.Series]:
+    """Copy the rows of a job out of the shared feature matrix, in a worker process.
+
+    Args:
+        job (TrainingJob): Model to train.
+
+    Returns:
+        tuple[pd.DataFrame, pd.Series]: Explicative variables and target of the job's games.
+    """
+    X = pd.DataFrame(shared_data["X"][job.rows], columns=shared_data["columns"])
+    y = pd.Series(shared_data["y"][job.rows])
+
+    return X, y
+
+
+def run_training_job(job: TrainingJob) -> dict[str, Any]:
+    """Split, train, evaluate a model and save it to MLFlow, in a worker process.
+
+    Args:
+        job (TrainingJob): Model to train.
+
+    Returns:
+        dict[str, Any]: Model name, games, test accuracy and time spent in each phase.
+    """
+    timer = PhaseTimer()
+
+    with timer.phase("data"):
+        X, y = job_data(job)
+        X_train, X_test, y_train, y_test = split_features(X, y)
+
+    with timer.phase("fit"):
+        model_fitted, signature = train_model(X_train, y_train, n_jobs=shared_data["n_jobs"])
+
+    with timer.phase("evaluate"):
+        model_report = evaluate_model(model_fitted, X_test, y_test)
+        model_report_random = evaluate_random_model(y_test)
+
+    with timer.phase("tracking"):
+        save_to_mlflow(
+            model_fitted, signature, model_report, model_report_random, model_name=job.model_name, tags=job.tags
+        )
+        # Pool workers exit without running atexit handlers, the run must be logged before returning
+        flush_tracking()
+
+    return {
+        "model_name": job.model_name,
+        "games": len(job.rows),
+        "accuracy": round(model_report["overall"]["accuracy"], 3),
+        **timer.report(),
+    }
+
+
+def plan_jobs(df_model_final: pd.DataFrame, segments: dict[str, pd.Series]) -> list[TrainingJob]:
+    """List the models to train, largest first so the pool finishes as early as possible.
+
+    Args:
+        df_model_final (pd.DataFrame): Final dataset, one row per game.
+        segments (dict[str, pd.Series]): Segment of each game (see game_segments), per split.
+
+    Returns:
+        list[TrainingJob]: Global model and one model per segment with enough games.
+    """
+    dates = game_dates(df_model_final).to_numpy()
+    jobs = [TrainingJob(cst.MODEL_NAME, {"trained_until": dates.max()}, np.arange(len(df_model_final)))]
+
+    for split_by, game_segment in segments.items():
+        for segment, rows in df_model_final.groupby(df_model_final["ID_GAME"].map(game_segment)).indices.items():
+            if len(rows) < cst.MIN_SEGMENT_GAMES:
+                print(f"Skipping {split_by} {segment}: {len(rows)} games (< {cst.MIN_SEGMENT_GAMES}).")
+                continue
+
+            jobs.append(
+                TrainingJob(
+                    cst.SEGMENT_MODEL_NAME.format(segment=segment),
+                    {"split_by": split_by, "segment": str(segment), "trained_until": dates[rows].max()},
+                    rows,
+                )
+            )
+
+    return sorted(jobs, key=lambda job: len(job.rows), reverse=True)
+
+
+def format_summary(phases: dict[str, float], results: list[dict[str, Any]]) -> str:
+    """Combined timing summary of the orchestrator and of every training job.
+
+    Args:
+        phases (dict[str, float]): Orchestrator phases, see PhaseTimer.report.
+        results (list[dict[str, Any]]): Results of run_training_job.
+
+    Returns:
+        str: Printable summary.
+    """
+    job_phases = ["data", "fit", "evaluate", "tracking", "total"]
+    width = max(len(result["model_name"]) for result in results) + 2
+
+    lines = [f"{'model':<{width}}{'games':>8}{'accuracy':>10}" + "".join(f"{phase:>10}" for phase in job_phases)]
+    for result in results:
+        lines.append(
+            f"{result['model_name']:<{width}}{result['games']:>8}{result['accuracy']:>10}"
+            + "".join(f"{result[phase]:>10.2f}" for phase in job_phases)
+        )
+
+    sequential = sum(result["total"] for result in results)
+    lines.append("")
+    lines.append(", ".join(f"{phase}: {duration:.2f}s" for phase, duration in phases.items()))
+    lines.append(
+        f"{len(results)} models trained in {phases['training']:.2f}s "
+        f"({sequential:.2f}s of job time, x{sequential / phases['training']:.1f})"
+    )
+
+    return "\n".join(lines)
+
+
+def run_training_jobs(
+    X: pd.DataFrame,
+    y: pd.Series,
+    jobs: list[TrainingJob],
+    n_workers: int,
+    n_jobs: int,
+    timer: PhaseTimer,
+    job_function: Callable[[TrainingJob], dict[str, Any]] = run_training_job,
+) -> list[dict[str, Any]]:
+    """Write the feature matrix to shared memory and run the jobs in a process pool memory-mapping it.
+
+    Args:
+        X (pd.DataFrame): Explicative variables of every game.
+        y (pd.Series): Target of every game, as class numbers.
+        jobs (list[TrainingJob]): Models to train, rows indexing X and y.
+        n_workers (int): Worker processes.
+        n_jobs (int): XGBoost threads of each worker.
+        timer (PhaseTimer): Timer of the shared_memory and training phases.
+        job_function (Callable[[TrainingJob], dict[str, Any]], optional): Function run on each job in a
+            worker, importable by the spawned processes. Defaults to run_training_job.
+
+    Returns:
+        list[dict[str, Any]]: Results of job_function, in the order of `jobs`.
+    """
+    shared_dir = SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else None
+    with tempfile.TemporaryDirectory(dir=shared_dir) as directory:
+        with timer.phase("shared_memory"):
+            np.save(os.path.join(directory, "X.npy"), X.to_numpy(dtype=np.float64))
+            np.save(os.path.join(directory, "y.npy"), y.to_numpy(dtype=np.int64))
+
+        with timer.phase("training"):
+            print(f"Training {len(jobs)} models on {n_workers} workers with {n_jobs} XGBoost threads each.")
+            # spawn rather than fork: forking a process that may hold OpenMP threads is not safe
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=attach_shared_data,
+                initargs=(directory, X.columns.tolist(), n_jobs),
+            ) as executor:
+                return list(executor.map(job_function, jobs))
+
+
+def train_parallel(split_by: Union[list[str], None] = None, max_workers: Union[int, None] = None) -> str:
+    """Train the global model and one model per segment of each requested split in a process pool.
+
+    Args:
+        split_by (Union[list[str], None], optional): Splits among cst.SEGMENT_SPLITS. Defaults to None (global
+            model only).
+        max_workers (Union[int, None], optional): Maximum worker processes. Defaults to None (one per core).
+
+    Returns:
+        str: Timing summary.
+    """
+    timer = PhaseTimer()
+
+    n_replayed = replay_buffered_runs()
+    if n_replayed:
+        print(f"{n_replayed} runs buffered by previous trainings logged to MLFlow.")
+
+    with timer.phase("load"):
+        game_data = load_data()
+
+    with timer.phase("features"):
+        segments = {split: game_segments(game_data, split) for split in split_by or []}
+        df_model_final = prepare_data_model(build_final_data(game_data))
+        jobs = plan_jobs(df_model_final, segments)
+
+    # Same processes for the whole run, XGBoost threads split evenly between them
+    n_cores = os.cpu_count() or 1
+    n_workers = min(len(jobs), max_workers or n_cores)
+    n_jobs = max(1, n_cores // n_workers)
+
+    X = df_model_final.drop(["ID_GAME", "TARGET"], axis=1)
+    y = df_model_final["TARGET"].replace(cst.LABEL_CONVERTED)
+    results = run_training_jobs(X, y, jobs, n_workers, n_jobs, timer)
+
+    summary = format_summary(timer.report(), results)
+    print(summary)
+
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the game prediction models in parallel.")
+    parser.add_argument("--split-by", nargs="*", choices=cst.SEGMENT_SPLITS, default=[], help="Segment splits.")
+    parser.add_argument("--workers", type=int, help="Maximum worker processes (default: one per core).")
+    arguments = parser.parse_args()
+
+    train_parallel(split_by=arguments.split_by, max_workers=arguments.workers)
@@ -0,0 +1,175 @@
+import glob
+import os
+import zlib
+from collections.abc import Callable, Iterable, Iterator
+from typing import Union
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+import game_prediction.constants as cst
+from game_prediction.data_utils import read_chunks_from_postgres
+from game_prediction.tasks.prepare_data import build_final_data, prepare_data_model
+from game_prediction.utils.feature_sql import feature_query, window_feature_columns
+
+# Training data kept out of memory: the feature query is read by chunks of consecutive games, each chunk
+# reshaped into model rows and saved as a .npz file, which an XGBoost data iterator then streams.
+
+# One game in TEST_SHARE is held out: 10%, as split_features
+TEST_SHARE = 10
+
+
+def is_test_game(game_ids: pd.Series) -> np.ndarray:
+    """Test sample membership decided by each game alone (a hash of its ID), so that it does not depend
+    on the chunks nor on the other games.
+
+    Args:
+        game_ids (pd.Series): ID_GAME of each row.
+
+    Returns:
+        np.ndarray: True for the games of the test sample.
+    """
+    return np.array([zlib.crc32(game_id.encode()) % TEST_SHARE == 0 for game_id in game_ids])
+
+
+def stream_model_chunks(chunksize: int = cst.FEATURE_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Read the features from the database (see feature_query) by chunks and reshape each one like
+    prepare_data_model, without ever holding the whole dataset.
+
+    Args:
+        chunksize (int, optional): Feature rows read at once. Defaults to cst.FEATURE_CHUNK_ROWS.
+
+    Yields:
+        Iterator[pd.DataFrame]: Final dataset chunks, one row per game.
+    """
+    games_played: dict[str, int] = {}
+    pending = pd.DataFrame()
+
+    def model_rows(game_data: pd.DataFrame) -> pd.DataFrame:
+        game_data = game_data.astype({column: float for column in window_feature_columns()})
+        return prepare_data_model(build_final_data(game_data, games_played))
+
+    for chunk in read_chunks_from_postgres(feature_query(cst.GAME_DATA_TABLE), chunksize):
+        # Rows are sorted by game: the last game of a chunk may continue in the next one
+        chunk = pd.concat([pending, chunk], ignore_index=True)
+        last_game = chunk["ID_GAME"] == chunk["ID_GAME"].iloc[-1]
+        pending = chunk[last_game]
+        if not last_game.all():
+            yield model_rows(chunk[~last_game])
+
+    if not pending.empty:
+        yield model_rows(pending)
+
+
+def write_feature_chunks(chunks: Iterable[pd.DataFrame], directory: str) -> list[str]:
+    """Save final dataset chunks as .npz files of float32 explicative variables, class targets and game IDs,
+    split between train and test files.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): Final dataset chunks, see stream_model_chunks.
+        directory (str): Directory of the chunk files.
+
+    Returns:
+        list[str]: Names of the explicative variables.
+    """
+    os.makedirs(directory, exist_ok=True)
+    columns: list[str] = []
+
+    for number, chunk in enumerate(chunks):
+        X = chunk.drop(["ID_GAME", "TARGET"], axis=1)
+        columns = columns or X.columns.tolist()
+        X = X[columns].to_numpy(dtype=np.float32)
+        y = chunk["TARGET"].replace(cst.LABEL_CONVERTED).to_numpy(dtype=np.int64)
+
+        game_ids = chunk["ID_GAME"].to_numpy(dtype=str)
+
+        test = is_test_game(chunk["ID_GAME"])
+        for sample, rows in [("train", ~test), ("test", test)]:
+            if not rows.any():
+                continue
+            np.savez(
+                os.path.join(directory, f"{sample}-{number:05d}.npz"),
+                X=X[rows],
+                y=y[rows],
+                game_ids=game_ids[rows],
+                columns=columns,
+            )
+
+    return columns
+
+
+def chunk_paths(directory: str, sample: str) -> list[str]:
+    """Chunk files of a sample.
+
+    Args:
+        directory (str): Directory of the chunk files.
+        sample (str): "train" or "test".
+
+    Returns:
+        list[str]: Paths, in chunk order.
+    """
+    return sorted(glob.glob(os.path.join(directory, f"{sample}-*.npz")))
+
+
+def load_chunk(path: str) -> tuple[np.ndarray, np.ndarray, list[str], np.ndarray]:
+    """Read a chunk file.
+
+    Args:
+        path (str): Chunk file.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, list[str], np.ndarray]: Explicative variables, target, variable names
+            and game IDs.
+    """
+    with np.load(path) as chunk:
+        return chunk["X"], chunk["y"], chunk["columns"].tolist(), chunk["game_ids"]
+
+
+class FeatureChunkIter(xgb.DataIter):  # type: ignore
+    """XGBoost data iterator over chunk files, one file in memory at a time."""
+
+    def __init__(self, paths: list[str], cache_prefix: Union[str, None] = None) -> None:
+        """Class instantiation.
+
+        Args:
+            paths (list[str]): Chunk files.
+            cache_prefix (Union[str, None], optional): Prefix of the external memory cache files. Defaults to None.
+        """
+        self.paths = paths
+        self._position = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data: Callable[..., None]) -> bool:
+        """Pass the next chunk to XGBoost, False once all the chunks were read."""
+        if self._position == len(self.paths):
+            return False
+
+        X, y, columns, _ = load_chunk(self.paths[self._position])
+        input_data(data=X, label=y, feature_names=columns)
+        self._position += 1
+
+        return True
+
+    def reset(self) -> None:
+        """Restart from the first chunk."""
+        self._position = 0
+
+
+def external_memory_matrix(paths: list[str], cache_prefix: str) -> xgb.DMatrix:
+    """Training matrix quantized from the chunk files and cached on disk, for the hist tree method.
+
+    Args:
+        paths (list[str]): Train chunk files.
+        cache_prefix (str): Prefix of the cache files.
+
+    Returns:
+        xgb.DMatrix: External memory matrix.
+    """
+    iterator = FeatureChunkIter(paths, cache_prefix=cache_prefix)
+
+    # XGBoost 3 caches the quantized pages directly, XGBoost 2 the raw pages
+    if hasattr(xgb, "ExtMemQuantileDMatrix"):
+        return xgb.ExtMemQuantileDMatrix(iterator)
+
+    return xgb.DMatrix(iterator)
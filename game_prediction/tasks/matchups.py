@@ -0,0 +1,223 @@
+import os
+import time
+from typing import TYPE_CHECKING, Any, Union
+
+import numpy as np
+import numpy.typing as npt
+
+import game_prediction.constants as cst
+from game_prediction.utils.explanations import predicted_class_contributions
+from game_prediction.utils.fast_predict import FastPredictor
+from game_prediction.utils.team_features import TeamState, team_features
+
+if TYPE_CHECKING:
+    import xgboost as xgb
+
+
+class MatchupTable:
+    """Class probabilities of every ordered (home team, away team) pair of a league, computed ahead of time.
+
+    Probabilities are stored in a (n_teams, n_teams, n_classes) float32 array, NaN for pairs that were not
+    computed (teams of different leagues, same team, teams without enough games). The contributions to the
+    predicted class of the computed pairs, when stored, explain the predictions (see utils/explanations.py).
+    """
+
+    def __init__(
+        self,
+        teams: list[str],
+        leagues: list[str],
+        probabilities: npt.NDArray[np.float32],
+        run_id: str,
+        created_at: float,
+        contributions: Union[npt.NDArray[np.float32], None] = None,
+        contribution_rows: Union[npt.NDArray[np.int32], None] = None,
+    ) -> None:
+        """Class instantiation.
+
+        Args:
+            teams (list[str]): Team names, indexing both axes of `probabilities`.
+            leagues (list[str]): League of each team.
+            probabilities (npt.NDArray[np.float32]): Class probabilities, shape (n_teams, n_teams, n_classes),
+                home team first.
+            run_id (str): MLFlow run of the model that computed the probabilities.
+            created_at (float): Creation timestamp.
+            contributions (Union[npt.NDArray[np.float32], None], optional): Contributions to the predicted class of the
+                computed pairs, shape (n_pairs, n_features + 1). Defaults to None.
+            contribution_rows (Union[npt.NDArray[np.int32], None], optional): Row of each pair in `contributions`, shape
+                (n_teams, n_teams), -1 when not computed. Defaults to None.
+        """
+        self.teams = list(teams)
+        self.leagues = list(leagues)
+        self.probabilities = probabilities
+        self.run_id = run_id
+        self.created_at = created_at
+        self.contributions = contributions
+        self.contribution_rows = contribution_rows
+        self.team_index = {team: index for index, team in enumerate(self.teams)}
+
+    def lookup(self, home_team: str, away_team: str) -> Union[npt.NDArray[np.float32], None]:
+        """Class probabilities of a game.
+
+        Args:
+            home_team (str): Home team.
+            away_team (str): Away team.
+
+        Returns:
+            Union[npt.NDArray[np.float32], None]: Probabilities ordered like the model classes, None when not
+                precomputed.
+        """
+        home_index, away_index = self.team_index.get(home_team), self.team_index.get(away_team)
+        if home_index is None or away_index is None:
+            return None
+
+        probabilities = self.probabilities[home_index, away_index]
+
+        return None if np.isnan(probabilities).any() else probabilities
+
+    def lookup_contributions(self, home_team: str, away_team: str) -> Union[npt.NDArray[np.float32], None]:
+        """Contributions to the predicted class of a game.
+
+        Args:
+            home_team (str): Home team.
+            away_team (str): Away team.
+
+        Returns:
+            Union[npt.NDArray[np.float32], None]: Contributions, bias last, None when not precomputed.
+        """
+        home_index, away_index = self.team_index.get(home_team), self.team_index.get(away_team)
+        if self.contributions is None or self.contribution_rows is None or home_index is None or away_index is None:
+            return None
+
+        row = self.contribution_rows[home_index, away_index]
+
+        return None if row < 0 else self.contributions[row]
+
+    def is_fresh(self, run_id: str, max_age: float = cst.MATCHUP_TABLE_MAX_AGE) -> bool:
+        """Check the table was computed by the served model and recently enough.
+
+        Args:
+            run_id (str): MLFlow run of the served model.
+            max_age (float, optional): Maximum age in seconds. Defaults to cst.MATCHUP_TABLE_MAX_AGE.
+
+        Returns:
+            bool: True when predictions can be served from the table.
+        """
+        return self.run_id == run_id and time.time() - self.created_at <= max_age
+
+    def save(self, path: str) -> None:
+        """Write the table to a .npz file, atomically so a serving process never reads a partial file.
+
+        Args:
+            path (str): Destination file.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        arrays: dict[str, Any] = {
+            "teams": np.array(self.teams),
+            "leagues": np.array(self.leagues),
+            "probabilities": self.probabilities,
+            "run_id": np.array(self.run_id),
+            "created_at": np.array(self.created_at),
+        }
+        if self.contributions is not None:
+            arrays.update(contributions=self.contributions, contribution_rows=self.contribution_rows)
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "MatchupTable":
+        """Read a table written by `save`.
+
+        Args:
+            path (str): .npz file.
+
+        Returns:
+            MatchupTable: Matchup table.
+        """
+        with np.load(path) as data:
+            # Tables saved without explanations have no contributions
+            return cls(
+                data["teams"].tolist(),
+                data["leagues"].tolist(),
+                data["probabilities"],
+                str(data["run_id"]),
+                float(data["created_at"]),
+                data["contributions"] if "contributions" in data else None,
+                data["contribution_rows"] if "contribution_rows" in data else None,
+            )
+
+
+def compute_matchup_table(
+    model: "xgb.XGBClassifier",
+    states: dict[tuple[str, str], TeamState],
+    leagues: dict[str, str],
+    run_id: str,
+    explain: bool = False,
+) -> MatchupTable:
+    """Predict every ordered pair of teams of each league in a single vectorized call.
+
+    Args:
+        model (xgb.XGBClassifier): Served model.
+        states (dict[tuple[str, str], TeamState]): Team states indexed by (TEAM, STATUS).
+        leagues (dict[str, str]): League of each team.
+        run_id (str): MLFlow run of `model`.
+        explain (bool, optional): Also compute the contributions to the predicted class of every pair.
+            Defaults to False.
+
+    Returns:
+        MatchupTable: Class probabilities of every pair.
+    """
+    predictor = FastPredictor(model)
+
+    teams = sorted(leagues)
+    features = {
+        team_status: team_features(state) for team_status, state in states.items() if state.n_games >= cst.N_GAMES_AVG
+    }
+
+    home_indexes, away_indexes = [], []
+    for league in sorted(set(leagues.values())):
+        league_teams = np.array([index for index, team in enumerate(teams) if leagues[team] == league])
+        home, away = np.meshgrid(league_teams, league_teams, indexing="ij")
+        home_indexes.append(home.ravel())
+        away_indexes.append(away.ravel())
+
+    home_index = np.concatenate(home_indexes) if home_indexes else np.array([], dtype=np.int64)
+    away_index = np.concatenate(away_indexes) if away_indexes else np.array([], dtype=np.int64)
+    keep = (home_index != away_index) & np.array(
+        [
+            (teams[home], "HOME") in features and (teams[away], "AWAY") in features
+            for home, away in zip(home_index, away_index)
+        ],
+        dtype=bool,
+    )
+    home_index, away_index = home_index[keep], away_index[keep]
+
+    # No pair can be predicted yet, e.g. a new league whose teams have played less than N_GAMES_AVG games:
+    # the table is empty and every game of the league is predicted live
+    inputs = np.zeros((0, predictor.n_features), dtype=np.float32)
+    match_probabilities = np.zeros((0, len(cst.LABEL_CONVERTED)), dtype=np.float32)
+    if len(home_index):
+        inputs = predictor.layout.match_features(
+            np.stack([features[(teams[index], "HOME")] for index in home_index]),
+            np.stack([features[(teams[index], "AWAY")] for index in away_index]),
+        )
+        match_probabilities = predictor.predict_proba(inputs)
+
+    probabilities = np.full((len(teams), len(teams), len(cst.LABEL_CONVERTED)), np.nan, dtype=np.float32)
+    probabilities[home_index, away_index] = match_probabilities
+
+    contributions, contribution_rows = None, None
+    if explain:
+        contributions = predicted_class_contributions(match_probabilities, predictor.predict_contributions(inputs))
+        contribution_rows = np.full((len(teams), len(teams)), -1, dtype=np.int32)
+        contribution_rows[home_index, away_index] = np.arange(len(home_index))
+
+    return MatchupTable(
+        teams,
+        [leagues[team] for team in teams],
+        probabilities,
+        run_id,
+        time.time(),
+        contributions,
+        contribution_rows,
+    )
@@ -3,11 +3,302 @@ from typing import Any
 import numpy as np
 import pandas as pd
 import xgboost as xgb
-from sklearn.metrics import classification_report
+
+import game_prediction.constants as cst
+
+N_CLASSES = len(cst.LABEL_CONVERTED)
+
+CLASS_METRICS = ("precision", "recall", "f1-score")
+
+
+def confusion_matrix_counts(y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    """Confusion matrix, true classes as rows and predicted classes as columns.
+
+    Args:
+        y_true (np.ndarray): True classes.
+        y_pred (np.ndarray): Predicted classes.
+
+    Returns:
+        np.ndarray: Counts, shape (n_classes, n_classes).
+    """
+    return np.bincount(y_true * N_CLASSES + y_pred, minlength=N_CLASSES**2).reshape(N_CLASSES, N_CLASSES)
+
+
+def classification_metrics(confusion: np.ndarray) -> dict[str, np.ndarray]:
+    """Per class precision, recall and F1 score, and accuracy, of one or many confusion matrices at once.
+    Undefined ratios (class never predicted or never observed) are 0, like in Sklearn.
+
+    Args:
+        confusion (np.ndarray): Confusion matrices, shape (..., n_classes, n_classes).
+
+    Returns:
+        dict[str, np.ndarray]: Class metrics of shape (..., n_classes) and accuracy of shape (...).
+    """
+    true_positives = np.diagonal(confusion, axis1=-2, axis2=-1).astype(float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.nan_to_num(true_positives / confusion.sum(axis=-2))
+        recall = np.nan_to_num(true_positives / confusion.sum(axis=-1))
+        f1_score = np.nan_to_num(2 * precision * recall / (precision + recall))
+
+    accuracy = true_positives.sum(axis=-1) / confusion.sum(axis=(-2, -1))
+
+    return {"precision": precision, "recall": recall, "f1-score": f1_score, "accuracy": accuracy}
+
+
+def bootstrap_confusions(confusion: np.ndarray, n_resamples: int, rng: np.random.Generator) -> np.ndarray:
+    """Confusion matrices of bootstrap resamples of the test sample. Resampling the games with
+    replacement only changes how many of them fall in each (true, predicted) cell, so resamples
+    are drawn as multinomial cell counts: the cost does not depend on the test sample size.
+
+    Args:
+        confusion (np.ndarray): Confusion matrix of the test sample.
+        n_resamples (int): Number of resamples.
+        rng (np.random.Generator): Random generator.
+
+    Returns:
+        np.ndarray: Confusion matrices, shape (n_resamples, n_classes, n_classes).
+    """
+    n_games = confusion.sum()
+    counts = rng.multinomial(n_games, confusion.ravel() / n_games, size=n_resamples)
+
+    return counts.reshape(n_resamples, N_CLASSES, N_CLASSES)
+
+
+def random_confusions(
+    class_counts: np.ndarray, class_distribution: np.ndarray, n_draws: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Confusion matrices of random predictions drawn from `class_distribution`, independently of
+    the true class: the predictions of the games of each true class follow a multinomial law.
+
+    Args:
+        class_counts (np.ndarray): Number of games of each true class.
+        class_distribution (np.ndarray): Probability of predicting each class.
+        n_draws (int): Number of random predictions of the test sample.
+        rng (np.random.Generator): Random generator.
+
+    Returns:
+        np.ndarray: Confusion matrices, shape (n_draws, n_classes, n_classes).
+    """
+    return np.stack([rng.multinomial(count, class_distribution, size=n_draws) for count in class_counts], axis=1)
+
+
+def bootstrap_means(
+    values: np.ndarray, n_resamples: int, rng: np.random.Generator, n_bins: int = cst.EVAL_BOOTSTRAP_BINS
+) -> np.ndarray:
+    """Bootstrap distribution of the mean of per game values. Games are grouped in `n_bins` quantile
+    bins and resamples are drawn as multinomial bin counts, so the cost does not depend on the test
+    sample size; the spread of the values within bins is added back as a normal term. With at most
+    `n_bins` games every game is its own bin and this is the exact bootstrap.
+
+    Args:
+        values (np.ndarray): Value of each game (e.g. its log-loss).
+        n_resamples (int): Number of resamples.
+        rng (np.random.Generator): Random generator.
+        n_bins (int, optional): Number of bins. Defaults to cst.EVAL_BOOTSTRAP_BINS.
+
+    Returns:
+        np.ndarray: Mean of each resample, shape (n_resamples,).
+    """
+    n_games = len(values)
+    bin_index = np.empty(n_games, dtype=int)
+    bin_index[np.argsort(values, kind="stable")] = np.arange(n_games) * min(n_bins, n_games) // n_games
+
+    counts = np.bincount(bin_index)
+    sums = np.bincount(bin_index, weights=values)
+    bin_means = sums / counts
+    within_bins = max(float((np.bincount(bin_index, weights=values**2) - sums * bin_means).sum()), 0.0)
+
+    means = rng.multinomial(n_games, counts / n_games, size=n_resamples) @ bin_means / n_games
+
+    return means + rng.normal(0, np.sqrt(within_bins) / n_games, n_resamples)
+
+
+def confidence_interval(samples: np.ndarray, confidence: float = cst.EVAL_CONFIDENCE) -> np.ndarray:
+    """Percentile confidence interval.
+
+    Args:
+        samples (np.ndarray): Bootstrap or random draws, along the first axis.
+        confidence (float, optional): Confidence level. Defaults to cst.EVAL_CONFIDENCE.
+
+    Returns:
+        np.ndarray: Lower and upper bounds, shape (2, ...).
+    """
+    tail = (1 - confidence) / 2 * 100
+
+    return np.percentile(samples, [tail, 100 - tail], axis=0)
+
+
+def class_report(
+    metrics: dict[str, np.ndarray], samples: dict[str, np.ndarray], support: np.ndarray
+) -> dict[str, dict[str, float]]:
+    """Per class metrics with their confidence interval, keyed like Sklearn classification report.
+
+    Args:
+        metrics (dict[str, np.ndarray]): Point estimates, see classification_metrics.
+        samples (dict[str, np.ndarray]): Resampled metrics, with a leading resample axis.
+        support (np.ndarray): Number of games of each true class.
+
+    Returns:
+        dict[str, dict[str, float]]: Metrics of each class.
+    """
+    intervals = {name: confidence_interval(samples[name]) for name in CLASS_METRICS}
+
+    report: dict[str, dict[str, float]] = {}
+    for label in range(N_CLASSES):
+        report[str(label)] = {}
+        for name in CLASS_METRICS:
+            report[str(label)][name] = float(metrics[name][label])
+            report[str(label)][f"{name}_ci_low"] = float(intervals[name][0, label])
+            report[str(label)][f"{name}_ci_high"] = float(intervals[name][1, label])
+        report[str(label)]["support"] = int(support[label])
+
+    return report
+
+
+def calibration(probabilities: np.ndarray, y_true: np.ndarray, n_bins: int = cst.EVAL_CALIBRATION_BINS) -> Any:
+    """Reliability of the probability of the predicted class, binned by probability.
+
+    Args:
+        probabilities (np.ndarray): Class probabilities, shape (n_games, n_classes).
+        y_true (np.ndarray): True classes.
+        n_bins (int, optional): Number of equal width bins. Defaults to cst.EVAL_CALIBRATION_BINS.
+
+    Returns:
+        Any: Expected calibration error and, per bin, games, mean predicted probability and accuracy.
+    """
+    confidence = probabilities.max(axis=1)
+    correct = (probabilities.argmax(axis=1) == y_true).astype(float)
+    bins = np.minimum((confidence * n_bins).astype(int), n_bins - 1)
+
+    counts = np.bincount(bins, minlength=n_bins)
+    confidence_sums = np.bincount(bins, weights=confidence, minlength=n_bins)
+    correct_sums = np.bincount(bins, weights=correct, minlength=n_bins)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bin_confidence, bin_accuracy = confidence_sums / counts, correct_sums / counts
+
+    return {
+        "ece": float(np.abs(correct_sums - confidence_sums).sum() / len(y_true)),
+        "bins": {
+            "count": counts.tolist(),
+            "confidence": np.round(bin_confidence, 4).tolist(),
+            "accuracy": np.round(bin_accuracy, 4).tolist(),
+        },
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    """Text table of a report, like Sklearn classification report with confidence intervals.
+
+    Args:
+        report (dict[str, Any]): Report built by evaluate_model or evaluate_random_model.
+
+    Returns:
+        str: Printable report.
+    """
+    lines = [f"{'':>10}" + "".join(f"{name:>24}" for name in CLASS_METRICS) + f"{'support':>10}"]
+    for label in range(N_CLASSES):
+        metrics = report[str(label)]
+        cells = [
+            f"{metrics[name]:.2f} [{metrics[f'{name}_ci_low']:.2f}, {metrics[f'{name}_ci_high']:.2f}]"
+            for name in CLASS_METRICS
+        ]
+        lines.append(f"{label:>10}" + "".join(f"{cell:>24}" for cell in cells) + f"{metrics['support']:>10}")
+
+    lines.append("")
+    overall = report["overall"]
+    for name in [key for key in overall if not key.endswith(("_ci_low", "_ci_high"))]:
+        interval = ""
+        if f"{name}_ci_low" in overall:
+            interval = f" [{overall[f'{name}_ci_low']:.3f}, {overall[f'{name}_ci_high']:.3f}]"
+        lines.append(f"{name:>10} {overall[name]:.3f}{interval}")
+
+    return "\n".join(lines)
+
+
+class Evaluation:
+    """Predictions of a model on the test sample, computed once, and the metrics derived from them."""
+
+    def __init__(self, y_true: np.ndarray, probabilities: np.ndarray, seed: int = 0) -> None:
+        """Class instantiation.
+
+        Args:
+            y_true (np.ndarray): True classes.
+            probabilities (np.ndarray): Predicted class probabilities, shape (n_games, n_classes).
+            seed (int, optional): Seed of the bootstrap resamples. Defaults to 0.
+        """
+        self.y_true = np.asarray(y_true, dtype=int)
+        self.probabilities = np.asarray(probabilities, dtype=float)
+        # Same labels as model.predict, without predicting twice
+        self.y_pred = self.probabilities.argmax(axis=1)
+        self.confusion = confusion_matrix_counts(self.y_true, self.y_pred)
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_model(cls, model: xgb.XGBClassifier, X_test: pd.DataFrame, y_test: pd.Series) -> "Evaluation":
+        """Predict the test sample.
+
+        Args:
+            model (xgb.XGBClassifier): Fitted model.
+            X_test (pd.DataFrame): Explicative variable from test sample.
+            y_test (pd.Series): Target from test sample.
+
+        Returns:
+            Evaluation: Evaluation of the model.
+        """
+        return cls(y_test.to_numpy(), model.predict_proba(X_test))
+
+    def log_losses(self) -> np.ndarray:
+        """Log-loss of each game."""
+        eps = np.finfo(float).eps
+        true_probabilities = self.probabilities[np.arange(len(self.y_true)), self.y_true]
+
+        return -np.log(np.clip(true_probabilities, eps, 1))
+
+    def brier_scores(self) -> np.ndarray:
+        """Multi-class Brier score of each game."""
+        one_hot = np.eye(N_CLASSES)[self.y_true]
+
+        return ((self.probabilities - one_hot) ** 2).sum(axis=1)
+
+    def report(self, n_resamples: int = cst.EVAL_N_BOOTSTRAP) -> dict[str, Any]:
+        """Per class precision / recall / F1 score, accuracy, log-loss, Brier score and calibration,
+        with bootstrap confidence intervals.
+
+        Args:
+            n_resamples (int, optional): Number of bootstrap resamples. Defaults to cst.EVAL_N_BOOTSTRAP.
+
+        Returns:
+            dict[str, Any]: Report, per class metrics keyed by class like Sklearn classification report.
+        """
+        metrics = classification_metrics(self.confusion)
+        samples = classification_metrics(bootstrap_confusions(self.confusion, n_resamples, self.rng))
+
+        report: dict[str, Any] = class_report(metrics, samples, self.confusion.sum(axis=1))
+
+        log_losses, brier_scores = self.log_losses(), self.brier_scores()
+
+        overall = {}
+        for name, point, resampled in [
+            ("accuracy", metrics["accuracy"], samples["accuracy"]),
+            ("log_loss", log_losses.mean(), bootstrap_means(log_losses, n_resamples, self.rng)),
+            ("brier", brier_scores.mean(), bootstrap_means(brier_scores, n_resamples, self.rng)),
+        ]:
+            low, high = confidence_interval(resampled)
+            overall.update({name: float(point), f"{name}_ci_low": float(low), f"{name}_ci_high": float(high)})
+
+        model_calibration = calibration(self.probabilities, self.y_true)
+        overall["ece"] = model_calibration["ece"]
+
+        report["overall"] = overall
+        report["calibration"] = model_calibration["bins"]
+
+        return report
 
 
 def evaluate_model(model: xgb.XGBClassifier, X_test: pd.DataFrame, y_test: pd.Series) -> Any:
-    """Build classification report from Sklearn.
+    """Evaluate the model on the test sample, predicted once.
 
     Args:
         model (xgb.XGBClassifier): Fitted model.
@@ -15,30 +306,47 @@ def evaluate_model(model: xgb.XGBClassifier, X_test: pd.DataFrame, y_test: pd.Se
         y_test (pd.Series): Target from test sample.
 
     Returns:
-        Any: Classification report from Sklearn.
+        Any: Report, see Evaluation.report.
 
     """
-    print(classification_report(y_test, model.predict(X_test)))
+    report = Evaluation.from_model(model, X_test, y_test).report()
+
+    print(format_report(report))
 
-    return classification_report(y_test, model.predict(X_test), output_dict=True)
+    return report
 
 
 # Random comparison
-def evaluate_random_model(y_test: pd.Series) -> Any:
-    """Use true target distribution to produce a fake random prediction,
-            useful to compare our model with dummy results.
+def evaluate_random_model(y_test: pd.Series, n_draws: int = cst.EVAL_N_RANDOM_DRAWS, seed: int = 0) -> Any:
+    """Use true target distribution to produce fake random predictions,
+            useful to compare our model with dummy results. Metrics are averaged over
+            `n_draws` random predictions, drawn at once, instead of relying on a single noisy one.
 
     Args:
         y_test (pd.Series): True target distribution.
+        n_draws (int, optional): Number of random predictions. Defaults to cst.EVAL_N_RANDOM_DRAWS.
+        seed (int, optional): Seed of the random predictions. Defaults to 0.
 
     Returns:
-        Any: Dummy prediction's classification report.
+        Any: Dummy prediction's report, with the spread of the random draws as confidence intervals.
     """
-    y_test_distrib = y_test.value_counts(True)
-    y_random = np.random.choice(
-        np.arange(0, 3), p=[y_test_distrib[0], y_test_distrib[1], y_test_distrib[2]], size=len(y_test)
+    class_counts = np.bincount(y_test.to_numpy(dtype=int), minlength=N_CLASSES)
+    class_distribution = class_counts / class_counts.sum()
+
+    confusions = random_confusions(class_counts, class_distribution, n_draws, np.random.default_rng(seed))
+    samples = classification_metrics(confusions)
+
+    report: dict[str, Any] = class_report(
+        {name: values.mean(axis=0) for name, values in samples.items()}, samples, class_counts
     )
 
-    print(classification_report(y_test, y_random))
+    low, high = confidence_interval(samples["accuracy"])
+    report["overall"] = {
+        "accuracy": float(samples["accuracy"].mean()),
+        "accuracy_ci_low": float(low),
+        "accuracy_ci_high": float(high),
+    }
+
+    print(format_report(report))
 
-    return classification_report(y_test, y_random, output_dict=True)
+    return report
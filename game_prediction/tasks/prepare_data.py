@@ -2,12 +2,42 @@ from typing import Union
 
 import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
 
 import game_prediction.constants as cst
 from game_prediction.config import TableMapping, Tables
 from game_prediction.data_utils import read_data_from_postgres
-from game_prediction.utils.preprocessing import VariableTransformer, pre_processing_game_data
+from game_prediction.utils.feature_sql import feature_query, window_feature_columns
+from game_prediction.utils.preprocessing import pre_processing_game_data
+from game_prediction.utils.team_catalog import find_leagues
+
+
+def game_data_query(condition: str = "") -> str:
+    """Query reading the game_data columns (MatchCols) from cst.GAME_DATA_TABLE.
+
+    Args:
+        condition (str, optional): WHERE clause. Defaults to "" (all games).
+
+    Returns:
+        str: SQL query.
+    """
+    table_mapper = TableMapping().get_table_info(Tables.GAME_DATA)
+    columns = ", ".join(f'"{table_mapper.wk_columns()[attr]["name"]}"' for attr in table_mapper.get_all_atributes())
+
+    return f"SELECT {columns} FROM {cst.GAME_DATA_TABLE} {condition};"
+
+
+def load_features_from_database(condition: str = "") -> pd.DataFrame:
+    """Read the rows load_data builds in pandas, the features being computed by the database.
+
+    Args:
+        condition (str, optional): WHERE clause, see feature_query. Defaults to "" (all games).
+
+    Returns:
+        pd.DataFrame: Processed games.
+    """
+    game_data = read_data_from_postgres(feature_query(cst.GAME_DATA_TABLE, condition))
+
+    return game_data.astype({column: float for column in window_feature_columns()})
 
 
 def load_data(spe_query: Union[str, None] = None) -> pd.DataFrame:
@@ -17,14 +47,18 @@ def load_data(spe_query: Union[str, None] = None) -> pd.DataFrame:
         tuple[pd.DataFrame, list[pd.DataFrame]]: Game aggregated data and
                                             player specific data
     """
+    # Training-only dependency (sklearn), kept out of the serving import path
+    from game_prediction.utils.variable_transformer import VariableTransformer
 
     table = Tables.GAME_DATA
     table_mapper = TableMapping().get_table_info(table)
 
     if spe_query:
         game_data = read_data_from_postgres(spe_query)
+    elif cst.SQL_FEATURES:
+        return load_features_from_database()
     else:
-        game_data = read_data_from_postgres(table.value)
+        game_data = read_data_from_postgres(game_data_query())
 
     game_data = pre_processing_game_data(game_data, table_mapper)
     game_data = VariableTransformer(table_mapper, "TEAM").transform(game_data)
@@ -32,11 +66,14 @@ def load_data(spe_query: Union[str, None] = None) -> pd.DataFrame:
     return game_data
 
 
-def build_final_data(game_data: pd.DataFrame) -> pd.DataFrame:
+def build_final_data(game_data: pd.DataFrame, games_played: Union[dict[str, int], None] = None) -> pd.DataFrame:
     """Add variables to model dataset.
 
     Args:
         game_data (pd.DataFrame): Model dataset.
+        games_played (Union[dict[str, int], None], optional): Games of each team in the previous chunks, when
+            the dataset is processed by chunks of consecutive games. Updated with the games of this chunk.
+            Defaults to None (whole dataset).
 
     Returns:
         pd.DataFrame: Enhanced model dataset.
@@ -45,6 +82,9 @@ def build_final_data(game_data: pd.DataFrame) -> pd.DataFrame:
     game_data_copy = game_data.copy()
 
     game_data_copy["NB_GAMES_BY_TEAM"] = game_data_copy.groupby("TEAM").cumcount() + 1
+    if games_played is not None:
+        game_data_copy["NB_GAMES_BY_TEAM"] += game_data_copy["TEAM"].map(games_played).fillna(0).astype(int)
+        games_played.update(game_data_copy.groupby("TEAM")["NB_GAMES_BY_TEAM"].max().to_dict())
     game_data_copy = game_data_copy[game_data_copy["NB_GAMES_BY_TEAM"] > 3].drop("NB_GAMES_BY_TEAM", axis=1)
 
     game_data_copy["ID_GAME_TEAM"] = game_data_copy["ID_GAME"] + "_" + game_data_copy["TEAM"]
@@ -113,6 +153,42 @@ def prepare_data_model(game_players_df: pd.DataFrame) -> pd.DataFrame:
     return df_model_final
 
 
+def game_segments(game_data: pd.DataFrame, split_by: str) -> pd.Series:
+    """Segment (league or season) of each game, used to train one model per segment.
+
+    Args:
+        game_data (pd.DataFrame): Game data, one row per team and game.
+        split_by (str): "league" or "season".
+
+    Raises:
+        ValueError: When split_by is not one of cst.SEGMENT_SPLITS.
+
+    Returns:
+        pd.Series: Segment indexed by ID_GAME.
+    """
+    if split_by not in cst.SEGMENT_SPLITS:
+        raise ValueError(f"split_by must be one of {cst.SEGMENT_SPLITS}, got {split_by}.")
+
+    games = game_data.drop_duplicates("ID_GAME").set_index("ID_GAME")
+
+    if split_by == "league":
+        return games["TEAM"].map(find_leagues(game_data))
+
+    return games["SEASON"].astype(str)
+
+
+def game_dates(df: pd.DataFrame) -> pd.Series:
+    """Date of each game, the YYYYMMDD suffix of ID_GAME (comparable as strings).
+
+    Args:
+        df (pd.DataFrame): Dataset with an ID_GAME column.
+
+    Returns:
+        pd.Series: Game dates.
+    """
+    return df["ID_GAME"].str[-8:]
+
+
 def split_data(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
     """Split final dataset into model samples.
 
@@ -125,6 +201,25 @@ def split_data(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, pd.Series,
     X = df.drop(["ID_GAME", "TARGET"], axis=1)
     y = df["TARGET"].replace(cst.LABEL_CONVERTED)
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.1, random_state=42)
+    return split_features(X, y)
+
+
+def split_features(
+    X: pd.DataFrame, y: pd.Series, test_size: float = 0.1
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
+    """Split explicative variables and target into model samples.
+
+    Args:
+        X (pd.DataFrame): Explicative variables.
+        y (pd.Series): Target, as class numbers.
+        test_size (float, optional): Share of the test sample. Defaults to 0.1.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]: Model samples.
+    """
+    # Training-only dependency, kept out of the serving import path
+    from sklearn.model_selection import train_test_split
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42)
 
     return X_train, X_test, y_train, y_test
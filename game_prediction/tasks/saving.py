@@ -1,10 +1,12 @@
-from typing import Any
+import copy
+import time
+from typing import Any, Union
 
-import mlflow
 import xgboost as xgb
 from mlflow.models.signature import ModelSignature
 
 import game_prediction.constants as cst
+from game_prediction.tasks.tracking import RunRecord, get_tracking_writer
 
 
 # Create a new MLflow Experiment
@@ -13,30 +15,41 @@ def save_to_mlflow(
     model_signature: ModelSignature,
     model_report: dict[str, Any],
     model_report_random: dict[str, Any],
+    model_name: str = cst.MODEL_NAME,
+    tags: Union[dict[str, str], None] = None,
 ) -> None:
-    """Save the model to MLFlow.
+    """Save the model to MLFlow. The run is logged in the background (see tasks/tracking.py), call
+    flush_tracking to wait for it.
 
     Args:
         my_model (xgb.XGBClassifier): Fitted model.
         model_signature (_type_): MLFlow model signature.
-        model_report (dict[str, Any]): Model results (classification report from Sklearn)
-        model_report_random (dict[str, Any]): Dummy model results (classification report from Sklearn)
+        model_report (dict[str, Any]): Model results (see model_performance.evaluate_model)
+        model_report_random (dict[str, Any]): Dummy model results (see model_performance.evaluate_random_model)
+        model_name (str, optional): Name the model is logged under. Defaults to cst.MODEL_NAME.
+        tags (Union[dict[str, str], None], optional): Extra run tags (e.g. the league of a per league model).
+            Defaults to None.
     """
-
-    mlflow.set_tracking_uri(uri=cst.URI_PATH_DEFAULT)
-
-    mlflow.set_experiment(experiment_name=cst.EXPERIMENT_NAME)
-
-    with mlflow.start_run():  #
-        for label in ["0", "1", "2"]:
-            [mlflow.log_metric(f"{key}_{label}", val) for key, val in model_report[label].items()]
-
-        for label in ["0", "1", "2"]:
-            [mlflow.log_metric(f"RANDOM_{key}_{label}", val) for key, val in model_report_random[label].items()]
-
-        clf_params = my_model.get_xgb_params()
-        mlflow.log_params(clf_params)
-
-        mlflow.xgboost.log_model(my_model, cst.MODEL_NAME, signature=model_signature)
-
-    mlflow.end_run()
+    metrics = {f"{key}_{label}": val for label in ["0", "1", "2"] for key, val in model_report[label].items()}
+    metrics.update(
+        {f"RANDOM_{key}_{label}": val for label in ["0", "1", "2"] for key, val in model_report_random[label].items()}
+    )
+    # Accuracy, log-loss, Brier score and calibration error, with their confidence intervals
+    metrics.update(model_report.get("overall", {}))
+    metrics.update({f"RANDOM_{key}": val for key, val in model_report_random.get("overall", {}).items()})
+
+    clf_params = {key: str(val) for key, val in my_model.get_xgb_params().items()}
+
+    record = RunRecord(
+        model_name=model_name,
+        metrics=metrics,
+        params=clf_params,
+        # model_name is used by load_run_mlflow to find the latest run of each model
+        tags={"model_name": model_name, **(tags or {})},
+        created_at=int(time.time() * 1000),
+        # The caller may refit its model before the background thread saves it
+        model=copy.deepcopy(my_model),
+        signature=model_signature,
+    )
+
+    get_tracking_writer().submit(record)
@@ -1,30 +1,67 @@
 import os
-from typing import Union
+from typing import TYPE_CHECKING, Union
 
-import mlflow.xgboost
 import pandas as pd
-import xgboost as xgb
 
 import game_prediction.constants as cst
 from game_prediction.tasks.prepare_data import prepare_data_model
 
+if TYPE_CHECKING:
+    import xgboost as xgb
 
-def load_run_mlflow(get_metric: bool = False) -> Union[dict[str, float], xgb.XGBClassifier]:
+
+# Runs are logged in the background, a run still uploading its model (or failed) must not be served
+FINISHED_RUNS = "attributes.status = 'FINISHED'"
+
+
+def select_model_runs(runs: pd.DataFrame, model_name: str) -> pd.DataFrame:
+    """Keep the runs that logged a given model, latest first.
+
+    Args:
+        runs (pd.DataFrame): Runs of the experiment, as returned by mlflow.search_runs.
+        model_name (str): Model name (cst.MODEL_NAME or a per segment name).
+
+    Returns:
+        pd.DataFrame: Matching runs, re-indexed from 0.
+    """
+    # Runs logged before the model_name tag existed all hold the global model
+    if "tags.model_name" in runs.columns:
+        run_model_names = runs["tags.model_name"].fillna(cst.MODEL_NAME)
+    else:
+        run_model_names = pd.Series(cst.MODEL_NAME, index=runs.index)
+
+    return runs[run_model_names == model_name].reset_index(drop=True)
+
+
+def load_run_mlflow(
+    get_metric: bool = False, return_run_id: bool = False, model_name: str = cst.MODEL_NAME
+) -> Union[dict[str, float], "xgb.XGBClassifier", tuple["xgb.XGBClassifier", str]]:
     """Load required run from MLFlow registry to extract its metrics or the model itself.
 
     Args:
         get_metric (bool, optional): Extract the metrics of the run if needed. Defaults to False.
+        return_run_id (bool, optional): Also return the run ID of the model, used as model version. Defaults to False.
+        model_name (str, optional): Model to load, the global one or a per segment one. Defaults to cst.MODEL_NAME.
+
+    Raises:
+        ValueError: When no run logged `model_name`.
 
     Returns:
-        Union[dict[str, float], xgb.XGBClassifier]: Extract the model artifacts of the run.
+        Union[dict[str, float], xgb.XGBClassifier, tuple[xgb.XGBClassifier, str]]: Extract the model artifacts
+            of the run.
     """
+    # mlflow is slow to import, only pay for it when a run is actually requested
+    import mlflow.xgboost
 
     mlflow.set_tracking_uri(uri=cst.URI_PATH_DEFAULT)
 
-    # Get latest run ID from the experiment called EXPERIMENT_NAME
+    # Get latest run ID of model_name from the experiment called EXPERIMENT_NAME
     current_experiment = dict(mlflow.get_experiment_by_name(cst.EXPERIMENT_NAME))
     experiment_id = current_experiment["experiment_id"]
-    run_id = mlflow.search_runs(experiment_id)
+    run_id = select_model_runs(mlflow.search_runs(experiment_id, filter_string=FINISHED_RUNS), model_name)
+
+    if run_id.empty:
+        raise ValueError(f"No run found for model {model_name}.")
 
     if get_metric:
         metric_cols = [
@@ -40,12 +77,61 @@ def load_run_mlflow(get_metric: bool = False) -> Union[dict[str, float], xgb.XGB
     else:
         run_id = run_id["run_id"][0]
         # Load the model matching run ID
-        model_uri = os.path.join(cst.URI_PATH_DEFAULT, f"{experiment_id}/{run_id}/artifacts/{cst.MODEL_NAME}")
+        model_uri = os.path.join(cst.URI_PATH_DEFAULT, f"{experiment_id}/{run_id}/artifacts/{model_name}")
         loaded_model = mlflow.xgboost.load_model(model_uri)
 
+        if return_run_id:
+            return loaded_model, run_id
+
         return loaded_model
 
 
+def load_run_tags(model_name: str = cst.MODEL_NAME) -> dict[str, str]:
+    """Tags of the run load_run_mlflow loads (e.g. trained_until, split_by and segment).
+
+    Args:
+        model_name (str, optional): Model name. Defaults to cst.MODEL_NAME.
+
+    Raises:
+        ValueError: When no run logged `model_name`.
+
+    Returns:
+        dict[str, str]: Run tags, without the "tags." prefix.
+    """
+    import mlflow
+
+    mlflow.set_tracking_uri(uri=cst.URI_PATH_DEFAULT)
+
+    experiment_id = dict(mlflow.get_experiment_by_name(cst.EXPERIMENT_NAME))["experiment_id"]
+    runs = select_model_runs(mlflow.search_runs(experiment_id, filter_string=FINISHED_RUNS), model_name)
+
+    if runs.empty:
+        raise ValueError(f"No run found for model {model_name}.")
+
+    tags = runs.filter(like="tags.", axis=1).iloc[0].dropna()
+
+    return {column.removeprefix("tags."): str(value) for column, value in tags.items()}
+
+
+def list_model_names() -> list[str]:
+    """Names of the models logged in the experiment (global and per segment).
+
+    Returns:
+        list[str]: Model names.
+    """
+    import mlflow
+
+    mlflow.set_tracking_uri(uri=cst.URI_PATH_DEFAULT)
+
+    experiment_id = dict(mlflow.get_experiment_by_name(cst.EXPERIMENT_NAME))["experiment_id"]
+    runs = mlflow.search_runs(experiment_id, filter_string=FINISHED_RUNS)
+
+    if "tags.model_name" not in runs.columns:
+        return [cst.MODEL_NAME] if len(runs) else []
+
+    return sorted(set(runs["tags.model_name"].fillna(cst.MODEL_NAME)))
+
+
 def prepare_data_inference(df: pd.DataFrame, home_team: str, away_team: str) -> pd.DataFrame:
     """Prepare dataset for inference by removing all rows that are not matching the last HOME and AWAY team game.
 
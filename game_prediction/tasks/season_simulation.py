@@ -0,0 +1,203 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, NamedTuple, Union
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+import game_prediction.constants as cst
+
+# Monte Carlo simulation of the end of a season: every remaining fixture is drawn from the model's class
+# probabilities, for many seasons at once as NumPy arrays, and the final tables are aggregated into points and
+# position distributions per team. Goals are not simulated, teams level on points are ranked at random.
+
+POINTS = {"WIN": 3, "DRAW": 1, "LOSS": 0}
+
+
+class SeasonCounts(NamedTuple):
+    """Simulated final tables, counted per team.
+
+    points: number of seasons ending on each points total, shape (n_teams, max_points + 1).
+    positions: number of seasons ending at each position (0 for the first), shape (n_teams, n_teams).
+    """
+
+    points: npt.NDArray[np.int64]
+    positions: npt.NDArray[np.int64]
+
+
+def season_points(season_games: pd.DataFrame) -> pd.Series:
+    """Points won so far by each team.
+
+    Args:
+        season_games (pd.DataFrame): game_data rows of the games played this season.
+
+    Returns:
+        pd.Series: Points indexed by team.
+    """
+    return season_games["FINAL_RESULT"].map(POINTS).groupby(season_games["TEAM"]).sum()
+
+
+def remaining_fixtures(season_games: pd.DataFrame, teams: list[str]) -> list[tuple[str, str]]:
+    """Fixtures of a double round robin not played yet: each team hosts every other team once.
+
+    Args:
+        season_games (pd.DataFrame): game_data rows of the games played this season.
+        teams (list[str]): Teams of the league.
+
+    Returns:
+        list[tuple[str, str]]: (home team, away team) of each remaining fixture.
+    """
+    games = season_games.pivot(index="ID_GAME", columns="STATUS", values="TEAM")
+    played = set(zip(games["HOME"], games["AWAY"]))
+
+    return [(home, away) for home in teams for away in teams if home != away and (home, away) not in played]
+
+
+def simulate_seasons(
+    probabilities: npt.NDArray[np.floating[Any]],
+    home_index: npt.NDArray[np.int64],
+    away_index: npt.NDArray[np.int64],
+    initial_points: npt.NDArray[np.float32],
+    n_simulations: int,
+    seed: Union[int, np.random.SeedSequence] = 0,
+    batch_size: int = cst.SIMULATION_BATCH_SIZE,
+) -> SeasonCounts:
+    """Draw the remaining fixtures of `n_simulations` seasons, `batch_size` seasons at a time.
+
+    Args:
+        probabilities (npt.NDArray[np.floating[Any]]): Class probabilities of each fixture,
+            shape (n_fixtures, n_classes).
+        home_index (npt.NDArray[np.int64]): Home team of each fixture, as an index in the teams.
+        away_index (npt.NDArray[np.int64]): Away team of each fixture.
+        initial_points (npt.NDArray[np.float32]): Points of each team before the remaining fixtures.
+        n_simulations (int): Number of seasons.
+        seed (Union[int, np.random.SeedSequence], optional): Seed of the draws. Defaults to 0.
+        batch_size (int, optional): Seasons drawn at once. Defaults to cst.SIMULATION_BATCH_SIZE.
+
+    Returns:
+        SeasonCounts: Final points and positions counts.
+    """
+    rng = np.random.default_rng(seed)
+    n_teams, n_fixtures = len(initial_points), len(probabilities)
+
+    home_win = probabilities[:, cst.LABEL_CONVERTED["HOME_WIN"]].astype(np.float32)
+    home_win_or_draw = home_win + probabilities[:, cst.LABEL_CONVERTED["DRAW"]].astype(np.float32)
+
+    # Points of every fixture are summed per team with a matrix product
+    home_teams = np.zeros((n_fixtures, n_teams), dtype=np.float32)
+    home_teams[np.arange(n_fixtures), home_index] = 1
+    away_teams = np.zeros((n_fixtures, n_teams), dtype=np.float32)
+    away_teams[np.arange(n_fixtures), away_index] = 1
+
+    max_points = int((initial_points + 3 * (home_teams.sum(axis=0) + away_teams.sum(axis=0))).max())
+    points_counts = np.zeros(n_teams * (max_points + 1), dtype=np.int64)
+    positions_counts = np.zeros(n_teams * n_teams, dtype=np.int64)
+    team_offsets = np.arange(n_teams)
+
+    for start in range(0, n_simulations, batch_size):
+        n_batch = min(batch_size, n_simulations - start)
+
+        uniform = rng.random((n_batch, n_fixtures), dtype=np.float32)
+        home_wins, draws = uniform < home_win, (uniform >= home_win) & (uniform < home_win_or_draw)
+        home_points = (3 * home_wins + draws).astype(np.float32)
+        away_points = (3 * ~(home_wins | draws) + draws).astype(np.float32)
+
+        points = (initial_points + home_points @ home_teams + away_points @ away_teams).astype(np.int64)
+
+        # Random tie-break below one point, then the team of each position
+        ranking = np.argsort(-(points + 0.5 * rng.random((n_batch, n_teams))), axis=1)
+        positions = np.empty_like(ranking)
+        np.put_along_axis(positions, ranking, np.broadcast_to(team_offsets, ranking.shape), axis=1)
+
+        points_counts += np.bincount((team_offsets * (max_points + 1) + points).ravel(), minlength=len(points_counts))
+        positions_counts += np.bincount((team_offsets * n_teams + positions).ravel(), minlength=len(positions_counts))
+
+    return SeasonCounts(points_counts.reshape(n_teams, max_points + 1), positions_counts.reshape(n_teams, n_teams))
+
+
+def simulate_seasons_parallel(
+    probabilities: npt.NDArray[np.floating[Any]],
+    home_index: npt.NDArray[np.int64],
+    away_index: npt.NDArray[np.int64],
+    initial_points: npt.NDArray[np.float32],
+    n_simulations: int,
+    n_workers: int,
+    seed: int = 0,
+) -> SeasonCounts:
+    """Same as simulate_seasons, spread across a process pool with independent random streams.
+
+    Args:
+        probabilities (npt.NDArray[np.floating[Any]]): Class probabilities of each fixture,
+            shape (n_fixtures, n_classes).
+        home_index (npt.NDArray[np.int64]): Home team of each fixture, as an index in the teams.
+        away_index (npt.NDArray[np.int64]): Away team of each fixture.
+        initial_points (npt.NDArray[np.float32]): Points of each team before the remaining fixtures.
+        n_simulations (int): Number of seasons.
+        n_workers (int): Worker processes.
+        seed (int, optional): Seed of the draws. Defaults to 0.
+
+    Returns:
+        SeasonCounts: Final points and positions counts.
+    """
+    if n_workers <= 1:
+        return simulate_seasons(probabilities, home_index, away_index, initial_points, n_simulations, seed)
+
+    sizes = [len(part) for part in np.array_split(np.arange(n_simulations), n_workers)]
+    seeds = np.random.SeedSequence(seed).spawn(n_workers)
+
+    # spawn rather than fork, as in train_parallel
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [
+            executor.submit(simulate_seasons, probabilities, home_index, away_index, initial_points, size, worker_seed)
+            for size, worker_seed in zip(sizes, seeds)
+        ]
+        counts = [future.result() for future in futures]
+
+    return SeasonCounts(
+        np.sum([count.points for count in counts], axis=0), np.sum([count.positions for count in counts], axis=0)
+    )
+
+
+def summarize_seasons(
+    teams: list[str],
+    counts: SeasonCounts,
+    european_spots: int = cst.EUROPEAN_SPOTS,
+    relegation_spots: int = cst.RELEGATION_SPOTS,
+) -> pd.DataFrame:
+    """Final table probabilities of each team.
+
+    Args:
+        teams (list[str]): Teams, in the order of the counts.
+        counts (SeasonCounts): Simulated final tables.
+        european_spots (int, optional): Positions qualifying for Europe. Defaults to cst.EUROPEAN_SPOTS.
+        relegation_spots (int, optional): Positions relegated. Defaults to cst.RELEGATION_SPOTS.
+
+    Returns:
+        pd.DataFrame: Expected and 5% / 50% / 95% quantiles of the points, expected position, title, European
+            spot and relegation probabilities, then the probability of every position (1 for the first),
+            one row per team, best expected points first.
+    """
+    n_teams = len(teams)
+    points_probabilities = counts.points / counts.points.sum(axis=1, keepdims=True)
+    position_probabilities = counts.positions / counts.positions.sum(axis=1, keepdims=True)
+    # Smallest points total reached with probability at least q
+    points_quantiles = {
+        f"points_p{round(quantile * 100)}": (points_probabilities.cumsum(axis=1) < quantile).sum(axis=1)
+        for quantile in (0.05, 0.5, 0.95)
+    }
+
+    summary = pd.DataFrame(
+        {
+            "team": teams,
+            "expected_points": points_probabilities @ np.arange(counts.points.shape[1]),
+            **points_quantiles,
+            "expected_position": position_probabilities @ np.arange(1, n_teams + 1),
+            "title": position_probabilities[:, 0],
+            "europe": position_probabilities[:, :european_spots].sum(axis=1),
+            "relegation": position_probabilities[:, n_teams - relegation_spots :].sum(axis=1),
+        }
+    )
+    positions = pd.DataFrame(position_probabilities, columns=[f"position_{i}" for i in range(1, n_teams + 1)])
+
+    return pd.concat([summary, positions], axis=1).sort_values("expected_points", ascending=False, ignore_index=True)
@@ -0,0 +1,252 @@
+import atexit
+import json
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from functools import lru_cache
+from typing import TYPE_CHECKING, NamedTuple, Union
+
+import mlflow.xgboost
+from mlflow.entities import Metric, Param, RunTag
+from mlflow.exceptions import MlflowException
+from mlflow.tracking import MlflowClient
+
+import game_prediction.constants as cst
+
+if TYPE_CHECKING:
+    import xgboost as xgb
+    from mlflow.models.signature import ModelSignature
+
+
+class RunRecord(NamedTuple):
+    """Everything logged for one training run."""
+
+    model_name: str
+    metrics: dict[str, float]
+    params: dict[str, str]
+    tags: dict[str, str]
+    # Milliseconds, used as run start time and metric timestamp so replayed runs keep their order
+    created_at: int
+    model: Union["xgb.XGBClassifier", None] = None
+    signature: Union["ModelSignature", None] = None
+
+
+def fail_fast_tracking_requests() -> None:
+    """A slow remote tracking server should fail fast so the run gets buffered, not hold training for minutes.
+    Only set by the processes logging runs, unless already set in the environment: the API and notebooks
+    importing this module keep the MLFlow defaults.
+    """
+    os.environ.setdefault("MLFLOW_HTTP_REQUEST_TIMEOUT", str(cst.TRACKING_HTTP_TIMEOUT))
+    os.environ.setdefault("MLFLOW_HTTP_REQUEST_MAX_RETRIES", str(cst.TRACKING_HTTP_MAX_RETRIES))
+
+
+def save_model_dir(record: RunRecord, path: str) -> None:
+    """Write the model of a run in the MLFlow model format, locally.
+
+    Args:
+        record (RunRecord): Run to log.
+        path (str): Destination directory, must not exist.
+    """
+    mlflow.xgboost.save_model(record.model, path, signature=record.signature)
+
+
+def get_experiment_id(client: MlflowClient) -> str:
+    """ID of the EXPERIMENT_NAME experiment, created if needed.
+
+    Args:
+        client (MlflowClient): Tracking client.
+
+    Returns:
+        str: Experiment ID.
+    """
+    experiment = client.get_experiment_by_name(cst.EXPERIMENT_NAME)
+    if experiment is not None:
+        return experiment.experiment_id
+
+    try:
+        return client.create_experiment(cst.EXPERIMENT_NAME)
+    except MlflowException:
+        # Created in the meantime by another training process
+        return client.get_experiment_by_name(cst.EXPERIMENT_NAME).experiment_id
+
+
+def log_run(client: MlflowClient, record: RunRecord, model_dir: str) -> str:
+    """Log a run with one batched call for metrics, params and tags, then upload its model.
+
+    Args:
+        client (MlflowClient): Tracking client.
+        record (RunRecord): Run to log.
+        model_dir (str): Model saved by save_model_dir.
+
+    Returns:
+        str: Run ID.
+    """
+    run = client.create_run(get_experiment_id(client), start_time=record.created_at, run_name=record.model_name)
+    run_id = run.info.run_id
+    try:
+        client.log_batch(
+            run_id,
+            metrics=[Metric(key, value, record.created_at, 0) for key, value in record.metrics.items()],
+            params=[Param(key, value) for key, value in record.params.items()],
+            tags=[RunTag(key, value) for key, value in record.tags.items()],
+        )
+        client.log_artifacts(run_id, model_dir, artifact_path=record.model_name)
+    except Exception:
+        # load_run_mlflow only reads FINISHED runs, a partial run is never served
+        client.set_terminated(run_id, status="FAILED")
+        raise
+
+    client.set_terminated(run_id)
+
+    return run_id
+
+
+def buffer_run(record: RunRecord, model_dir: str) -> str:
+    """Store a run that could not be logged in the local buffer (run.json and the model directory).
+
+    Args:
+        record (RunRecord): Run to store.
+        model_dir (str): Model saved by save_model_dir.
+
+    Returns:
+        str: Buffered run directory.
+    """
+    path = os.path.join(cst.TRACKING_BUFFER_DIR, f"{record.created_at}_{uuid.uuid4().hex[:8]}")
+    tmp_path = f"{path}.tmp"
+
+    shutil.copytree(model_dir, os.path.join(tmp_path, "model"))
+    with open(os.path.join(tmp_path, "run.json"), "w") as file:
+        json.dump(record._replace(model=None, signature=None)._asdict(), file)
+    # Readers only pick up complete runs
+    os.replace(tmp_path, path)
+
+    return path
+
+
+def replay_buffered_runs() -> int:
+    """Log the buffered runs to the tracking server, oldest first, stopping at the first failure.
+
+    Returns:
+        int: Number of runs logged.
+    """
+    if not os.path.isdir(cst.TRACKING_BUFFER_DIR):
+        return 0
+
+    fail_fast_tracking_requests()
+    client = MlflowClient(tracking_uri=cst.URI_PATH_DEFAULT)
+    n_logged = 0
+    for name in sorted(os.listdir(cst.TRACKING_BUFFER_DIR)):
+        path = os.path.join(cst.TRACKING_BUFFER_DIR, name)
+        if name.endswith(".tmp"):
+            continue
+
+        with open(os.path.join(path, "run.json")) as file:
+            record = RunRecord(**json.load(file))
+        try:
+            log_run(client, record, os.path.join(path, "model"))
+        except Exception as error:
+            print(f"Tracking server still unavailable ({error}), {name} stays buffered.")
+            break
+
+        shutil.rmtree(path)
+        n_logged += 1
+
+    return n_logged
+
+
+class TrackingWriter:
+    """Log runs from a background thread so training loops do not wait on the tracking server.
+
+    Runs wait in a bounded queue. When it stays full (the server does not keep up) or when logging
+    fails, runs go to the local buffer instead, to be replayed by replay_buffered_runs.
+    """
+
+    def __init__(
+        self, max_queued_runs: int = cst.TRACKING_QUEUE_SIZE, enqueue_timeout: float = cst.TRACKING_ENQUEUE_TIMEOUT
+    ) -> None:
+        """Class instantiation, starts the writer thread.
+
+        Args:
+            max_queued_runs (int, optional): Queue size. Defaults to cst.TRACKING_QUEUE_SIZE.
+            enqueue_timeout (float, optional): Seconds to wait for a queue slot.
+                Defaults to cst.TRACKING_ENQUEUE_TIMEOUT.
+        """
+        self._queue: queue.Queue[RunRecord] = queue.Queue(maxsize=max_queued_runs)
+        self.enqueue_timeout = enqueue_timeout
+        self.logged, self.buffered = 0, 0
+
+        self._thread = threading.Thread(target=self._work, name="mlflow-tracking", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: RunRecord) -> None:
+        """Queue a run to be logged.
+
+        Args:
+            record (RunRecord): Run to log.
+        """
+        try:
+            self._queue.put(record, timeout=self.enqueue_timeout)
+        except queue.Full:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                model_dir = os.path.join(tmp_dir, "model")
+                save_model_dir(record, model_dir)
+                path = buffer_run(record, model_dir)
+            self.buffered += 1
+            print(f"Tracking queue full, run buffered to {path}.")
+
+    def flush(self) -> None:
+        """Wait until every queued run is logged or buffered."""
+        self._queue.join()
+
+    def _work(self) -> None:
+        """Writer thread loop."""
+        while True:
+            record = self._queue.get()
+            try:
+                self._log(record)
+            except Exception as error:  # Keep the thread alive for the next runs
+                print(f"Run of {record.model_name} could not be logged nor buffered: {error}")
+            finally:
+                self._queue.task_done()
+
+    def _log(self, record: RunRecord) -> None:
+        """Log a run, buffering it locally when the tracking server fails."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_dir = os.path.join(tmp_dir, "model")
+            save_model_dir(record, model_dir)
+
+            start = time.perf_counter()
+            try:
+                run_id = log_run(MlflowClient(tracking_uri=cst.URI_PATH_DEFAULT), record, model_dir)
+            except Exception as error:
+                path = buffer_run(record, model_dir)
+                self.buffered += 1
+                print(f"Tracking server unavailable ({error}), run buffered to {path}.")
+                return
+
+        self.logged += 1
+        print(f"Run {run_id} of {record.model_name} logged in {time.perf_counter() - start:.2f}s.")
+
+
+@lru_cache(maxsize=None)
+def get_tracking_writer() -> TrackingWriter:
+    """Process wide writer, flushed at interpreter exit."""
+    fail_fast_tracking_requests()
+    writer = TrackingWriter()
+    atexit.register(writer.flush)
+
+    return writer
+
+
+def flush_tracking() -> None:
+    """Wait for the runs submitted by save_to_mlflow to be logged or buffered."""
+    if get_tracking_writer.cache_info().currsize:
+        get_tracking_writer().flush()
+
+
+if __name__ == "__main__":
+    print(f"{replay_buffered_runs()} buffered runs logged.")
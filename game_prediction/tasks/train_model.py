@@ -1,22 +1,87 @@
+from typing import Union
+
 import pandas as pd
 import xgboost as xgb
 from mlflow.models import infer_signature
 from mlflow.models.signature import ModelSignature
 
+import game_prediction.constants as cst
+
 
-def train_model(X_train: pd.DataFrame, y_train: pd.Series) -> tuple[xgb.XGBClassifier, ModelSignature]:
+def train_model(
+    X_train: pd.DataFrame, y_train: pd.Series, n_jobs: Union[int, None] = None
+) -> tuple[xgb.XGBClassifier, ModelSignature]:
     """Simple model training.
 
     Args:
         X_train (pd.DataFrame): Explicative variables.
         y_train (pd.Series): Target
+        n_jobs (Union[int, None], optional): XGBoost threads. Defaults to None (all cores).
 
     Returns:
         xgb.XGBClassifier: Fitted model.
     """
-    model = xgb.XGBClassifier()
+    model = xgb.XGBClassifier(n_jobs=n_jobs)
     model.fit(X_train, y_train)
 
     signature = infer_signature(X_train, model.predict(X_train))
 
     return model, signature
+
+
+def classifier_from_booster(booster: xgb.Booster) -> xgb.XGBClassifier:
+    """Wrap a booster trained with xgb.train into a classifier, as logged to MLFlow and served.
+
+    Args:
+        booster (xgb.Booster): Trained multi-class booster.
+
+    Returns:
+        xgb.XGBClassifier: Fitted model.
+    """
+    model = xgb.XGBClassifier()
+    model.load_model(bytearray(booster.save_raw("ubj")))
+
+    return model
+
+
+def continue_training(
+    model: xgb.XGBClassifier,
+    X_new: pd.DataFrame,
+    y_new: pd.Series,
+    mode: str = "boost",
+    n_rounds: int = cst.INCREMENTAL_ROUNDS,
+) -> tuple[xgb.XGBClassifier, ModelSignature]:
+    """Update a fitted model on new games only, instead of training from scratch on the full history.
+
+    Args:
+        model (xgb.XGBClassifier): Fitted model, left unchanged.
+        X_new (pd.DataFrame): Explicative variables of the new games, in the model column order.
+        y_new (pd.Series): Target of the new games.
+        mode (str, optional): "boost" adds `n_rounds` trees fitted on the new games, "refresh" keeps the trees
+            and recomputes their leaf values from the new games. Defaults to "boost".
+        n_rounds (int, optional): Boosting rounds added in "boost" mode. Defaults to cst.INCREMENTAL_ROUNDS.
+
+    Raises:
+        ValueError: When mode is not one of cst.INCREMENTAL_MODES.
+
+    Returns:
+        tuple[xgb.XGBClassifier, ModelSignature]: Updated model and its MLFlow signature.
+    """
+    if mode not in cst.INCREMENTAL_MODES:
+        raise ValueError(f"mode must be one of {cst.INCREMENTAL_MODES}, got {mode}.")
+
+    booster = model.get_booster()
+    params = {key: value for key, value in model.get_xgb_params().items() if value is not None}
+    # A few new games may miss a class, which XGBClassifier.fit rejects: train the booster directly
+    params["num_class"] = model.n_classes_
+
+    if mode == "refresh":
+        params.update(process_type="update", updater="refresh", refresh_leaf=True)
+        n_rounds = booster.num_boosted_rounds()
+
+    updated_booster = xgb.train(params, xgb.DMatrix(X_new, label=y_new), num_boost_round=n_rounds, xgb_model=booster)
+    updated_model = classifier_from_booster(updated_booster)
+
+    signature = infer_signature(X_new, updated_model.predict(X_new))
+
+    return updated_model, signature
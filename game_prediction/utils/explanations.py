@@ -0,0 +1,176 @@
+from collections import OrderedDict
+from typing import Any, Union
+
+import numpy as np
+
+import game_prediction.constants as cst
+from game_prediction.config import TableMapping, Tables
+
+# Explanations of the predictions: the per feature contributions computed natively by XGBoost
+# (FastPredictor.predict_contributions) are summed back to the game_data variable (MatchCols attribute)
+# and the transform (AVG, LAST or CUMU) each model column is computed from.
+
+TRANSFORMS = ("AVG", "LAST", "CUMU")
+
+
+def feature_sources(feature_names: list[str]) -> list[tuple[str, str]]:
+    """MatchCols variable and transform of model columns, e.g. ("POSSESSION_PERC", "AVG") for
+    "AVG_possession%_RATIO" and ("FINAL_RESULT_STATUS", "CUMU") for "CUMU_FINAL_RESULT_STATUS_HOME_WIN_RATIO".
+
+    Args:
+        feature_names (list[str]): Model input columns.
+
+    Raises:
+        ValueError: When a column is not computed from a game_data variable.
+
+    Returns:
+        list[tuple[str, str]]: (variable, transform) of each column.
+    """
+    match_columns = TableMapping().get_table_info(Tables.GAME_DATA)
+    attributes = {
+        match_columns.wk_columns()[attribute]["name"]: attribute for attribute in match_columns.get_all_atributes()
+    }
+    # One-hot encoded results are named after their column and category
+    dummy_columns = {
+        f"{column}_{category}": column
+        for column, categories in cst.RESULT_CATEGORIES.items()
+        for category in categories
+    }
+
+    sources = []
+    for name in feature_names:
+        transform, _, column = name[: -len("_RATIO")].partition("_")
+        column = dummy_columns.get(column, column)
+        if not name.endswith("_RATIO") or transform not in TRANSFORMS or column not in attributes:
+            raise ValueError(f"Model column {name} is not computed from a game_data variable.")
+        sources.append((attributes[column], transform))
+
+    return sources
+
+
+def predicted_class_contributions(probabilities: np.ndarray, contributions: np.ndarray) -> np.ndarray:
+    """Keep the contributions to the predicted class of each game.
+
+    Args:
+        probabilities (np.ndarray): Class probabilities, shape (n_games, n_classes).
+        contributions (np.ndarray): Contributions, shape (n_games, n_classes, n_features + 1).
+
+    Returns:
+        np.ndarray: Contributions to the predicted class, shape (n_games, n_features + 1).
+    """
+    return contributions[np.arange(len(contributions)), probabilities.argmax(axis=1)]
+
+
+class Explainer:
+    """Summarize the contributions to a predicted class per model column, variable and transform."""
+
+    def __init__(self, feature_names: list[str]) -> None:
+        """Class instantiation.
+
+        Args:
+            feature_names (list[str]): Model input columns, in the order of the contributions.
+        """
+        self.feature_names = list(feature_names)
+        self.sources = feature_sources(self.feature_names)
+        self.variables = list(dict.fromkeys(variable for variable, _ in self.sources))
+        self.variable_index = np.array([self.variables.index(variable) for variable, _ in self.sources])
+        self.transform_index = np.array([TRANSFORMS.index(transform) for _, transform in self.sources])
+
+    def summarize(
+        self, probabilities: np.ndarray, contributions: np.ndarray, top: int = cst.EXPLAIN_TOP_FEATURES
+    ) -> dict[str, Any]:
+        """Explanation of a game.
+
+        Args:
+            probabilities (np.ndarray): Class probabilities, shape (n_classes,).
+            contributions (np.ndarray): Contributions to the predicted class, shape (n_features + 1,), bias last.
+            top (int, optional): Model columns listed, largest absolute contributions first.
+                Defaults to cst.EXPLAIN_TOP_FEATURES.
+
+        Returns:
+            dict[str, Any]: Prediction, class probabilities, bias, and contributions summed per variable and per
+                transform (largest absolute contributions first) and of the `top` model columns.
+        """
+        features = contributions[:-1].astype(float)
+        by_variable = np.bincount(self.variable_index, weights=features, minlength=len(self.variables))
+        by_transform = np.bincount(self.transform_index, weights=features, minlength=len(TRANSFORMS))
+
+        return {
+            "PREDICTION": cst.LABEL_CONVERTED_INV[int(probabilities.argmax())],
+            "probabilities": {label: float(probabilities[index]) for label, index in cst.LABEL_CONVERTED.items()},
+            "bias": float(contributions[-1]),
+            "variables": {
+                self.variables[index]: float(by_variable[index])
+                for index in np.argsort(-np.abs(by_variable), kind="stable")
+            },
+            "transforms": {TRANSFORMS[index]: float(contribution) for index, contribution in enumerate(by_transform)},
+            "features": [
+                {
+                    "feature": self.feature_names[index],
+                    "variable": self.sources[index][0],
+                    "transform": self.sources[index][1],
+                    "contribution": float(features[index]),
+                }
+                for index in np.argsort(-np.abs(features), kind="stable")[:top]
+            ],
+        }
+
+
+class ExplanationCache:
+    """Class probabilities and contributions to the predicted class of games explained live, indexed by
+    (home team, away team, run ID) so that a new model version never serves the explanations of the previous
+    one. The least recently used games are evicted first.
+    """
+
+    def __init__(self, max_games: int = cst.EXPLANATION_CACHE_SIZE) -> None:
+        """Class instantiation.
+
+        Args:
+            max_games (int, optional): Maximum number of games kept. Defaults to cst.EXPLANATION_CACHE_SIZE.
+        """
+        self.max_games = max_games
+        self._games: OrderedDict[tuple[str, str, str], tuple[np.ndarray, np.ndarray]] = OrderedDict()
+        self.hits, self.misses = 0, 0
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    def get(self, key: tuple[str, str, str]) -> Union[tuple[np.ndarray, np.ndarray], None]:
+        """Explanation of a game.
+
+        Args:
+            key (tuple[str, str, str]): Home team, away team and run ID.
+
+        Returns:
+            Union[tuple[np.ndarray, np.ndarray], None]: Class probabilities and contributions to the predicted
+                class, None when the game is not cached.
+        """
+        explanation = self._games.get(key)
+        if explanation is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._games.move_to_end(key)
+        return explanation
+
+    def put(self, key: tuple[str, str, str], probabilities: np.ndarray, contributions: np.ndarray) -> None:
+        """Cache the explanation of a game.
+
+        Args:
+            key (tuple[str, str, str]): Home team, away team and run ID.
+            probabilities (np.ndarray): Class probabilities, shape (n_classes,).
+            contributions (np.ndarray): Contributions to the predicted class, shape (n_features + 1,).
+        """
+        self._games[key] = (probabilities, contributions)
+        self._games.move_to_end(key)
+        while len(self._games) > self.max_games:
+            self._games.popitem(last=False)
+
+    def stats(self) -> dict[str, int]:
+        """Cached games and cache counters."""
+        return {"cached": len(self._games), "max_games": self.max_games, "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        """Drop all explanations, e.g. once new games changed the team features."""
+        self._games.clear()
@@ -0,0 +1,162 @@
+import time
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+import game_prediction.constants as cst
+from game_prediction.utils.team_features import FeatureLayout
+
+if TYPE_CHECKING:
+    import xgboost as xgb
+
+
+class FastPredictor:
+    """Serving path calling the native booster in-place prediction on float32 NumPy rows already in
+    model column order, skipping the DataFrame construction, column validation and sklearn wrapper
+    of XGBClassifier.predict. Outputs are the same as XGBClassifier.predict_proba.
+    """
+
+    def __init__(self, model: "xgb.XGBClassifier") -> None:
+        """Class instantiation.
+
+        Args:
+            model (xgb.XGBClassifier): Fitted model.
+        """
+        self.booster = model.get_booster()
+        self.layout = FeatureLayout(self.booster.feature_names)
+        self.n_features = len(self.layout.feature_names)
+
+        # Same trees as XGBClassifier.predict, which stops at the best iteration after early stopping
+        try:
+            self.iteration_range = (0, model.best_iteration + 1)
+        except AttributeError:
+            self.iteration_range = (0, 0)
+
+    def predict_proba(self, inference_data: np.ndarray) -> np.ndarray:
+        """Class probabilities of model inputs.
+
+        Args:
+            inference_data (np.ndarray): float32 inputs in model column order, shape (n_games, n_features).
+
+        Returns:
+            np.ndarray: Class probabilities, shape (n_games, n_classes).
+        """
+        return self.booster.inplace_predict(  # type: ignore
+            inference_data, iteration_range=self.iteration_range, validate_features=False
+        )
+
+    def predict_contributions(self, inference_data: np.ndarray, batch_size: int = cst.EXPLAIN_BATCH_SIZE) -> np.ndarray:
+        """Per feature contributions (exact TreeSHAP values) of model inputs, computed natively by XGBoost
+        `batch_size` games at a time. The contributions of a class sum to its margin, the log-odds before
+        the softmax.
+
+        Args:
+            inference_data (np.ndarray): float32 inputs in model column order, shape (n_games, n_features).
+            batch_size (int, optional): Games per call. Defaults to cst.EXPLAIN_BATCH_SIZE.
+
+        Returns:
+            np.ndarray: Contributions, shape (n_games, n_classes, n_features + 1), the bias last.
+        """
+        import xgboost as xgb
+
+        contributions = np.empty((len(inference_data), len(cst.LABEL_CONVERTED), self.n_features + 1), dtype=np.float32)
+        for start in range(0, len(inference_data), batch_size):
+            batch = xgb.DMatrix(inference_data[start : start + batch_size], feature_names=self.layout.feature_names)
+            contributions[start : start + batch_size] = self.booster.predict(
+                batch, pred_contribs=True, iteration_range=self.iteration_range
+            )
+
+        return contributions
+
+    def predict_matches_proba(self, home_features: np.ndarray, away_features: np.ndarray) -> np.ndarray:
+        """Class probabilities of several games.
+
+        Args:
+            home_features (np.ndarray): Home team features, shape (n_games, n_team_features).
+            away_features (np.ndarray): Away team features, same shape.
+
+        Returns:
+            np.ndarray: Class probabilities, shape (n_games, n_classes).
+        """
+        return self.predict_proba(self.layout.match_features(home_features, away_features))
+
+
+def to_labels(probabilities: np.ndarray) -> list[str]:
+    """Convert class probabilities to predicted labels, like XGBClassifier.predict.
+
+    Args:
+        probabilities (np.ndarray): Class probabilities, shape (n_games, n_classes).
+
+    Returns:
+        list[str]: Predicted labels.
+    """
+    return [cst.LABEL_CONVERTED_INV[prediction] for prediction in probabilities.argmax(axis=1).tolist()]
+
+
+def benchmark(model: "xgb.XGBClassifier", inference_data: np.ndarray, n_repeats: int = 200) -> dict[str, Any]:
+    """Compare the sklearn wrapper on a DataFrame (current inference path) with the fast path,
+    on single rows and on the whole batch, after checking both return bit-identical probabilities.
+
+    Args:
+        model (xgb.XGBClassifier): Fitted model.
+        inference_data (np.ndarray): float32 model inputs, shape (n_games, n_features).
+        n_repeats (int, optional): Timed calls per measure. Defaults to 200.
+
+    Raises:
+        AssertionError: When both paths disagree.
+
+    Returns:
+        dict[str, Any]: Median latency of each path in microseconds.
+    """
+    import pandas as pd
+
+    predictor = FastPredictor(model)
+    frame = pd.DataFrame(inference_data, columns=predictor.layout.feature_names)
+
+    np.testing.assert_array_equal(model.predict_proba(frame), predictor.predict_proba(inference_data))
+
+    def median_us(function: Any) -> float:
+        timings = []
+        for _ in range(n_repeats):
+            start = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - start)
+        return round(float(np.median(timings)) * 1e6, 1)
+
+    single_row = inference_data[:1]
+
+    return {
+        "bit_identical": True,
+        "batch_size": len(inference_data),
+        "single_row_us": {
+            "dataframe_predict": median_us(
+                lambda: model.predict(pd.DataFrame(single_row, columns=predictor.layout.feature_names))
+            ),
+            "fast_path": median_us(lambda: predictor.predict_proba(single_row)),
+        },
+        "batch_us": {
+            "dataframe_predict": median_us(
+                lambda: model.predict(pd.DataFrame(inference_data, columns=predictor.layout.feature_names))
+            ),
+            "fast_path": median_us(lambda: predictor.predict_proba(inference_data)),
+        },
+    }
+
+
+if __name__ == "__main__":
+    from game_prediction.data_utils import read_data_from_postgres
+    from game_prediction.tasks.scoring import load_run_mlflow
+    from game_prediction.utils.team_features import team_features, team_states_from_frame
+
+    loaded_model = load_run_mlflow()
+    states = team_states_from_frame(read_data_from_postgres("game_data"))
+    features = {key: team_features(state) for key, state in states.items() if state.n_games >= cst.N_GAMES_AVG}
+    pairs = [(home, away) for home, _ in features for away, _ in features if home != away]
+    pairs = [(home, away) for home, away in pairs if (home, "HOME") in features and (away, "AWAY") in features]
+
+    layout = FeatureLayout(loaded_model.get_booster().feature_names)
+    batch = layout.match_features(
+        np.stack([features[(home, "HOME")] for home, _ in pairs]),
+        np.stack([features[(away, "AWAY")] for _, away in pairs]),
+    )
+    print(benchmark(loaded_model, batch))
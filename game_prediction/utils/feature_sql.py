@@ -0,0 +1,202 @@
+from functools import lru_cache
+
+import numpy as np
+
+import game_prediction.constants as cst
+from game_prediction.config import TableMapping, Tables
+from game_prediction.utils.team_features import RESULT_DUMMIES, TRANSFORMED_VARIABLES, TeamState
+
+# SQL counterpart of the pandas feature engineering (pre_processing_game_data and VariableTransformer):
+# AVG (mean of the last N_GAMES_AVG games), LAST (previous game) and CUMU (sum of the previous games)
+# are window functions over the games of each team, so feature-ready rows are read straight from the
+# database (PostgreSQL, or SQLite / DuckDB on a normalized table) instead of the raw history.
+# At inference time, team_state_query reads only the last games and the totals of a team.
+
+# Game date, as used to sort games in pre_processing_game_data
+GAME_DATE_SQL = 'SUBSTR("ID_GAME", LENGTH("ID_GAME") - 7)'
+
+TEAM_GAMES_WINDOW = 'PARTITION BY "TEAM" ORDER BY game_date'
+
+# Lets team_state_query read the games of a team in date order without scanning the table
+TEAM_GAME_DATE_INDEX_SQL = (
+    'CREATE INDEX IF NOT EXISTS "{table}_team_date" ON "{table}" ("TEAM", (' + GAME_DATE_SQL + "));"
+)
+
+
+def numeric_column_sql(column: str, table: str) -> str:
+    """SQL expression parsing a game_data column the way process_perc_and_abs_columns does. Columns of the
+    normalized table are already numbers and read as is. The "made of attempted" strings of the raw table
+    are split with SPLIT_PART, so only PostgreSQL can read the raw table: other engines (SQLite, DuckDB)
+    read the normalized one.
+
+    Args:
+        column (str): Column name.
+        table (str): Table read, game_data or game_data_normalized.
+
+    Returns:
+        str: SQL expression returning a double precision value.
+    """
+    if table != Tables.GAME_DATA.value:
+        return f'"{column}"'
+
+    columns = TableMapping().get_table_info(Tables.GAME_DATA).wk_columns()
+    abs_cols = [columns["PASS_ACC"]["name"], columns["SOT"]["name"], columns["SAVES"]["name"]]
+
+    if column.endswith("%"):
+        return (
+            f"""CASE WHEN "{column}" = '%' THEN 0.0 """
+            f"""ELSE CAST(SUBSTR("{column}", 1, LENGTH("{column}") - 1) AS DOUBLE PRECISION) / 100 END"""
+        )
+    if column in abs_cols:
+        return f"""CAST(TRIM(SPLIT_PART("{column}", 'of', 1)) AS DOUBLE PRECISION)"""
+
+    return f'CAST("{column}" AS DOUBLE PRECISION)'
+
+
+def passthrough_columns() -> list[str]:
+    """Columns of game_data kept as is: neither transformed nor one-hot encoded.
+
+    Returns:
+        list[str]: Column names, in the MatchCols order.
+    """
+    table_mapper = TableMapping().get_table_info(Tables.GAME_DATA)
+    columns = [table_mapper.wk_columns()[attr] for attr in table_mapper.get_all_atributes()]
+
+    return [
+        column["name"] for column in columns if not column["transform"] and column["name"] not in cst.RESULT_CATEGORIES
+    ]
+
+
+def window_feature_columns() -> list[str]:
+    """Columns computed by window functions, in the order of the pandas pipeline.
+
+    Returns:
+        list[str]: Column names.
+    """
+    return [f"CUMU_{dummy}" for dummy in RESULT_DUMMIES] + [
+        f"{prefix}_{variable}" for variable in TRANSFORMED_VARIABLES for prefix in ("AVG", "LAST", "CUMU")
+    ]
+
+
+def feature_query(table: str, condition: str = "") -> str:
+    """Single windowed query returning the rows and columns load_data computes in pandas:
+    the passthrough columns, TARGET, the result dummies and their CUMU_ features, then the
+    AVG_, LAST_ and CUMU_ features of every transformed MatchCols variable.
+
+    As in pandas, AVG_ is missing until N_GAMES_AVG non missing previous values exist, and CUMU_
+    is missing when the previous value is (the running sum skips missing values otherwise).
+
+    Args:
+        table (str): Table read, e.g. cst.GAME_DATA_TABLE.
+        condition (str, optional): WHERE clause on `table`, filtering whole team histories (e.g. on TEAM).
+            Defaults to "" (all games).
+
+    Returns:
+        str: SQL query.
+    """
+    passthrough = [f'"{column}"' for column in passthrough_columns()]
+    target = (
+        """CASE WHEN "HOME_GOAL" > "AWAY_GOAL" THEN 'HOME_WIN' """
+        """WHEN "HOME_GOAL" < "AWAY_GOAL" THEN 'AWAY_WIN' ELSE 'DRAW' END AS "TARGET" """
+    )
+    dummies = [
+        f"""CASE WHEN "{column}" = '{category}' THEN 1 ELSE 0 END AS "{column}_{category}" """
+        for column, categories in cst.RESULT_CATEGORIES.items()
+        for category in categories
+    ]
+    values = [f'{numeric_column_sql(variable, table)} AS "{variable}"' for variable in TRANSFORMED_VARIABLES]
+
+    features = [f'"{dummy}"' for dummy in RESULT_DUMMIES]
+    features += [f'SUM("{dummy}") OVER previous_games AS "CUMU_{dummy}"' for dummy in RESULT_DUMMIES]
+    for variable in TRANSFORMED_VARIABLES:
+        features += [
+            f'CASE WHEN COUNT("{variable}") OVER last_games = {cst.N_GAMES_AVG} '
+            f'THEN AVG("{variable}") OVER last_games END AS "AVG_{variable}"',
+            f'LAG("{variable}") OVER team_games AS "LAST_{variable}"',
+            f'CASE WHEN LAG("{variable}") OVER team_games IS NOT NULL '
+            f'THEN SUM("{variable}") OVER previous_games END AS "CUMU_{variable}"',
+        ]
+
+    return f"""
+        WITH games AS (
+            SELECT {", ".join(passthrough)}, {GAME_DATE_SQL} AS game_date,
+                   {", ".join([target] + dummies + values)}
+            FROM {table}
+            {condition}
+        )
+        SELECT {", ".join(passthrough)}, "TARGET",
+               {", ".join(features)}
+        FROM games
+        WINDOW team_games AS ({TEAM_GAMES_WINDOW}),
+               previous_games AS ({TEAM_GAMES_WINDOW} ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING),
+               last_games AS ({TEAM_GAMES_WINDOW} ROWS BETWEEN {cst.N_GAMES_AVG} PRECEDING AND 1 PRECEDING)
+        ORDER BY game_date, "ID_GAME", "TEAM"
+    """
+
+
+@lru_cache(maxsize=None)
+def team_state_query(table: str, team_parameter: str = "$1", status_parameter: str = "$2") -> str:
+    """Query returning the state of a team before its last game with a given STATUS : the last
+    N_GAMES_AVG previous games (kind 0, oldest first) followed by one row of totals over
+    all previous games (kind 1, game_number holding the number of previous games).
+    Only the columns the features need are read. Totals ignore missing values, like TeamState.from_history.
+
+    Args:
+        table (str): Table read, e.g. cst.GAME_DATA_TABLE.
+        team_parameter (str, optional): Placeholder of the team. Defaults to "$1" (asyncpg).
+        status_parameter (str, optional): Placeholder of the status. Defaults to "$2" (asyncpg).
+
+    Returns:
+        str: Parameterized query.
+    """
+    values = [f"{numeric_column_sql(variable, table)} AS v{i}" for i, variable in enumerate(TRANSFORMED_VARIABLES)]
+    results = [
+        f"""CASE WHEN "{column}" = '{category}' THEN 1 ELSE 0 END AS r{column}_{category}"""
+        for column, categories in cst.RESULT_CATEGORIES.items()
+        for category in categories
+    ]
+    value_names = [f"v{i}" for i in range(len(TRANSFORMED_VARIABLES))]
+    result_names = [
+        f"r{column}_{category}" for column, categories in cst.RESULT_CATEGORIES.items() for category in categories
+    ]
+
+    return f"""
+        WITH team_games AS (
+            SELECT "STATUS", ROW_NUMBER() OVER (ORDER BY {GAME_DATE_SQL}) AS game_number,
+                   {", ".join(values + results)}
+            FROM {table}
+            WHERE "TEAM" = {team_parameter}
+        ), target AS (
+            SELECT MAX(game_number) AS target_number FROM team_games WHERE "STATUS" = {status_parameter}
+        )
+        SELECT 0 AS kind, game_number, {", ".join(value_names + result_names)}
+        FROM team_games, target
+        WHERE game_number BETWEEN target_number - {cst.N_GAMES_AVG} AND target_number - 1
+        UNION ALL
+        SELECT 1 AS kind, COUNT(*) AS game_number,
+               {", ".join(f"COALESCE(SUM({name}), 0)" for name in value_names + result_names)}
+        FROM team_games, target
+        WHERE game_number < target_number
+        ORDER BY kind, game_number
+    """
+
+
+def team_state_from_rows(rows: list[tuple]) -> TeamState:
+    """Decode the rows of team_state_query straight into NumPy arrays.
+
+    Args:
+        rows (list[tuple]): Query rows.
+
+    Returns:
+        TeamState: State of the team.
+    """
+    # NULL values are decoded as NaN
+    data = np.array(rows, dtype=float)
+    recent, totals = data[data[:, 0] == 0, 2:], data[data[:, 0] == 1, 1:][0]
+    n_variables = len(TRANSFORMED_VARIABLES)
+
+    return TeamState(recent[:, :n_variables], totals[1 : n_variables + 1], totals[n_variables + 1 :], int(totals[0]))
+
+
+if __name__ == "__main__":
+    print(feature_query(cst.GAME_DATA_TABLE))
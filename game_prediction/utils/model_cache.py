@@ -0,0 +1,74 @@
+import asyncio
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+
+class ModelCache:
+    """Models loaded on first use and kept in memory up to `max_models`, the least recently used
+    one being evicted first. Concurrent requests for a model that is not loaded yet wait for a
+    single load instead of each loading it.
+    """
+
+    def __init__(self, loader: Callable[[str], Any], max_models: int) -> None:
+        """Class instantiation.
+
+        Args:
+            loader (Callable[[str], Any]): Blocking function loading a model from its name, run in a thread.
+            max_models (int): Maximum number of models kept in memory.
+        """
+        self.loader = loader
+        self.max_models = max_models
+        self._models: OrderedDict[str, Any] = OrderedDict()
+        self._locks: dict[str, asyncio.Lock] = {}
+        self.hits, self.loads, self.evictions = 0, 0, 0
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._models
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    async def get(self, name: str) -> Any:
+        """Get a model, loading it when it is not in memory.
+
+        Args:
+            name (str): Model name.
+
+        Returns:
+            Any: Loaded model, as returned by the loader.
+        """
+        async with self._locks.setdefault(name, asyncio.Lock()):
+            # Requests arriving while the model loads wait here, then find it in memory
+            if name in self._models:
+                self.hits += 1
+                self._models.move_to_end(name)
+                return self._models[name]
+
+            self.loads += 1
+            model = await asyncio.to_thread(self.loader, name)
+            self._models[name] = model
+            self._evict()
+
+        return model
+
+    def _evict(self) -> None:
+        """Drop least recently used models above `max_models`."""
+        while len(self._models) > self.max_models:
+            name, _ = self._models.popitem(last=False)
+            self.evictions += 1
+            print(f"Model {name} evicted from memory.")
+
+    def stats(self) -> dict[str, Any]:
+        """Loaded models, most recently used last, and cache counters."""
+        return {
+            "loaded": list(self._models),
+            "max_models": self.max_models,
+            "hits": self.hits,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
+
+    def clear(self) -> None:
+        """Release all models."""
+        self._models.clear()
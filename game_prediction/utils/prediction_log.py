@@ -0,0 +1,212 @@
+import asyncio
+import glob
+import os
+import time
+from contextlib import suppress
+from typing import Any, Union
+
+import numpy as np
+
+import game_prediction.constants as cst
+
+N_CLASSES = len(cst.LABEL_CONVERTED)
+
+
+class PredictionLog:
+    """Record of the predictions served by the API, kept in a preallocated ring buffer and written
+    to disk in batches by a background task, one columnar .npz file per flush.
+
+    Recording only copies values into free slots of the ring, requests never wait on the disk: when
+    the flushes do not keep up and the ring is full, new records are dropped and counted instead.
+    Files rotate: only the newest `max_files` files are kept in the directory.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        feature_names: list[str],
+        capacity: int = cst.PREDICTION_LOG_CAPACITY,
+        max_files: int = cst.PREDICTION_LOG_MAX_FILES,
+    ) -> None:
+        """Class instantiation.
+
+        Args:
+            directory (str): Directory of the log files.
+            feature_names (list[str]): Model inputs, in column order (shared by all the served models).
+            capacity (int, optional): Records held in memory. Defaults to cst.PREDICTION_LOG_CAPACITY.
+            max_files (int, optional): Log files kept on disk. Defaults to cst.PREDICTION_LOG_MAX_FILES.
+        """
+        self.directory = directory
+        self.feature_names = list(feature_names)
+        self.capacity = capacity
+        self.max_files = max_files
+
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.home_teams = np.empty(capacity, dtype=object)
+        self.away_teams = np.empty(capacity, dtype=object)
+        self.model_names = np.empty(capacity, dtype=object)
+        self.run_ids = np.empty(capacity, dtype=object)
+        # NaN for games served from the matchup table, whose features are not computed
+        self.features = np.full((capacity, len(self.feature_names)), np.nan, dtype=np.float32)
+        self.probabilities = np.zeros((capacity, N_CLASSES), dtype=np.float32)
+        self.latencies = np.zeros(capacity, dtype=np.float64)
+
+        # Monotonic counters: slots [_tail, _head) (modulo capacity) wait to be flushed
+        self._head, self._tail = 0, 0
+        self._pending = asyncio.Event()
+        self.recorded, self.dropped, self.flushed, self.files_written, self.flush_errors = 0, 0, 0, 0, 0
+
+    def __len__(self) -> int:
+        return self._head - self._tail
+
+    def record(
+        self,
+        games: list[tuple[str, str]],
+        features: np.ndarray,
+        probabilities: np.ndarray,
+        model_names: list[str],
+        run_ids: list[str],
+        latency: float,
+    ) -> int:
+        """Append the predictions of a request.
+
+        Args:
+            games (list[tuple[str, str]]): (home team, away team) of each game.
+            features (np.ndarray): Model inputs, shape (n_games, n_features), NaN rows when not computed.
+            probabilities (np.ndarray): Class probabilities, shape (n_games, n_classes).
+            model_names (list[str]): Model of each game.
+            run_ids (list[str]): MLFlow run of the model of each game.
+            latency (float): Request latency in seconds.
+
+        Returns:
+            int: Number of games recorded, the others being dropped.
+        """
+        n_games = len(games)
+        n_kept = min(n_games, self.capacity - len(self))
+        self.dropped += n_games - n_kept
+        if not n_kept:
+            return 0
+
+        slots = (self._head + np.arange(n_kept)) % self.capacity
+        self.timestamps[slots] = time.time()
+        self.home_teams[slots] = [home_team for home_team, _ in games[:n_kept]]
+        self.away_teams[slots] = [away_team for _, away_team in games[:n_kept]]
+        self.model_names[slots] = model_names[:n_kept]
+        self.run_ids[slots] = run_ids[:n_kept]
+        self.features[slots] = features[:n_kept]
+        self.probabilities[slots] = probabilities[:n_kept]
+        self.latencies[slots] = latency
+
+        self._head += n_kept
+        self.recorded += n_kept
+        if len(self) >= self.capacity // 2:
+            self._pending.set()
+
+        return n_kept
+
+    def _write(self, slots: np.ndarray) -> str:
+        """Write records to a new log file and delete the oldest files, in a worker thread.
+
+        Args:
+            slots (np.ndarray): Ring slots to write, not reused until the write returns.
+
+        Returns:
+            str: Log file.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        # Time first so files sort chronologically, process ID as several API workers share the directory
+        path = os.path.join(self.directory, f"predictions-{time.time_ns()}-{os.getpid()}.npz")
+        tmp_path = f"{path}.tmp.npz"
+
+        np.savez(
+            tmp_path,
+            timestamp=self.timestamps[slots],
+            home_team=self.home_teams[slots].astype(str),
+            away_team=self.away_teams[slots].astype(str),
+            model_name=self.model_names[slots].astype(str),
+            run_id=self.run_ids[slots].astype(str),
+            features=self.features[slots],
+            probabilities=self.probabilities[slots],
+            latency=self.latencies[slots],
+            feature_names=np.array(self.feature_names),
+        )
+        os.replace(tmp_path, path)
+
+        for old_path in sorted(glob.glob(os.path.join(self.directory, "predictions-*[0-9].npz")))[: -self.max_files]:
+            os.remove(old_path)
+
+        return path
+
+    async def flush(self) -> int:
+        """Write the pending records to a new log file.
+
+        Returns:
+            int: Number of records written.
+        """
+        head = self._head
+        if head == self._tail:
+            return 0
+
+        slots = np.arange(self._tail, head) % self.capacity
+        self._pending.clear()
+        try:
+            await asyncio.to_thread(self._write, slots)
+        except OSError as error:  # Records are lost, serving goes on
+            self.flush_errors += 1
+            print(f"Prediction log flush failed, {len(slots)} records dropped: {error}")
+            self.dropped += len(slots)
+        else:
+            self.flushed += len(slots)
+            self.files_written += 1
+
+        # Slots are reused only once written
+        self._tail = head
+
+        return len(slots)
+
+    async def run(self, interval: float = cst.PREDICTION_LOG_FLUSH_SECONDS) -> None:
+        """Flush every `interval` seconds, or as soon as the ring is half full.
+
+        Args:
+            interval (float, optional): Seconds between flushes. Defaults to cst.PREDICTION_LOG_FLUSH_SECONDS.
+        """
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._pending.wait(), timeout=interval)
+            await self.flush()
+
+    def stats(self) -> dict[str, Any]:
+        """Log counters."""
+        return {
+            "pending": len(self),
+            "capacity": self.capacity,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "flushed": self.flushed,
+            "files_written": self.files_written,
+            "flush_errors": self.flush_errors,
+        }
+
+
+def read_prediction_log(directory: str = cst.PREDICTION_LOG_DIR) -> Union[dict[str, np.ndarray], None]:
+    """Read all the log files of a directory, e.g. for monitoring or to evaluate served predictions.
+
+    Args:
+        directory (str, optional): Directory of the log files. Defaults to cst.PREDICTION_LOG_DIR.
+
+    Returns:
+        Union[dict[str, np.ndarray], None]: Concatenated columns (and feature_names), None without log files.
+    """
+    paths = sorted(glob.glob(os.path.join(directory, "predictions-*[0-9].npz")))
+    if not paths:
+        return None
+
+    files = []
+    for path in paths:
+        with np.load(path) as data:
+            files.append({name: data[name] for name in data.files})
+
+    columns = {name: np.concatenate([data[name] for data in files]) for name in files[0] if name != "feature_names"}
+    columns["feature_names"] = files[-1]["feature_names"]
+
+    return columns
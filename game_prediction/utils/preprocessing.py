@@ -1,14 +1,56 @@
-from typing import Any
-
 import numpy as np
 import pandas as pd
-from sklearn.base import BaseEstimator, TransformerMixin
+from pandas.api.types import is_numeric_dtype
 
+import game_prediction.constants as cst
 from game_prediction.config import TableDefinition
 
 
+def parse_percentages(values: pd.Series) -> pd.Series:
+    """Parse "45%" strings into rates, "%" (no value) being read as 0.
+
+    Args:
+        values (pd.Series): Percentage strings.
+
+    Returns:
+        pd.Series: Rates between 0 and 1.
+    """
+    return values.str[:-1].replace("", "0").astype(float) / 100
+
+
+def parse_made_of_attempted(values: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """Parse "12 of 20" strings into made and attempted counts.
+
+    Args:
+        values (pd.Series): "made of attempted" strings.
+
+    Returns:
+        tuple[pd.Series, pd.Series]: Made and attempted counts, as floats.
+    """
+    counts = values.str.split("of", n=1, expand=True).reindex(columns=[0, 1]).astype(float)
+
+    return counts[0], counts[1]
+
+
+def made_of_attempted_columns(table_mapper: TableDefinition) -> list[str]:
+    """Columns stored as "made of attempted" strings in the raw table.
+
+    Args:
+        table_mapper (TableDefinition): Table variables.
+
+    Returns:
+        list[str]: Column names.
+    """
+    return [
+        table_mapper.wk_columns()["PASS_ACC"]["name"],
+        table_mapper.wk_columns()["SOT"]["name"],
+        table_mapper.wk_columns()["SAVES"]["name"],
+    ]
+
+
 def process_perc_and_abs_columns(game_data: pd.DataFrame, table_mapper: TableDefinition) -> pd.DataFrame:
-    """Process columns with "%" in the name and treat columns with string in the value.
+    """Process columns with "%" in the name and treat columns with string in the value. Columns already
+    normalized at ingestion (see normalize_game_data) are numeric and left untouched.
 
     Args:
         game_data (pd.DataFrame): General game statistics table.
@@ -22,22 +64,54 @@ def process_perc_and_abs_columns(game_data: pd.DataFrame, table_mapper: TableDef
     perc_cols = [col for col in game_data.columns if col.endswith("%")]
 
     for col in perc_cols:
-        game_data[col] = np.where(game_data[col] == "%", "0%", game_data[col])
-        game_data[col] = game_data[col].str[:-1].astype(float) / 100
+        if not is_numeric_dtype(game_data[col]):
+            game_data[col] = parse_percentages(game_data[col])
 
     # PROCESS ABSOLUTE STATISTICS
-    abs_cols = [
-        table_mapper.wk_columns()["PASS_ACC"]["name"],
-        table_mapper.wk_columns()["SOT"]["name"],
-        table_mapper.wk_columns()["SAVES"]["name"],
-    ]
-
-    for col in abs_cols:
-        game_data[col] = game_data[col].str.split("of").str[0].str.strip()  # .astype(int)
+    for col in made_of_attempted_columns(table_mapper):
+        if not is_numeric_dtype(game_data[col]):
+            game_data[col], _ = parse_made_of_attempted(game_data[col])
 
     return game_data
 
 
+def normalize_game_data(game_data: pd.DataFrame, table_mapper: TableDefinition) -> pd.DataFrame:
+    """Ingestion time normalization of the raw game_data rows: percentages become rates and
+    "made of attempted" columns keep the made count, the attempted count going to a `<column>_attempted`
+    column. Readers of the normalized table skip string parsing.
+
+    Args:
+        game_data (pd.DataFrame): Raw game_data rows.
+        table_mapper (TableDefinition): Table variables.
+
+    Returns:
+        pd.DataFrame: Normalized rows, every statistic column being numeric.
+    """
+    game_data = game_data.copy()
+
+    for col in made_of_attempted_columns(table_mapper):
+        if not is_numeric_dtype(game_data[col]):
+            game_data[col], game_data[f"{col}{cst.ATTEMPTED_SUFFIX}"] = parse_made_of_attempted(game_data[col])
+
+    return process_perc_and_abs_columns(game_data, table_mapper)
+
+
+def transformed_variables(table_mapper: TableDefinition) -> list[str]:
+    """Columns the AVG_, LAST_ and CUMU_ features are computed from (transform set in the table mapping).
+
+    Args:
+        table_mapper (TableDefinition): game_data mapping.
+
+    Returns:
+        list[str]: Column names, in the mapping order.
+    """
+    return [
+        table_mapper.wk_columns()[column]["name"]
+        for column in table_mapper.get_all_atributes()
+        if table_mapper.wk_columns()[column]["transform"]
+    ]
+
+
 def pre_processing_game_data(df: pd.DataFrame, table_mapper: TableDefinition) -> pd.DataFrame:
     """Pre process game data table, most particularly creates target.
 
@@ -92,7 +166,7 @@ class FeatureEngineeringMethods:
     def get_avg_value_past(self, variable: str) -> pd.Series:
         """For a listed number of variables, get their average values on the last 3 games of a team."""
 
-        n_games_past = 3
+        n_games_past = cst.N_GAMES_AVG
 
         self.avg_var = self.data.groupby(self.groupby_var)[variable].transform(
             lambda x: x.rolling(n_games_past).mean().shift()
@@ -129,36 +203,3 @@ class FeatureEngineeringMethods:
         self.data[f"CUMU_{variable}"] = self.get_cumulated_value_past(variable)
 
         return self.data[[f"AVG_{variable}", f"LAST_{variable}", f"CUMU_{variable}"]]
-
-
-class VariableTransformer(FeatureEngineeringMethods, BaseEstimator, TransformerMixin):  # type: ignore
-    def __init__(self, table_mapper: TableDefinition, groupby_var: str) -> None:
-        self.table_mapper = table_mapper
-
-        # self._load_config()
-        self._map_variables_method()
-
-    def _map_variables_method(self) -> None:
-        """get the list of variables to apply FeatureEngineeringMethods on."""
-        table_columns = self.table_mapper.get_all_atributes()
-
-        self.vars_to_transform = []
-
-        for column in table_columns:
-            column_config = self.table_mapper.wk_columns()[column]
-
-            if column_config["transform"]:
-                self.vars_to_transform.append(column_config["name"])
-
-    def fit(self, X: pd.DataFrame, y: None = None) -> Any:
-        """Empty fit."""
-        return self  # The fit method typically does nothing for transformers
-
-    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
-        """Apply the FeatureEngineeringMethods on the listed variables."""
-        fe_transformer = FeatureEngineeringMethods(X, groupby_var="TEAM")
-
-        for variable_name in self.vars_to_transform:
-            X = pd.concat([X, fe_transformer(variable_name)], axis=1)
-
-        return X.drop(self.vars_to_transform, axis=1)
@@ -0,0 +1,60 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share a single in-flight computation: the first call runs it,
+    the ones arriving before it completes wait for its result, or its exception. Nothing is kept once the
+    computation completes, the next call runs it again.
+
+    The computation runs in its own task, so a caller cancelled while waiting (e.g. a client disconnecting)
+    does not cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        """Class instantiation."""
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.executions, self.coalesced, self.errors = 0, 0, 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def run(self, key: Hashable, function: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a computation, or wait for the one already running with the same key.
+
+        Args:
+            key (Hashable): Key of the computation, e.g. the game and the model version.
+            function (Callable[[], Awaitable[Any]]): Coroutine function computing the result, not called
+                when a computation with the same key is in flight.
+
+        Returns:
+            Any: Result of the computation, shared by all the callers (to be treated as read-only).
+        """
+        call = self._calls.get(key)
+        if call is None:
+            self.executions += 1
+            call = self._calls[key] = asyncio.ensure_future(function())
+            call.add_done_callback(lambda done: self._complete(key, done))
+        else:
+            self.coalesced += 1
+
+        # Exceptions of the computation are raised to every caller
+        return await asyncio.shield(call)
+
+    def _complete(self, key: Hashable, call: asyncio.Future) -> None:
+        """Forget a completed computation, so the next call runs it again."""
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Also marks the exception as retrieved when every caller was cancelled
+        if not call.cancelled() and call.exception() is not None:
+            self.errors += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Computations in flight and coalescing counters."""
+        return {
+            "in_flight": len(self),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+        }
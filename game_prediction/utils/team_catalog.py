@@ -0,0 +1,155 @@
+import bisect
+import difflib
+import re
+import unicodedata
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def normalize_team_name(name: str) -> str:
+    """Normalize a team name typed by a user: accents removed, upper case, separators collapsed.
+
+    Args:
+        name (str): Raw team name (e.g. " saint-étienne").
+
+    Returns:
+        str: Normalized name (e.g. "SAINT ETIENNE").
+    """
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return re.sub(r"[^A-Z0-9]+", " ", ascii_name.upper()).strip()
+
+
+class TeamCatalog:
+    """In-memory index of the known teams, used to validate and autocomplete team names
+    before any query or feature engineering is run.
+
+    Three lookups are supported :
+        - exact : the name is stored as is in game_data.
+        - normalized : same name once accents, case and separators are ignored.
+        - prefix / fuzzy : suggestions for partial or misspelled names ("MARSEILE").
+    """
+
+    def __init__(self, teams: Iterable[str] = ()) -> None:
+        self.refresh(teams)
+
+    def refresh(self, teams: Iterable[str]) -> None:
+        """Rebuild the indexes from a new list of teams. Indexes are swapped at once so readers
+        never see a half built catalog.
+
+        Args:
+            teams (Iterable[str]): Team names as stored in game_data.
+        """
+        team_names = frozenset(teams)
+        normalized_index: dict[str, str] = {}
+        for team in sorted(team_names):
+            normalized_index.setdefault(normalize_team_name(team), team)
+
+        self._teams, self._normalized_index, self._sorted_keys = (
+            team_names,
+            normalized_index,
+            sorted(normalized_index),
+        )
+
+    @property
+    def teams(self) -> list[str]:
+        """All known teams, sorted."""
+        return sorted(self._teams)
+
+    def __len__(self) -> int:
+        return len(self._teams)
+
+    def __contains__(self, name: str) -> bool:
+        return self.lookup(name) is not None
+
+    def lookup(self, name: str) -> Union[str, None]:
+        """Find the canonical name of a team.
+
+        Args:
+            name (str): Team name, exact or not normalized.
+
+        Returns:
+            Union[str, None]: Team name as stored in game_data, None if unknown.
+        """
+        if name in self._teams:
+            return name
+
+        return self._normalized_index.get(normalize_team_name(name))
+
+    def suggest(self, query: str, limit: int = 10) -> list[str]:
+        """Autocomplete a partial team name, prefix matches first then close (misspelled) matches.
+
+        Args:
+            query (str): Partial or misspelled team name.
+            limit (int, optional): Maximum number of suggestions. Defaults to 10.
+
+        Returns:
+            list[str]: Team names as stored in game_data.
+        """
+        key = normalize_team_name(query)
+        if not key:
+            return self.teams[:limit]
+
+        suggestions = []
+        position = bisect.bisect_left(self._sorted_keys, key)
+        while (
+            len(suggestions) < limit
+            and position < len(self._sorted_keys)
+            and self._sorted_keys[position].startswith(key)
+        ):
+            suggestions.append(self._normalized_index[self._sorted_keys[position]])
+            position += 1
+
+        if len(suggestions) < limit:
+            close_keys = difflib.get_close_matches(key, self._sorted_keys, n=limit, cutoff=0.6)
+            suggestions += [
+                self._normalized_index[close_key]
+                for close_key in close_keys
+                if self._normalized_index[close_key] not in suggestions
+            ]
+
+        return suggestions[:limit]
+
+
+def find_leagues(games: "pd.DataFrame") -> dict[str, str]:
+    """Group teams by league. game_data has no league column but teams only play teams of their
+    own league, so leagues are the groups of teams connected by the games they played.
+
+    A league is named after its first team in alphabetical order among the teams of its first season. League
+    names are part of the per league model names: a promoted team joins the league of its opponents without
+    renaming it, even when it sorts first, and relegated teams stay in it through their past games.
+
+    Args:
+        games (pd.DataFrame): Games with at least "ID_GAME", "TEAM" and "SEASON" columns (one row per team
+            and game).
+
+    Returns:
+        dict[str, str]: League of each team.
+    """
+    parents: dict[str, str] = {}
+
+    def find(team: str) -> str:
+        parents.setdefault(team, team)
+        while parents[team] != team:
+            parents[team] = parents[parents[team]]
+            team = parents[team]
+        return team
+
+    for teams in games.groupby("ID_GAME")["TEAM"].unique():
+        for team in teams[1:]:
+            parents[find(team)] = find(teams[0])
+        find(teams[0])
+
+    components: dict[str, list[str]] = {}
+    for team in parents:
+        components.setdefault(find(team), []).append(team)
+
+    first_seasons = games.groupby("TEAM")["SEASON"].min().astype(str)
+    leagues = {}
+    for teams in components.values():
+        first_team = min(teams, key=lambda team: (first_seasons[team], team))
+        leagues.update({team: f"LEAGUE_{normalize_team_name(first_team).replace(' ', '_')}" for team in teams})
+
+    return leagues
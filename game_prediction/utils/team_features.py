@@ -0,0 +1,155 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+import game_prediction.constants as cst
+from game_prediction.config import TableMapping, Tables
+from game_prediction.utils.preprocessing import process_perc_and_abs_columns, transformed_variables
+
+# NumPy counterpart of the pandas feature engineering (pre_processing_game_data, VariableTransformer,
+# build_final_data and pivot_final_data_for_model) for the one row per team used at inference time.
+# A team's features before its next game only depend on its last N_GAMES_AVG games and on running
+# totals, which is all a TeamState holds.
+
+TRANSFORMED_VARIABLES = transformed_variables(TableMapping().get_table_info(Tables.GAME_DATA))
+
+RESULT_DUMMIES = [
+    f"{column}_{category}" for column, categories in cst.RESULT_CATEGORIES.items() for category in categories
+]
+
+TEAM_FEATURE_NAMES = [f"CUMU_{dummy}" for dummy in RESULT_DUMMIES] + [
+    f"{prefix}_{variable}" for variable in TRANSFORMED_VARIABLES for prefix in ("AVG", "LAST", "CUMU")
+]
+
+
+class TeamState(NamedTuple):
+    """Everything needed to compute the features of a team before a given game.
+
+    recent: raw values of TRANSFORMED_VARIABLES on the last N_GAMES_AVG previous games, oldest first.
+    cumulated: sums of TRANSFORMED_VARIABLES over all previous games (missing values ignored).
+    cumulated_results: sums of RESULT_DUMMIES over all previous games.
+    n_games: number of previous games.
+    """
+
+    recent: np.ndarray
+    cumulated: np.ndarray
+    cumulated_results: np.ndarray
+    n_games: int
+
+    @classmethod
+    def from_history(cls, values: np.ndarray, results: np.ndarray) -> "TeamState":
+        """Build the state from the full history of previous games.
+
+        Args:
+            values (np.ndarray): TRANSFORMED_VARIABLES of previous games, shape (n_games, n_variables), oldest first.
+            results (np.ndarray): RESULT_DUMMIES of previous games, shape (n_games, n_dummies), oldest first.
+
+        Returns:
+            TeamState: State of the team before its next game.
+        """
+        # Sequential sums, so totals are summed in the same order as pandas cumsum
+        cumulated = np.nancumsum(values, axis=0)[-1] if len(values) else np.zeros(values.shape[1])
+        cumulated_results = results.cumsum(axis=0)[-1] if len(results) else np.zeros(results.shape[1])
+
+        return cls(values[-cst.N_GAMES_AVG :], cumulated, cumulated_results, len(values))
+
+
+def team_features(state: TeamState) -> np.ndarray:
+    """Features of a team before its next game, same values as the pandas feature engineering.
+
+    Args:
+        state (TeamState): State of the team.
+
+    Raises:
+        ValueError: When the team has not played enough games (rows dropped by build_final_data).
+
+    Returns:
+        np.ndarray: Team features in TEAM_FEATURE_NAMES order.
+    """
+    if state.n_games < cst.N_GAMES_AVG:
+        raise ValueError(f"At least {cst.N_GAMES_AVG} previous games are needed, got {state.n_games}.")
+
+    last = state.recent[-1]
+    # Missing values propagate like pandas rolling mean and cumsum do
+    average = state.recent.mean(axis=0)
+    cumulated = np.where(np.isnan(last), np.nan, state.cumulated)
+
+    return np.concatenate([state.cumulated_results, np.stack([average, last, cumulated], axis=1).ravel()])
+
+
+class FeatureLayout:
+    """Map team features to the model input columns ("<team feature>_RATIO", away value over home value)."""
+
+    def __init__(self, feature_names: list[str]) -> None:
+        """Class instantiation.
+
+        Args:
+            feature_names (list[str]): Model input columns, in the order the model expects them.
+
+        Raises:
+            ValueError: When some model columns can not be computed from team features.
+        """
+        positions = {name: position for position, name in enumerate(TEAM_FEATURE_NAMES)}
+        unknown_features = [
+            name for name in feature_names if not name.endswith("_RATIO") or name[: -len("_RATIO")] not in positions
+        ]
+        if unknown_features:
+            raise ValueError(f"Model features can not be computed from team features: {unknown_features}")
+
+        self.feature_names = list(feature_names)
+        self.team_feature_index = np.array([positions[name[: -len("_RATIO")]] for name in feature_names])
+
+    def match_features(self, home_features: np.ndarray, away_features: np.ndarray) -> np.ndarray:
+        """Build model inputs of one or several games, like pivot_final_data_for_model does.
+
+        Args:
+            home_features (np.ndarray): Home team features, shape (n_team_features,) or (n_games, n_team_features).
+            away_features (np.ndarray): Away team features, same shape.
+
+        Returns:
+            np.ndarray: Model inputs as float32, shape (n_features,) or (n_games, n_features).
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = away_features[..., self.team_feature_index] / home_features[..., self.team_feature_index]
+        ratio[~np.isfinite(ratio)] = 0
+
+        return ratio.astype(np.float32)
+
+
+def team_states_from_frame(game_data: pd.DataFrame) -> dict[tuple[str, str], TeamState]:
+    """Compute the state of every team before its last HOME and its last AWAY game from raw game_data,
+    i.e. the rows `prepare_data_inference` keeps.
+
+    Args:
+        game_data (pd.DataFrame): Raw game_data table.
+
+    Returns:
+        dict[tuple[str, str], TeamState]: States indexed by (TEAM, STATUS).
+    """
+    table_mapper = TableMapping().get_table_info(Tables.GAME_DATA)
+
+    data = process_perc_and_abs_columns(game_data.copy(), table_mapper)
+    data["GAME_DATE"] = data["ID_GAME"].str[-8:]
+    data = data.sort_values(["TEAM", "GAME_DATE"]).reset_index(drop=True)
+
+    values = data[TRANSFORMED_VARIABLES].astype(float).to_numpy()
+    results = np.stack(
+        [
+            (data[column] == category).to_numpy(dtype=float)
+            for column, categories in cst.RESULT_CATEGORIES.items()
+            for category in categories
+        ],
+        axis=1,
+    )
+    statuses = data["STATUS"].to_numpy()
+
+    states = {}
+    for team, positions in data.groupby("TEAM").indices.items():
+        for status in ("HOME", "AWAY"):
+            status_games = np.flatnonzero(statuses[positions] == status)
+            if len(status_games):
+                previous_games = positions[: status_games[-1]]
+                states[(team, status)] = TeamState.from_history(values[previous_games], results[previous_games])
+
+    return states
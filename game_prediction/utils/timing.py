@@ -0,0 +1,34 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+    """Record the wall-clock duration of named phases (imports, model loading, warm-up...)."""
+
+    def __init__(self) -> None:
+        self.phases: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the block run under this context manager and store it under `name`.
+
+        Args:
+            name (str): Name of the phase in the report.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def report(self) -> dict[str, float]:
+        """Durations in seconds of each recorded phase, plus their total.
+
+        Returns:
+            dict[str, float]: Phase name to duration, with a "total" key.
+        """
+        report = {name: round(duration, 4) for name, duration in self.phases.items()}
+        report["total"] = round(sum(self.phases.values()), 4)
+
+        return report
@@ -0,0 +1,35 @@
+from typing import Any
+
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+from game_prediction.config import TableDefinition
+from game_prediction.utils.preprocessing import FeatureEngineeringMethods, transformed_variables
+
+# sklearn transformer of the training pipeline, kept apart from utils/preprocessing.py which the
+# serving path imports (through utils/team_features.py) and which must not load sklearn.
+
+
+class VariableTransformer(FeatureEngineeringMethods, BaseEstimator, TransformerMixin):  # type: ignore
+    def __init__(self, table_mapper: TableDefinition, groupby_var: str) -> None:
+        self.table_mapper = table_mapper
+
+        # self._load_config()
+        self._map_variables_method()
+
+    def _map_variables_method(self) -> None:
+        """get the list of variables to apply FeatureEngineeringMethods on."""
+        self.vars_to_transform = transformed_variables(self.table_mapper)
+
+    def fit(self, X: pd.DataFrame, y: None = None) -> Any:
+        """Empty fit."""
+        return self  # The fit method typically does nothing for transformers
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        """Apply the FeatureEngineeringMethods on the listed variables."""
+        fe_transformer = FeatureEngineeringMethods(X, groupby_var="TEAM")
+
+        for variable_name in self.vars_to_transform:
+            X = pd.concat([X, fe_transformer(variable_name)], axis=1)
+
+        return X.drop(self.vars_to_transform, axis=1)
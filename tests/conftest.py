@@ -0,0 +1,50 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(scope="session")
+def game_data() -> pd.DataFrame:
+    """Synthetic game_data table: two leagues of six teams playing each other home and away."""
+    rng = np.random.default_rng(0)
+    rows = []
+    for league in range(2):
+        teams = [f"TEAM_{league}_{i}" for i in range(6)]
+        for day, (home_team, away_team) in enumerate(itertools.permutations(teams, 2)):
+            id_game = f"{home_team}_{away_team}_{(pd.Timestamp('20230801') + pd.Timedelta(days=day)):%Y%m%d}"
+            home_goal, away_goal = rng.integers(0, 4, 2)
+            home_xg, away_xg = rng.random(2) * 3
+            status_result = "HOME_WIN" if home_goal > away_goal else "AWAY_WIN" if home_goal < away_goal else "DRAW"
+            for team, status in ((home_team, "HOME"), (away_team, "AWAY")):
+                scored, conceided = (home_goal, away_goal) if status == "HOME" else (away_goal, home_goal)
+                scored_xg, conceided_xg = (home_xg, away_xg) if status == "HOME" else (away_xg, home_xg)
+                rows.append(
+                    {
+                        "ID_GAME": id_game,
+                        "SEASON": "2023-2024",
+                        "TEAM": team,
+                        "STATUS": status,
+                        "possession%": f"{rng.integers(30, 70)}%",
+                        "pass_acc%": f"{rng.integers(60, 90)}%" if rng.random() > 0.1 else "%",
+                        "SoT%": f"{rng.integers(10, 60)}%",
+                        "saves%": f"{rng.integers(10, 90)}%",
+                        "yellow_or_red_card": int(rng.integers(0, 5)),
+                        "pass_acc": f"{rng.integers(200, 500)} of {rng.integers(500, 600)}",
+                        "SoT": f"{rng.integers(0, 8)} of {rng.integers(8, 15)}",
+                        "saves": f"{rng.integers(0, 6)} of {rng.integers(6, 9)}",
+                        "HOME_GOAL": int(home_goal),
+                        "AWAY_GOAL": int(away_goal),
+                        "HOME_GOAL_XG": float(home_xg),
+                        "AWAY_GOAL_XG": float(away_xg),
+                        "SCORED": int(scored),
+                        "CONCEIDED": int(conceided),
+                        "SCORED_XG": float(scored_xg),
+                        "CONCEIDED_XG": float(conceided_xg),
+                        "FINAL_RESULT": "WIN" if scored > conceided else "LOSS" if scored < conceided else "DRAW",
+                        "FINAL_RESULT_STATUS": status_result,
+                    }
+                )
+
+    return pd.DataFrame(rows)
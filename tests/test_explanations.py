@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from game_prediction.utils.explanations import (
+    Explainer,
+    ExplanationCache,
+    feature_sources,
+    predicted_class_contributions,
+)
+from game_prediction.utils.fast_predict import FastPredictor, to_labels
+from game_prediction.utils.team_features import TEAM_FEATURE_NAMES
+
+
+def test_feature_sources_map_columns_to_variables_and_transforms() -> None:
+    """Model columns are mapped back to their MatchCols attribute, result dummies to their result column."""
+    columns = ["AVG_possession%_RATIO", "LAST_SoT_RATIO", "CUMU_FINAL_RESULT_STATUS_HOME_WIN_RATIO"]
+
+    assert feature_sources(columns) == [
+        ("POSSESSION_PERC", "AVG"),
+        ("SOT", "LAST"),
+        ("FINAL_RESULT_STATUS", "CUMU"),
+    ]
+
+
+def test_contributions_sum_to_margin_and_summaries_add_up() -> None:
+    """Batched contributions sum to the predicted class margin, per variable and per transform sums agree."""
+    rng = np.random.default_rng(0)
+    columns = [f"{name}_RATIO" for name in TEAM_FEATURE_NAMES]
+    train = pd.DataFrame(rng.random((300, len(columns))), columns=columns)
+    model = xgb.XGBClassifier(n_estimators=20, max_depth=3).fit(train, rng.integers(0, 3, len(train)))
+
+    predictor = FastPredictor(model)
+    inference_data = rng.random((50, len(columns))).astype(np.float32)
+    probabilities = predictor.predict_proba(inference_data)
+    contributions = predictor.predict_contributions(inference_data, batch_size=16)
+
+    margins = model.get_booster().predict(xgb.DMatrix(inference_data, feature_names=columns), output_margin=True)
+    np.testing.assert_allclose(contributions.sum(axis=2), margins, atol=1e-5)
+
+    predicted = predicted_class_contributions(probabilities, contributions)
+    explanation = Explainer(columns).summarize(probabilities[0], predicted[0], top=3)
+
+    assert explanation["PREDICTION"] == to_labels(probabilities[:1])[0]
+    features_total = float(predicted[0, :-1].sum())
+    assert np.isclose(sum(explanation["variables"].values()), features_total, atol=1e-5)
+    assert np.isclose(sum(explanation["transforms"].values()), features_total, atol=1e-5)
+    assert len(explanation["features"]) == 3
+
+
+def test_explanation_cache_evicts_least_recently_used() -> None:
+    """Games are evicted least recently used first and keyed by model run."""
+    cache = ExplanationCache(max_games=2)
+    explanation = (np.ones(3), np.ones(5))
+
+    cache.put(("A", "B", "run1"), *explanation)
+    cache.put(("C", "D", "run1"), *explanation)
+    assert cache.get(("A", "B", "run1")) is not None
+    cache.put(("E", "F", "run1"), *explanation)
+
+    assert cache.get(("C", "D", "run1")) is None
+    assert cache.get(("A", "B", "run2")) is None
+    assert cache.stats() == {"cached": 2, "max_games": 2, "hits": 1, "misses": 2}
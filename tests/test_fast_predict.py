@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from game_prediction.utils.fast_predict import FastPredictor, to_labels
+from game_prediction.utils.team_features import TEAM_FEATURE_NAMES
+
+
+def test_fast_predictor_matches_sklearn_wrapper() -> None:
+    """In-place prediction on float32 rows returns the exact probabilities and labels of XGBClassifier."""
+    rng = np.random.default_rng(0)
+    columns = [f"{name}_RATIO" for name in TEAM_FEATURE_NAMES[::3]]
+    train = pd.DataFrame(rng.random((300, len(columns))), columns=columns)
+    model = xgb.XGBClassifier(n_estimators=20, max_depth=3).fit(train, rng.integers(0, 3, len(train)))
+
+    inference_data = rng.random((50, len(columns))).astype(np.float32)
+    frame = pd.DataFrame(inference_data, columns=columns)
+    predictor = FastPredictor(model)
+
+    np.testing.assert_array_equal(predictor.predict_proba(inference_data), model.predict_proba(frame))
+    np.testing.assert_array_equal(predictor.predict_proba(inference_data[:1]), model.predict_proba(frame[:1]))
+    assert to_labels(predictor.predict_proba(inference_data)) == to_labels(model.predict_proba(frame))
+    assert predictor.predict_proba(inference_data).argmax(axis=1).tolist() == model.predict(frame).tolist()
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+import game_prediction.constants as cst
+from game_prediction.config import TableMapping, Tables
+from game_prediction.tasks.feature_chunks import chunk_paths, external_memory_matrix, write_feature_chunks
+from game_prediction.tasks.prepare_data import build_final_data, prepare_data_model
+from game_prediction.utils.preprocessing import pre_processing_game_data
+from game_prediction.utils.variable_transformer import VariableTransformer
+
+
+def test_chunked_features_and_external_memory_matrix(game_data: pd.DataFrame, tmp_path: str) -> None:
+    """Final dataset built by chunks of consecutive games is the full one, and is streamed to XGBoost."""
+    table_mapper = TableMapping().get_table_info(Tables.GAME_DATA)
+    processed = VariableTransformer(table_mapper, "TEAM").transform(
+        pre_processing_game_data(game_data.copy(), table_mapper)
+    )
+    expected = prepare_data_model(build_final_data(processed))
+
+    games = processed["ID_GAME"].unique()
+    games_played: dict[str, int] = {}
+    chunks = [
+        prepare_data_model(build_final_data(processed[processed["ID_GAME"].isin(chunk_games)], games_played))
+        for chunk_games in np.array_split(games, 4)
+    ]
+    # Same games, same date games may come in any order
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks).sort_values("ID_GAME", ignore_index=True), expected.sort_values("ID_GAME", ignore_index=True)
+    )
+
+    columns = write_feature_chunks(chunks, str(tmp_path))
+    train_paths = chunk_paths(str(tmp_path), "train")
+    n_test = sum(len(np.load(path)["y"]) for path in chunk_paths(str(tmp_path), "test"))
+
+    matrix = external_memory_matrix(train_paths, cache_prefix=str(tmp_path / "cache"))
+    assert matrix.num_row() + n_test == len(expected)
+    assert matrix.feature_names == columns
+
+    params = {"objective": "multi:softprob", "num_class": len(cst.LABEL_CONVERTED), "tree_method": "hist"}
+    booster = xgb.train(params, matrix, num_boost_round=5)
+    assert booster.predict(xgb.DMatrix(expected[columns])).shape == (len(expected), 3)
@@ -0,0 +1,108 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import game_prediction.constants as cst
+from game_prediction.config import TableMapping, Tables
+from game_prediction.utils.feature_sql import (
+    feature_query,
+    team_state_from_rows,
+    team_state_query,
+    window_feature_columns,
+)
+from game_prediction.utils.preprocessing import normalize_game_data, pre_processing_game_data
+from game_prediction.utils.team_features import TeamState, team_features, team_states_from_frame
+from game_prediction.utils.variable_transformer import VariableTransformer
+
+
+def test_window_features_match_pandas_pipeline(game_data: pd.DataFrame) -> None:
+    """Features computed by the windowed query are the ones the pandas pipeline computes."""
+    # SQLite can not parse the raw strings (no SPLIT_PART), the query reads the normalized table
+    table = Tables.GAME_DATA_NORMALIZED.value
+    table_mapper = TableMapping().get_table_info(Tables.GAME_DATA)
+    processed = pre_processing_game_data(game_data.copy(), table_mapper)
+    expected = VariableTransformer(table_mapper, "TEAM").transform(processed)
+
+    with sqlite3.connect(":memory:") as connection:
+        normalize_game_data(game_data, table_mapper).to_sql(table, connection, index=False)
+        features = pd.read_sql(feature_query(table), connection)
+
+    assert features.columns.tolist() == expected.columns.tolist()
+
+    # Same games, sorted the same way: same date games may come in any order
+    expected = expected.sort_values(["ID_GAME", "TEAM"]).reset_index(drop=True)
+    features = features.sort_values(["ID_GAME", "TEAM"]).reset_index(drop=True)
+    window_columns = window_feature_columns()
+
+    pd.testing.assert_frame_equal(
+        features.drop(columns=window_columns), expected.drop(columns=window_columns), check_dtype=False
+    )
+    # Equal up to the summation order of the rolling means
+    np.testing.assert_allclose(
+        features[window_columns].to_numpy(dtype=float), expected[window_columns].to_numpy(dtype=float), rtol=1e-12
+    )
+
+
+def query_team_states(game_data: pd.DataFrame) -> dict[tuple[str, str], TeamState]:
+    """State of every (team, status) read with the parameterized team state query, as live inference does."""
+    table = Tables.GAME_DATA_NORMALIZED.value
+    with sqlite3.connect(":memory:") as connection:
+        table_mapper = TableMapping().get_table_info(Tables.GAME_DATA)
+        normalize_game_data(game_data, table_mapper).to_sql(table, connection, index=False)
+        query = team_state_query(table, ":team", ":status")
+        states = {
+            (team, status): team_state_from_rows(connection.execute(query, {"team": team, "status": status}).fetchall())
+            for team in game_data["TEAM"].unique()
+            for status in ("HOME", "AWAY")
+        }
+
+    return states
+
+
+def assert_same_states(states: dict[tuple[str, str], TeamState], expected: dict[tuple[str, str], TeamState]) -> None:
+    """Same arrays (missing values included) and same number of previous games for every expected state."""
+    for key, state in ((key, states[key]) for key in expected):
+        np.testing.assert_allclose(state.recent, expected[key].recent, rtol=1e-12, err_msg=str(key))
+        np.testing.assert_allclose(state.cumulated, expected[key].cumulated, rtol=1e-12, err_msg=str(key))
+        np.testing.assert_array_equal(state.cumulated_results, expected[key].cumulated_results, err_msg=str(key))
+        assert state.n_games == expected[key].n_games, key
+
+
+def test_team_state_query_matches_pandas_states(game_data: pd.DataFrame) -> None:
+    """The window-limited team state query gives the states computed from the whole game_data frame."""
+    states = query_team_states(game_data)
+
+    assert len(states) == 24
+    assert states.keys() == team_states_from_frame(game_data).keys()
+    assert_same_states(states, team_states_from_frame(game_data))
+
+
+def test_team_state_query_with_few_games(game_data: pd.DataFrame) -> None:
+    """Teams with less than N_GAMES_AVG previous games get their short history, and no features."""
+    first_games = game_data[game_data["ID_GAME"].str[-8:] < "20230812"]
+
+    states = query_team_states(first_games)
+
+    expected = team_states_from_frame(first_games)
+    assert_same_states(states, expected)
+    # Without any game of that status yet, the query still returns an empty history
+    assert all(state.n_games == 0 for key, state in states.items() if key not in expected)
+
+    short_histories = [state for state in states.values() if state.n_games < cst.N_GAMES_AVG]
+    assert any(0 < state.n_games < cst.N_GAMES_AVG for state in short_histories)
+    for state in short_histories:
+        assert len(state.recent) == state.n_games
+        with pytest.raises(ValueError):
+            team_features(state)
+
+
+def test_team_state_query_follows_the_table() -> None:
+    """Cached queries are keyed by table: the raw table is parsed, the normalized one read as is."""
+    raw_query = team_state_query(Tables.GAME_DATA.value)
+    normalized_query = team_state_query(Tables.GAME_DATA_NORMALIZED.value)
+
+    assert f"FROM {Tables.GAME_DATA.value}\n" in raw_query and "SPLIT_PART" in raw_query
+    assert f"FROM {Tables.GAME_DATA_NORMALIZED.value}\n" in normalized_query and "SPLIT_PART" not in normalized_query
+    assert team_state_query(Tables.GAME_DATA.value) is raw_query
@@ -0,0 +1,111 @@
+import json
+import pathlib
+import sys
+from typing import Any
+
+import pytest
+import requests
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import game_prediction.constants as cst
+import game_prediction.tasks.scoring as scoring
+
+FRONTEND = pathlib.Path(__file__).parent.parent / "game_prediction" / "frontend.py"
+TEAMS = ["MARSEILLE", "NANTES", "MONACO"]
+METRICS = {f"metrics.{metric}_{label}": 0.5 for metric in ("precision", "recall", "f1-score") for label in range(3)}
+
+
+def api_response(body: Any, status_code: int = 200) -> requests.Response:
+    """Response of the stubbed API."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode()
+
+    return response
+
+
+class StubApi:
+    """Record the calls of the frontend session and answer like the API."""
+
+    def __init__(self, error: Any = None) -> None:
+        self.error = error
+        self.calls: list[tuple[str, Any]] = []
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        self.calls.append((url, None))
+        if self.error:
+            raise self.error
+        return api_response(TEAMS)
+
+    def post(self, url: str, json: Any = None, **kwargs: Any) -> requests.Response:
+        self.calls.append((url, json))
+        if self.error:
+            raise self.error
+        if url.endswith("/predict/batch"):
+            return api_response({"PREDICTIONS": [{**game, "PREDICTION": "DRAW"} for game in json["games"]]})
+        return api_response({**json, "PREDICTION": "HOME_WIN"})
+
+
+@pytest.fixture
+def metric_loads(monkeypatch: pytest.MonkeyPatch) -> list[bool]:
+    """Stub MLFlow and the caches of previous tests, counting the metric loads."""
+    loads: list[bool] = []
+
+    def load_run_mlflow(get_metric: bool = False) -> dict[str, float]:
+        loads.append(get_metric)
+        return METRICS
+
+    # The page imports constants.py as a top-level module, as streamlit runs it from game_prediction/,
+    # and AppTest installs the page as __main__, which spawned worker processes of later tests would re-run
+    monkeypatch.setitem(sys.modules, "constants", cst)
+    monkeypatch.setitem(sys.modules, "__main__", sys.modules["__main__"])
+    monkeypatch.setattr(scoring, "load_run_mlflow", load_run_mlflow)
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+    return loads
+
+
+def run_page(monkeypatch: pytest.MonkeyPatch, api: StubApi) -> AppTest:
+    """Run the page once against the stubbed API."""
+    monkeypatch.setattr(requests.Session, "get", api.get)
+    monkeypatch.setattr(requests.Session, "post", api.post)
+
+    return AppTest.from_file(str(FRONTEND), default_timeout=60).run()
+
+
+def test_metrics_and_teams_are_cached_across_reruns(metric_loads: list[bool], monkeypatch: pytest.MonkeyPatch) -> None:
+    """Reruns reuse the metrics and the team names instead of calling MLFlow and the API again."""
+    api = StubApi()
+    page = run_page(monkeypatch, api)
+    page.run()
+
+    assert not page.exception
+    assert metric_loads == [True]
+    assert api.calls == [(f"{cst.API_URL}/teams", None)]
+    assert len(page.metric) == 9
+    assert [selectbox.options for selectbox in page.selectbox] == [TEAMS, TEAMS]
+
+
+def test_matchday_is_predicted_in_one_call(metric_loads: list[bool], monkeypatch: pytest.MonkeyPatch) -> None:
+    """Every game of the matchday editor is sent in a single batch call and shown with its prediction."""
+    api = StubApi()
+    page = run_page(monkeypatch, api)
+    games = [{"home_team": "MARSEILLE", "away_team": "NANTES"}, {"home_team": "MONACO", "away_team": "MARSEILLE"}]
+    page.session_state["matchday"] = {"edited_rows": {}, "added_rows": games, "deleted_rows": []}
+
+    next(button for button in page.button if button.label == "PREDICT MATCHDAY").click().run()
+
+    assert not page.exception
+    assert api.calls[-1] == (f"{cst.API_URL}/predict/batch", {"games": games})
+    assert page.dataframe[-1].value["PREDICTION"].tolist() == ["DRAW", "DRAW"]
+
+
+def test_unreachable_api_shows_an_error(metric_loads: list[bool], monkeypatch: pytest.MonkeyPatch) -> None:
+    """The page shows an error and stops instead of a traceback when the API is down."""
+    page = run_page(monkeypatch, StubApi(requests.ConnectionError("Connection refused")))
+
+    assert not page.exception
+    assert "can not be reached" in page.error[0].value
+    assert not page.selectbox
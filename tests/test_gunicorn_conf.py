@@ -0,0 +1,54 @@
+import gc
+
+import pandas as pd
+import pytest
+
+import game_prediction.constants as cst
+from game_prediction import api, gunicorn_conf
+from game_prediction.async_data_utils import SnapshotGameData
+from game_prediction.tasks.matchups import MatchupTable, compute_matchup_table
+from game_prediction.utils.fast_predict import FastPredictor
+from game_prediction.utils.team_catalog import find_leagues
+from game_prediction.utils.team_features import team_states_from_frame
+from game_prediction.utils.timing import PhaseTimer
+from tests.test_matchups import fit_model
+
+
+def test_when_ready_preloads_the_serving_state(
+    game_data: pd.DataFrame, tmp_path: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The master loads the model, the snapshot and the matchup table, then freezes them out of the GC."""
+    model = fit_model()
+    snapshot, table_path = f"{tmp_path}/game_data.csv", f"{tmp_path}/matchups.npz"
+    game_data.to_csv(snapshot, index=False)
+    compute_matchup_table(model, team_states_from_frame(game_data), find_leagues(game_data), "run1").save(table_path)
+    monkeypatch.setattr(cst, "GAME_DATA_SNAPSHOT", snapshot)
+    monkeypatch.setattr(cst, "MATCHUP_TABLE_PATH", table_path)
+    monkeypatch.setattr(api, "ml_models", {})
+    monkeypatch.setattr(api, "game_data_sources", {})
+    monkeypatch.setattr(api, "startup_timer", PhaseTimer())
+
+    def load_model() -> None:
+        api.ml_models.update(xgb_model=model, run_id="run1", predictor=FastPredictor(model), model_names=set())
+
+    monkeypatch.setattr(api, "load_model", load_model)
+
+    gc.unfreeze()
+    try:
+        gunicorn_conf.when_ready(object())
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+
+    assert isinstance(api.ml_models["predictor"], FastPredictor)
+    assert isinstance(api.game_data_sources["game_data"], SnapshotGameData)
+    assert isinstance(api.ml_models["matchup_table"], MatchupTable)
+    assert api.ml_models["matchup_table"].is_fresh("run1")
+    assert {"import", "matchup_table", "data_source"} <= set(api.startup_timer.report())
+
+
+def test_gunicorn_settings() -> None:
+    """Uvicorn workers forked from a master that imported the app."""
+    assert gunicorn_conf.preload_app
+    assert gunicorn_conf.worker_class == "uvicorn.workers.UvicornWorker"
+    assert gunicorn_conf.workers == cst.API_WORKERS
@@ -0,0 +1,56 @@
+import argparse
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+import game_prediction.constants as cst
+from game_prediction import api
+from game_prediction.load_test import run_load_test
+from game_prediction.utils.fast_predict import FastPredictor
+from game_prediction.utils.team_catalog import TeamCatalog
+from tests.test_matchups import fit_model
+
+
+def test_in_process_load_test(game_data: pd.DataFrame, tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Requests are replayed through the API lifespan on a game_data snapshot and a small model."""
+    snapshot = f"{tmp_path}/game_data.csv"
+    game_data.to_csv(snapshot, index=False)
+    monkeypatch.setattr(cst, "GAME_DATA_SNAPSHOT", snapshot)
+    monkeypatch.setattr(cst, "MATCHUP_TABLE_PATH", f"{tmp_path}/matchups.npz")
+    monkeypatch.setattr(cst, "PREDICTION_LOG_DIR", f"{tmp_path}/prediction_log")
+    monkeypatch.setattr(api, "team_catalog", TeamCatalog())
+
+    def load_model() -> None:
+        model = fit_model()
+        api.ml_models.update(xgb_model=model, run_id="run1", predictor=FastPredictor(model), model_names=set())
+
+    monkeypatch.setattr(api, "load_model", load_model)
+
+    requests_path = f"{tmp_path}/requests.jsonl"
+    bodies = [
+        {"home_team": "TEAM_0_1", "away_team": "TEAM_0_2"},
+        {"home_team": "team_1_3", "away_team": "TEAM_1_4"},
+        {"home_team": "UNKNOWN", "away_team": "TEAM_0_2"},
+    ]
+    with open(requests_path, "w") as file:
+        file.writelines(json.dumps(body) + "\n" for body in bodies)
+
+    arguments = argparse.Namespace(
+        requests=requests_path,
+        url=None,
+        n_requests=30,
+        concurrency=4,
+        rate=0,
+        poisson=False,
+        endpoint="/predict",
+        timeout=30,
+    )
+    report = asyncio.run(run_load_test(arguments))
+
+    assert report["requests"] == 30
+    assert report["status_codes"] == {"200": 20, "422": 10}
+    assert report["errors"] == 10
+    assert 0 < report["latency_ms"]["p50"] <= report["latency_ms"]["max"]
+    assert not api.ml_models and not api.game_data_sources
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+import game_prediction.constants as cst
+from game_prediction.tasks.matchups import MatchupTable, compute_matchup_table
+from game_prediction.utils.fast_predict import FastPredictor
+from game_prediction.utils.team_catalog import find_leagues
+from game_prediction.utils.team_features import TEAM_FEATURE_NAMES, team_features, team_states_from_frame
+
+
+def fit_model() -> xgb.XGBClassifier:
+    """Small model on random rows of every team feature ratio."""
+    rng = np.random.default_rng(0)
+    columns = [f"{name}_RATIO" for name in TEAM_FEATURE_NAMES]
+    train = pd.DataFrame(rng.random((300, len(columns))), columns=columns)
+
+    return xgb.XGBClassifier(n_estimators=10, max_depth=3).fit(train, rng.integers(0, 3, len(train)))
+
+
+def test_matchup_table_round_trip(game_data: pd.DataFrame, tmp_path: str) -> None:
+    """Pairs of a league are predicted like live inference, and survive a save and load."""
+    model = fit_model()
+    states = team_states_from_frame(game_data)
+    table = compute_matchup_table(model, states, find_leagues(game_data), "run1", explain=True)
+
+    expected = FastPredictor(model).predict_matches_proba(
+        team_features(states[("TEAM_0_1", "HOME")])[None, :], team_features(states[("TEAM_0_2", "AWAY")])[None, :]
+    )
+    np.testing.assert_allclose(table.lookup("TEAM_0_1", "TEAM_0_2"), expected[0], rtol=1e-6)
+    assert table.lookup("TEAM_0_1", "TEAM_1_2") is None  # Different leagues
+    assert table.lookup("TEAM_0_1", "TEAM_0_1") is None
+    assert table.lookup("TEAM_0_1", "UNKNOWN") is None
+    assert table.lookup_contributions("TEAM_0_1", "TEAM_0_2").shape == (len(model.get_booster().feature_names) + 1,)
+
+    path = f"{tmp_path}/matchups.npz"
+    table.save(path)
+    loaded = MatchupTable.load(path)
+
+    np.testing.assert_array_equal(loaded.probabilities, table.probabilities)
+    np.testing.assert_array_equal(loaded.contributions, table.contributions)
+    assert loaded.teams == table.teams and loaded.leagues == table.leagues
+    assert loaded.is_fresh("run1")
+    assert not loaded.is_fresh("run2")
+    assert not loaded.is_fresh("run1", max_age=-1)
+
+
+def test_matchup_table_without_predictable_pairs(game_data: pd.DataFrame, tmp_path: str) -> None:
+    """Teams that have not played N_GAMES_AVG games yet give an empty table instead of an error."""
+    first_games = game_data[game_data["ID_GAME"].str[-8:] < "20230803"]
+    states = team_states_from_frame(first_games)
+    assert all(state.n_games < cst.N_GAMES_AVG for state in states.values())
+
+    table = compute_matchup_table(fit_model(), states, find_leagues(game_data), "run1", explain=True)
+
+    assert np.isnan(table.probabilities).all()
+    assert table.lookup("TEAM_0_1", "TEAM_0_2") is None
+    assert table.lookup_contributions("TEAM_0_1", "TEAM_0_2") is None
+
+    table.save(f"{tmp_path}/matchups.npz")
+    assert MatchupTable.load(f"{tmp_path}/matchups.npz").lookup("TEAM_0_1", "TEAM_0_2") is None
@@ -0,0 +1,27 @@
+import asyncio
+import time
+
+from game_prediction.utils.model_cache import ModelCache
+
+
+def test_model_cache_loads_once_and_evicts_least_recently_used() -> None:
+    """Concurrent requests share a single load and at most max_models models stay in memory."""
+    loaded = []
+
+    def loader(name: str) -> str:
+        time.sleep(0.01)
+        loaded.append(name)
+        return f"model-{name}"
+
+    async def scenario() -> ModelCache:
+        cache = ModelCache(loader, max_models=2)
+        assert await asyncio.gather(*(cache.get("A") for _ in range(5))) == ["model-A"] * 5
+        await cache.get("B")
+        await cache.get("A")
+        await cache.get("C")  # B is the least recently used
+        return cache
+
+    cache = asyncio.run(scenario())
+
+    assert loaded == ["A", "B", "C"]
+    assert cache.stats() == {"loaded": ["A", "C"], "max_models": 2, "hits": 5, "loads": 3, "evictions": 1}
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+from sklearn.metrics import brier_score_loss, classification_report, log_loss
+
+from game_prediction.tasks.model_performance import Evaluation, evaluate_random_model
+
+
+def test_evaluation_matches_sklearn() -> None:
+    """Metrics computed from the cached probabilities are Sklearn's, within their confidence interval."""
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 3, 2000)
+    probabilities = rng.dirichlet(np.ones(3), 2000)
+    # Make the predictions informative
+    probabilities[np.arange(2000), y_true] += 0.5
+    probabilities /= probabilities.sum(axis=1, keepdims=True)
+
+    report = Evaluation(y_true, probabilities).report(n_resamples=500)
+    expected = classification_report(y_true, probabilities.argmax(axis=1), output_dict=True)
+
+    for label in ["0", "1", "2"]:
+        for name in ["precision", "recall", "f1-score"]:
+            assert np.isclose(report[label][name], expected[label][name])
+            assert report[label][f"{name}_ci_low"] <= report[label][name] <= report[label][f"{name}_ci_high"]
+        assert report[label]["support"] == expected[label]["support"]
+
+    assert np.isclose(report["overall"]["accuracy"], expected["accuracy"])
+    assert np.isclose(report["overall"]["log_loss"], log_loss(y_true, probabilities))
+    one_hot = np.eye(3)[y_true]
+    brier = sum(brier_score_loss(one_hot[:, label], probabilities[:, label]) for label in range(3))
+    assert np.isclose(report["overall"]["brier"], brier)
+
+
+def test_random_model_is_centered_on_class_frequencies() -> None:
+    """Random predictions drawn from the class distribution have a recall close to that distribution."""
+    y_test = pd.Series(np.repeat([0, 1, 2], [500, 300, 200]))
+
+    report = evaluate_random_model(y_test, n_draws=2000)
+
+    for label, frequency in [("0", 0.5), ("1", 0.3), ("2", 0.2)]:
+        assert abs(report[label]["recall"] - frequency) < 0.01
+        assert abs(report[label]["precision"] - frequency) < 0.01
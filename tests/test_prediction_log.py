@@ -0,0 +1,38 @@
+import asyncio
+import os
+
+import numpy as np
+
+from game_prediction.utils.prediction_log import PredictionLog, read_prediction_log
+
+
+def test_prediction_log_drops_when_full_and_rotates_files(tmp_path: str) -> None:
+    """Records beyond the capacity are counted as dropped, flushed records are read back in order."""
+    prediction_log = PredictionLog(str(tmp_path), ["A_RATIO", "B_RATIO"], capacity=4, max_files=2)
+
+    def record(n_games: int, first_game: int) -> int:
+        games = [(f"HOME_{i}", f"AWAY_{i}") for i in range(first_game, first_game + n_games)]
+        features = np.arange(first_game, first_game + n_games, dtype=np.float32)[:, None].repeat(2, axis=1)
+        probabilities = np.full((n_games, 3), 1 / 3, dtype=np.float32)
+        return prediction_log.record(games, features, probabilities, ["model"] * n_games, ["run"] * n_games, 0.01)
+
+    async def scenario() -> None:
+        assert record(3, 0) == 3
+        assert record(3, 3) == 1  # Ring full: two records dropped
+        assert await prediction_log.flush() == 4
+        # Slots are reused after the flush, wrapping around the ring
+        assert record(3, 10) == 3
+        assert await prediction_log.flush() == 3
+        assert record(1, 20) == 1
+        assert await prediction_log.flush() == 1
+
+    asyncio.run(scenario())
+
+    assert prediction_log.stats()["dropped"] == 2
+    assert prediction_log.stats()["flushed"] == 8
+    assert len(os.listdir(tmp_path)) == 2
+
+    columns = read_prediction_log(str(tmp_path))
+    assert columns["home_team"].tolist() == ["HOME_10", "HOME_11", "HOME_12", "HOME_20"]
+    assert columns["features"][:, 0].tolist() == [10, 11, 12, 20]
+    assert columns["feature_names"].tolist() == ["A_RATIO", "B_RATIO"]
@@ -0,0 +1,22 @@
+import pandas as pd
+
+from game_prediction.config import TableMapping, Tables
+from game_prediction.utils.preprocessing import normalize_game_data, pre_processing_game_data
+from game_prediction.utils.variable_transformer import VariableTransformer
+
+
+def test_normalized_game_data_gives_the_same_features(game_data: pd.DataFrame) -> None:
+    """Features built from the normalized table are the ones built by parsing the raw strings."""
+    table_mapper = TableMapping().get_table_info(Tables.GAME_DATA)
+    normalized = normalize_game_data(game_data, table_mapper)
+
+    assert normalized["pass_acc"].tolist() == [float(value.split(" of ")[0]) for value in game_data["pass_acc"]]
+    assert normalized["SoT_attempted"].tolist() == [float(value.split(" of ")[1]) for value in game_data["SoT"]]
+    assert (normalized.loc[game_data["pass_acc%"] == "%", "pass_acc%"] == 0).all()
+
+    def features(data: pd.DataFrame) -> pd.DataFrame:
+        processed = pre_processing_game_data(data.copy(), table_mapper)
+        return VariableTransformer(table_mapper, "TEAM").transform(processed)
+
+    raw_features = features(game_data)
+    pd.testing.assert_frame_equal(features(normalized)[raw_features.columns], raw_features)
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from game_prediction.tasks.season_simulation import (
+    remaining_fixtures,
+    season_points,
+    simulate_seasons,
+    summarize_seasons,
+)
+
+
+def test_simulated_seasons_match_fixture_probabilities(game_data: pd.DataFrame) -> None:
+    """Points and positions aggregated over the simulations follow the probabilities of the fixtures."""
+    season_games = game_data[game_data["TEAM"].str.startswith("TEAM_0_") & (game_data["ID_GAME"].str[-8:] < "20230815")]
+    teams = sorted(season_games["TEAM"].unique())
+    fixtures = remaining_fixtures(season_games, teams)
+    assert len(fixtures) + season_games["ID_GAME"].nunique() == len(teams) * (len(teams) - 1)
+
+    team_index = {team: index for index, team in enumerate(teams)}
+    home_index = np.array([team_index[home_team] for home_team, _ in fixtures])
+    away_index = np.array([team_index[away_team] for _, away_team in fixtures])
+    initial_points = season_points(season_games).reindex(teams).to_numpy(dtype=np.float32)
+    probabilities = np.random.default_rng(0).dirichlet(np.ones(3), len(fixtures))
+
+    counts = simulate_seasons(probabilities, home_index, away_index, initial_points, 20000, batch_size=3000)
+    summary = summarize_seasons(teams, counts, european_spots=2, relegation_spots=1).set_index("team").loc[teams]
+
+    # Class order of cst.LABEL_CONVERTED: HOME_WIN, DRAW, AWAY_WIN
+    expected_points = initial_points.astype(float)
+    np.add.at(expected_points, home_index, 3 * probabilities[:, 0] + probabilities[:, 1])
+    np.add.at(expected_points, away_index, 3 * probabilities[:, 2] + probabilities[:, 1])
+    np.testing.assert_allclose(summary["expected_points"], expected_points, atol=0.1)
+
+    assert (counts.positions.sum(axis=0) == 20000).all()
+    np.testing.assert_allclose(summary[["title", "europe", "relegation"]].sum(), [1, 2, 1])
+
+    # Certain results give a single final table
+    certain = np.eye(3)[np.zeros(len(fixtures), dtype=int)]
+    counts = simulate_seasons(certain, home_index, away_index, initial_points, 100)
+    final_points = initial_points + 3 * np.bincount(home_index, minlength=len(teams))
+    assert (counts.points[np.arange(len(teams)), final_points.astype(int)] == 100).all()
@@ -0,0 +1,17 @@
+import subprocess
+import sys
+
+TRAINING_ONLY_MODULES = ["sklearn", "mlflow"]
+
+
+def test_serving_path_skips_training_modules() -> None:
+    """Importing the API and the inference pipeline must not pull training-only dependencies."""
+    script = (
+        "import sys\n"
+        "import game_prediction.api\n"
+        "import game_prediction.pipelines.inference\n"
+        f"print([m for m in {TRAINING_ONLY_MODULES!r} if m in sys.modules])\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == "[]"
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from game_prediction.utils.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_computation_and_its_errors() -> None:
+    """Callers with the same key get the result, or the exception, of a single computation."""
+    single_flight = SingleFlight()
+    calls = []
+
+    async def compute(key: str) -> str:
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        if key == "error":
+            raise ValueError("Not enough games played")
+        return key.upper()
+
+    async def scenario() -> None:
+        results = await asyncio.gather(
+            *(single_flight.run(key, lambda key=key: compute(key)) for key in ["a", "a", "b", "a"])
+        )
+        assert results == ["A", "A", "B", "A"]
+
+        errors = await asyncio.gather(
+            *(single_flight.run("error", lambda: compute("error")) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(error, ValueError) for error in errors)
+
+        # A waiting caller cancelled does not cancel the computation of the others
+        first = asyncio.ensure_future(single_flight.run("c", lambda: compute("c")))
+        second = asyncio.ensure_future(single_flight.run("c", lambda: compute("c")))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "C"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        # Completed computations are not kept
+        assert await single_flight.run("a", lambda: compute("a")) == "A"
+
+    asyncio.run(scenario())
+
+    assert calls == ["a", "b", "error", "c", "a"]
+    assert single_flight.stats() == {"in_flight": 0, "executions": 5, "coalesced": 5, "errors": 1}
@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from game_prediction import api
+from game_prediction.utils.team_catalog import TeamCatalog, find_leagues, normalize_team_name
+
+TEAMS = ["MARSEILLE", "MONACO", "MONTPELLIER", "NANTES", "SAINT-ÉTIENNE", "PARIS S-G"]
+
+
+def test_lookup_exact_and_normalized_names() -> None:
+    """Stored names are found as is, other spellings once accents, case and separators are ignored."""
+    catalog = TeamCatalog(TEAMS)
+
+    assert normalize_team_name(" saint-étienne") == "SAINT ETIENNE"
+    assert catalog.lookup("NANTES") == "NANTES"
+    assert catalog.lookup("nantes ") == "NANTES"
+    assert catalog.lookup("Saint Etienne") == "SAINT-ÉTIENNE"
+    assert catalog.lookup("paris_s.g") == "PARIS S-G"
+    assert catalog.lookup("MARSEILE") is None
+    assert "monaco" in catalog and "LYON" not in catalog
+
+
+def test_suggest_prefix_then_fuzzy_matches() -> None:
+    """Prefix matches come first, then close matches of misspelled names."""
+    catalog = TeamCatalog(TEAMS)
+
+    assert catalog.suggest("mon") == ["MONACO", "MONTPELLIER"]
+    assert catalog.suggest("mon", limit=1) == ["MONACO"]
+    assert catalog.suggest("MARSEILE")[0] == "MARSEILLE"
+    assert catalog.suggest("") == sorted(TEAMS)
+    assert catalog.suggest("XYZ") == []
+
+
+def test_unknown_team_is_rejected_with_suggestions(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The API answers 422 with the closest team names instead of running inference."""
+    monkeypatch.setattr(api, "team_catalog", TeamCatalog(TEAMS))
+
+    assert api.resolve_team("saint etienne") == "SAINT-ÉTIENNE"
+    with pytest.raises(HTTPException) as error:
+        api.resolve_team("MARSEILE")
+
+    assert error.value.status_code == 422
+    assert error.value.detail["suggestions"][0] == "MARSEILLE"
+
+
+def test_find_leagues_groups_teams_that_played_each_other(game_data: pd.DataFrame) -> None:
+    """Each league is named after the first team of its first season."""
+    leagues = find_leagues(game_data)
+
+    assert leagues == {
+        **{f"TEAM_0_{i}": "LEAGUE_TEAM_0_0" for i in range(6)},
+        **{f"TEAM_1_{i}": "LEAGUE_TEAM_1_0" for i in range(6)},
+    }
+
+
+def test_promoted_team_does_not_rename_its_league(game_data: pd.DataFrame) -> None:
+    """A promoted team sorting before every team of the league joins it under the same name."""
+    promoted = pd.DataFrame(
+        {
+            "ID_GAME": ["A_PROMOTED_TEAM_0_3_20240810"] * 2,
+            "SEASON": ["2024-2025"] * 2,
+            "TEAM": ["A_PROMOTED", "TEAM_0_3"],
+            "STATUS": ["HOME", "AWAY"],
+        }
+    )
+
+    leagues = find_leagues(pd.concat([game_data, promoted], ignore_index=True))
+
+    assert leagues["A_PROMOTED"] == leagues["TEAM_0_0"] == "LEAGUE_TEAM_0_0"
+    assert leagues["TEAM_1_0"] == "LEAGUE_TEAM_1_0"
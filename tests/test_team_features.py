@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from game_prediction.config import TableMapping, Tables
+from game_prediction.tasks.prepare_data import build_final_data
+from game_prediction.tasks.scoring import prepare_data_inference
+from game_prediction.utils.preprocessing import pre_processing_game_data
+from game_prediction.utils.team_features import FeatureLayout, team_features, team_states_from_frame
+from game_prediction.utils.variable_transformer import VariableTransformer
+
+
+def test_team_features_match_pandas_pipeline(game_data: pd.DataFrame) -> None:
+    """NumPy features built from team states are the ones the pandas inference pipeline builds."""
+    table_mapper = TableMapping().get_table_info(Tables.GAME_DATA)
+    processed = pre_processing_game_data(game_data.copy(), table_mapper)
+    processed = build_final_data(VariableTransformer(table_mapper, "TEAM").transform(processed))
+
+    states = team_states_from_frame(game_data)
+
+    for home_team, away_team in [("TEAM_0_1", "TEAM_0_2"), ("TEAM_1_5", "TEAM_1_0"), ("TEAM_0_3", "TEAM_1_4")]:
+        expected = prepare_data_inference(processed, home_team, away_team).drop(["ID_GAME", "TARGET"], axis=1)
+        layout = FeatureLayout(expected.columns.tolist())
+
+        features = layout.match_features(
+            team_features(states[(home_team, "HOME")]), team_features(states[(away_team, "AWAY")])
+        )
+
+        np.testing.assert_array_equal(features, expected.to_numpy(dtype=np.float32)[0])
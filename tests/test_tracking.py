@@ -0,0 +1,52 @@
+import os
+import time
+
+import numpy as np
+import pytest
+import xgboost as xgb
+from mlflow.tracking import MlflowClient
+
+import game_prediction.constants as cst
+from game_prediction.tasks.tracking import RunRecord, TrackingWriter, replay_buffered_runs
+
+
+def test_failed_run_is_buffered_then_replayed(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A run the tracking server refuses is buffered locally, then logged once the server is back."""
+    # MLFlow creates a default ./mlruns store on the way
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cst, "TRACKING_BUFFER_DIR", f"{tmp_path}/buffer")
+    # Nothing listens on port 1: the connection is refused at once
+    monkeypatch.setattr(cst, "URI_PATH_DEFAULT", "http://127.0.0.1:1")
+    monkeypatch.setenv("MLFLOW_HTTP_REQUEST_MAX_RETRIES", "0")
+    monkeypatch.setenv("MLFLOW_HTTP_REQUEST_TIMEOUT", "2")
+
+    rng = np.random.default_rng(0)
+    model = xgb.XGBClassifier(n_estimators=2, max_depth=2).fit(rng.random((30, 3)), rng.integers(0, 3, 30))
+    record = RunRecord(
+        model_name="test-model",
+        metrics={"accuracy": 0.5},
+        params={"max_depth": "2"},
+        tags={"model_name": "test-model"},
+        created_at=int(time.time() * 1000),
+        model=model,
+    )
+
+    writer = TrackingWriter()
+    writer.submit(record)
+    writer.flush()
+
+    assert (writer.logged, writer.buffered) == (0, 1)
+    assert len(os.listdir(cst.TRACKING_BUFFER_DIR)) == 1
+
+    monkeypatch.setattr(cst, "URI_PATH_DEFAULT", f"file:{tmp_path}/mlruns")
+    assert replay_buffered_runs() == 1
+    assert os.listdir(cst.TRACKING_BUFFER_DIR) == []
+
+    client = MlflowClient(tracking_uri=cst.URI_PATH_DEFAULT)
+    experiment = client.get_experiment_by_name(cst.EXPERIMENT_NAME)
+    (run,) = client.search_runs([experiment.experiment_id])
+    assert run.info.status == "FINISHED"
+    assert run.data.metrics == {"accuracy": 0.5}
+    assert run.data.tags["model_name"] == "test-model"
+    assert run.info.start_time == record.created_at
+    assert [artifact.path for artifact in client.list_artifacts(run.info.run_id)] == ["test-model"]
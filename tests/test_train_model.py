@@ -0,0 +1,31 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from game_prediction.tasks.train_model import continue_training
+
+
+def test_continue_training_updates_a_copy_on_new_games() -> None:
+    """Boosting adds trees, refreshing keeps them, even when the new games miss a class."""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.random((600, 4)), columns=["A_RATIO", "B_RATIO", "C_RATIO", "D_RATIO"])
+    y = pd.Series(rng.integers(0, 3, 600))
+    model = xgb.XGBClassifier(n_estimators=20).fit(X[:500], y[:500])
+    probabilities = model.predict_proba(X)
+
+    X_new, y_new = X[500:], y[500:].replace(1, 0)
+
+    boosted, _ = continue_training(model, X_new, y_new, mode="boost", n_rounds=5)
+    assert boosted.get_booster().num_boosted_rounds() == 25
+    assert boosted.get_booster().feature_names == model.get_booster().feature_names
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # XGBoost warns that the refresh updater overrides tree_method
+        refreshed, _ = continue_training(model, X_new, y_new, mode="refresh")
+    assert refreshed.get_booster().num_boosted_rounds() == 20
+    assert not np.allclose(refreshed.predict_proba(X), probabilities)
+
+    # The previous model is left unchanged
+    np.testing.assert_array_equal(model.predict_proba(X), probabilities)
@@ -0,0 +1,63 @@
+import os
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from game_prediction.pipelines import train_parallel
+from game_prediction.pipelines.train_parallel import TrainingJob, job_data, run_training_jobs
+from game_prediction.tasks.train_model import train_model
+from game_prediction.utils.timing import PhaseTimer
+
+
+def fit_job(job: TrainingJob) -> dict[str, Any]:
+    """Worker job fitting a model on its rows of the shared feature matrix, without logging it."""
+    X, y = job_data(job)
+    model, _ = train_model(X, y, n_jobs=train_parallel.shared_data["n_jobs"])
+
+    return {"model_name": job.model_name, "probabilities": model.predict_proba(X)}
+
+
+def failing_job(job: TrainingJob) -> dict[str, Any]:
+    """Worker job failing like a training error."""
+    raise ValueError(f"{job.model_name} failed")
+
+
+def training_data() -> tuple[pd.DataFrame, pd.Series, list[TrainingJob]]:
+    """Tiny feature matrix, a global job and a segment job."""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.random((200, 4)), columns=["A_RATIO", "B_RATIO", "C_RATIO", "D_RATIO"])
+    y = pd.Series(rng.integers(0, 3, len(X)))
+    jobs = [TrainingJob("global", {}, np.arange(len(X))), TrainingJob("segment", {}, np.arange(0, len(X), 2))]
+
+    return X, y, jobs
+
+
+def test_parallel_jobs_match_serial_training(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Workers train on their rows of the memory-mapped matrix like a serial fit, and the matrix is removed."""
+    monkeypatch.setattr(train_parallel, "SHARED_MEMORY_DIR", str(tmp_path))
+    X, y, jobs = training_data()
+    timer = PhaseTimer()
+
+    results = run_training_jobs(X, y, jobs, n_workers=2, n_jobs=1, timer=timer, job_function=fit_job)
+
+    assert [result["model_name"] for result in results] == ["global", "segment"]
+    for job, result in zip(jobs, results):
+        X_job = X.iloc[job.rows].reset_index(drop=True)
+        model, _ = train_model(X_job, y.iloc[job.rows].reset_index(drop=True), n_jobs=1)
+        np.testing.assert_allclose(result["probabilities"], model.predict_proba(X_job), rtol=1e-6)
+
+    assert set(timer.report()) >= {"shared_memory", "training"}
+    assert os.listdir(tmp_path) == []
+
+
+def test_shared_memory_is_removed_when_a_job_fails(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A failing job is raised in the parent process, after the shared feature matrix is removed."""
+    monkeypatch.setattr(train_parallel, "SHARED_MEMORY_DIR", str(tmp_path))
+    X, y, jobs = training_data()
+
+    with pytest.raises(ValueError, match="failed"):
+        run_training_jobs(X, y, jobs, n_workers=2, n_jobs=1, timer=PhaseTimer(), job_function=failing_job)
+
+    assert os.listdir(tmp_path) == []